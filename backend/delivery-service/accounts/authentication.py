@@ -0,0 +1,35 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# The token generation: a per-user counter that log_user_out_everywhere() increments. Tokens
+# carry the generation they were issued in (GENERATION_CLAIM, copied from the refresh token to the
+# access tokens made from it), and authentication refuses any other, so bumping the counter ends
+# the access tokens already out at once rather than when they expire. Tokens without the claim
+# count as generation 0, the generation of every user until their first logout everywhere.
+
+GENERATION_CLAIM = "gen"
+
+
+class GenerationRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        token[GENERATION_CLAIM] = user.token_generation
+        return token
+
+
+class GenerationTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = GenerationRefreshToken
+
+
+class GenerationJWTAuthentication(JWTAuthentication):
+    """JWT authentication that also refuses tokens of an earlier token generation than the user's."""
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        if validated_token.get(GENERATION_CLAIM, 0) != user.token_generation:
+            raise AuthenticationFailed(_("Token has been revoked"), code="token_revoked")
+        return user
@@ -0,0 +1,82 @@
+import statistics
+import time
+
+from accounts.models import User
+from accounts.services import log_user_out_everywhere
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken
+from restaurant.management.benchmarking import format_timing, rolled_back
+
+
+def per_token_logout(user):
+    """The previous log_user_out_everywhere(): decodes and blacklists the tokens one by one."""
+    for token in OutstandingToken.objects.filter(user=user):
+        try:
+            RefreshToken(token.token).blacklist()
+        except TokenError:
+            pass
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks log_user_out_everywhere for a user with 10k outstanding refresh tokens by default, "
+        "against the previous per-token loop: time and SQL statements. "
+        "All seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tokens", type=int, nargs="+", default=[100, 1000, 10_000], help="Tokens per user.")
+        parser.add_argument("--repeat", type=int, default=3)
+
+    def handle(self, *args, **options):
+        for count in options["tokens"]:
+            for label, logout in (("per token", per_token_logout), ("set-based", log_user_out_everywhere)):
+                self.run_case(label, logout, count, options["repeat"])
+
+    def run_case(self, label, logout, count, repeat):
+        samples, statements = [], []
+
+        def count_statements(execute, sql, params, many, context):
+            statements.append(sql)
+            return execute(sql, params, many, context)
+
+        for _ in range(repeat):
+            # Every run blacklists the tokens, so each one seeds a fresh user and rolls it back.
+            with rolled_back():
+                user = self.seed(count)
+                statements.clear()
+                with connection.execute_wrapper(count_statements):
+                    started = time.perf_counter()
+                    logout(user)
+                    samples.append((time.perf_counter() - started) * 1000)
+        samples.sort()
+        p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+        self.stdout.write(
+            format_timing(f"{count} tokens, {label}", statistics.median(samples), p95, f"{len(statements)} statements")
+        )
+
+    def seed(self, count):
+        user = User.objects.create_user(
+            email="bench-logout@example.com", password=None, first_name="Bench", last_name="User"
+        )
+        now = timezone.now()
+        tokens = []
+        for _ in range(count):
+            token = RefreshToken()
+            token[api_settings.USER_ID_CLAIM] = getattr(user, api_settings.USER_ID_FIELD)
+            tokens.append(
+                OutstandingToken(
+                    user=user,
+                    jti=token[api_settings.JTI_CLAIM],
+                    token=str(token),
+                    created_at=now,
+                    expires_at=now + api_settings.REFRESH_TOKEN_LIFETIME,
+                )
+            )
+        OutstandingToken.objects.bulk_create(tokens, batch_size=2000)
+        return user
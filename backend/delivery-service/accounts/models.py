@@ -65,6 +65,9 @@ class User(AbstractUser):
     first_name = models.CharField(_("first name"), max_length=50, blank=False, null=False)
     last_name = models.CharField(_("last name"), max_length=50, blank=False, null=False)
     email = models.EmailField(_("email address"), unique=True)
+    # Incremented by log_user_out_everywhere(): access tokens of an earlier generation stop working
+    # (accounts/authentication.py).
+    token_generation = models.PositiveIntegerField(default=0, editable=False)
 
     # This prompts for these fields during 'createsuperuser'
     REQUIRED_FIELDS = ["first_name", "last_name"]
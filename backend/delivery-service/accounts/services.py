@@ -1,12 +1,49 @@
-from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
-from rest_framework_simplejwt.tokens import RefreshToken
+from accounts.authentication import GenerationJWTAuthentication
+from accounts.models import User
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+# Blacklists every unexpired refresh token of a user that isn't blacklisted yet, in one statement,
+# without decoding the tokens.
+_BLACKLIST_SQL = """
+    INSERT INTO {blacklisted} (token_id, blacklisted_at)
+    SELECT outstanding.id, %s
+    FROM {outstanding} outstanding
+    WHERE outstanding.user_id = %s
+      AND outstanding.expires_at > %s
+      AND NOT EXISTS (SELECT 1 FROM {blacklisted} blacklisted WHERE blacklisted.token_id = outstanding.id)
+"""
 
 
 def log_user_out_everywhere(instance):
-    tokens = OutstandingToken.objects.filter(user=instance)
-    for token in tokens:
-        try:
-            RefreshToken(token.token).blacklist()
-        except TokenError:
-            pass  # token's already invalid, no worries
+    """
+    Ends every session of the user: blacklists all their refresh tokens (one INSERT ... SELECT)
+    and bumps their token generation, which invalidates the access tokens already handed out
+    (accounts/authentication.py) instead of letting them run until they expire.
+    """
+    sql = _BLACKLIST_SQL.format(
+        blacklisted=connection.ops.quote_name(BlacklistedToken._meta.db_table),
+        outstanding=connection.ops.quote_name(OutstandingToken._meta.db_table),
+    )
+    now = timezone.now()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, [now, instance.pk, now])
+        User.objects.filter(pk=instance.pk).update(token_generation=F("token_generation") + 1)
+    instance.refresh_from_db(fields=["token_generation"])
+
+
+def user_for_access_token(raw_token):
+    """
+    The active user a JWT access token belongs to, or None for a missing, invalid or expired token.
+    For connections that can't send an Authorization header (EventSource, WebSocket).
+    """
+    if not raw_token:
+        return None
+    authentication = GenerationJWTAuthentication()
+    try:
+        return authentication.get_user(authentication.get_validated_token(raw_token))
+    except (InvalidToken, AuthenticationFailed):
+        return None
@@ -1,8 +1,15 @@
+from datetime import timedelta
+
+from accounts.authentication import GenerationRefreshToken
 from accounts.models import User
-from accounts.services import log_user_out_everywhere
+from accounts.services import log_user_out_everywhere, user_for_access_token
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
 from rest_framework_simplejwt.exceptions import TokenError
-from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
 from rest_framework_simplejwt.tokens import RefreshToken
 
 
@@ -74,3 +81,59 @@ class UserServicesTests(TestCase):
             self.fail(f"log_user_out_everywhere raised an exception unexpectedly: {e}")
 
         self.assertEqual(OutstandingToken.objects.filter(user=self.user).count(), 0)
+
+    def test_log_user_out_revokes_access_tokens(self):
+        """
+        Test that access tokens issued before the logout stop working at once, and new ones work.
+        """
+        old_access = str(GenerationRefreshToken.for_user(self.user).access_token)
+        legacy_access = str(RefreshToken.for_user(self.user).access_token)  # issued without the claim
+        self.assertEqual(user_for_access_token(old_access), self.user)
+        self.assertEqual(user_for_access_token(legacy_access), self.user)
+
+        log_user_out_everywhere(self.user)
+
+        self.assertEqual(self.user.token_generation, 1)
+        self.assertIsNone(user_for_access_token(old_access))
+        self.assertIsNone(user_for_access_token(legacy_access))
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {old_access}")
+        self.assertEqual(client.get("/api/v0/auth/me/").status_code, 401)
+        new_access = str(GenerationRefreshToken.for_user(self.user).access_token)
+        self.assertEqual(user_for_access_token(new_access), self.user)
+
+    def test_log_user_out_skips_blacklisted_and_expired_tokens(self):
+        """
+        Test that tokens already blacklisted or expired are left alone, and other users' tokens too.
+        """
+        blacklisted = RefreshToken.for_user(self.user)
+        blacklisted.blacklist()
+        RefreshToken.for_user(self.user)
+        OutstandingToken.objects.filter(jti=RefreshToken.for_user(self.user)["jti"]).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+        other = User.objects.create_user(
+            email="other@test.com", first_name="Other", last_name="User", password="password123"
+        )
+        RefreshToken.for_user(other)
+
+        log_user_out_everywhere(self.user)
+        log_user_out_everywhere(self.user)
+
+        self.assertEqual(BlacklistedToken.objects.filter(token__user=self.user).count(), 2)
+        self.assertFalse(BlacklistedToken.objects.filter(token__user=other).exists())
+        self.assertEqual(self.user.token_generation, 2)
+
+    def test_log_user_out_statement_count_does_not_depend_on_the_tokens(self):
+        """
+        Test that the tokens are blacklisted in one statement, however many there are.
+        """
+        counts = []
+        for tokens in (1, 20):
+            for _ in range(tokens):
+                RefreshToken.for_user(self.user)
+            with CaptureQueriesContext(connection) as queries:
+                log_user_out_everywhere(self.user)
+            counts.append(len(queries))
+        # savepoint, blacklist insert, generation update, release, generation re-read
+        self.assertEqual(counts, [5, 5])
@@ -23,6 +23,8 @@ class UserViewSet(viewsets.ModelViewSet):
     # Use the Manager serializer by default
     serializer_class = ManagerUserSerializer
     permission_classes = [IsManager]
+    # Max SQL queries per request, JWT authentication included (see app/query_budget.py).
+    query_budgets = {"list": 2, "retrieve": 2, "create": 3, "update": 8, "partial_update": 8, "destroy": 9}
 
     def get_queryset(self):
         """
@@ -71,6 +73,7 @@ class SelfUserView(generics.RetrieveUpdateAPIView):
     serializer_class = SelfUserSerializer
     # Any logged-in user can access this
     permission_classes = [permissions.IsAuthenticated]
+    query_budgets = {"get": 1, "put": 2, "patch": 2}
 
     def get_object(self):
         """
@@ -86,6 +89,7 @@ class LogoutView(APIView):
     """
 
     permission_classes = [permissions.IsAuthenticated]
+    query_budgets = {"post": 8}
 
     def post(self, request):
         try:
@@ -0,0 +1,21 @@
+from urllib.parse import parse_qs
+
+from accounts.services import user_for_access_token
+from channels.db import database_sync_to_async
+from django.contrib.auth.models import AnonymousUser
+
+
+class JWTAuthMiddleware:
+    """
+    Sets scope["user"] of a WebSocket connection from its ?access_token= (browsers can't send
+    an Authorization header with a WebSocket); AnonymousUser without a valid token.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        query = parse_qs(scope.get("query_string", b"").decode())
+        user = await database_sync_to_async(user_for_access_token)(query.get("access_token", [None])[0])
+        scope = {**scope, "user": user or AnonymousUser()}
+        return await self.app(scope, receive, send)
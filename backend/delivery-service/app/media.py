@@ -0,0 +1,17 @@
+from django.utils.cache import patch_cache_control
+from django.views.static import serve
+from restaurant.storage import is_content_addressed
+
+# A content-addressed file never changes under its name (see restaurant/storage.py).
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """
+    django.views.static.serve for MEDIA_URL (DEBUG only), plus long-lived caching of the
+    hash-stamped dish photos and their variants. Production serves the same headers from nginx.
+    """
+    response = serve(request, path, document_root=document_root, show_indexes=show_indexes)
+    if response.status_code == 200 and is_content_addressed(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    return response
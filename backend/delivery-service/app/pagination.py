@@ -0,0 +1,140 @@
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in keyset (seek) pagination.
+
+    A page is only produced when the client sends 'cursor' or 'page_size'; otherwise the view
+    returns the plain, complete list as before. Pages are fetched with a WHERE on the last seen
+    sort key instead of OFFSET, so page N costs the same as page 1 given an index on the ordering.
+
+    The view declares its sort keys in 'keyset_ordering' (e.g. ("-is_available", "name")).
+    The keys must be non-null and together unique, so every row has exactly one position.
+    Subclasses for lists that must never come back whole set 'always_paginate'.
+    """
+
+    always_paginate = False
+    ordering = ("id",)
+    page_size = 50
+    max_page_size = 200
+    page_size_query_param = "page_size"
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor."
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if (
+            not self.always_paginate
+            and self.cursor_query_param not in request.query_params
+            and self.page_size_query_param not in request.query_params
+        ):
+            return None
+
+        self.request = request
+        self.ordering = tuple(getattr(view, "keyset_ordering", self.ordering))
+        page_size = self.get_page_size(request)
+
+        queryset = queryset.order_by(*self.ordering)
+        position = self.decode_cursor(request)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.get_seek_filter(position))
+            except (DjangoValidationError, TypeError, ValueError) as exc:
+                # A tampered cursor whose values don't fit the key fields.
+                raise NotFound(self.invalid_cursor_message) from exc
+
+        # One extra row tells us whether there is a next page without a COUNT query.
+        rows = list(queryset[: page_size + 1])
+        page = rows[:page_size]
+        self.next_position = self.get_position(page[-1]) if len(rows) > page_size else None
+        return page
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def get_position(self, row):
+        # Rows are model instances or values() dicts.
+        if isinstance(row, dict):
+            return [row[field.lstrip("-")] for field in self.ordering]
+        return [getattr(row, field.lstrip("-")) for field in self.ordering]
+
+    def get_seek_filter(self, position):
+        """
+        Rows strictly after 'position' in the declared ordering, expanded as
+        (a > x) OR (a = x AND b > y) OR ... so mixed ASC/DESC keys work too.
+        """
+        seek = Q()
+        equal = {}
+        for field, value in zip(self.ordering, position, strict=True):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            seek |= Q(**equal, **{f"{name}__{lookup}": value})
+            equal[name] = value
+        return seek
+
+    def encode_cursor(self, position):
+        def default(value):
+            if isinstance(value, (datetime, date)):
+                return value.isoformat()
+            if isinstance(value, Decimal):
+                return str(value)
+            raise TypeError(f"Cannot encode {type(value).__name__} in a cursor.")
+
+        payload = json.dumps(position, default=default, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode()))
+        except ValueError as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        if not all(isinstance(value, (str, int, float)) for value in position):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Opaque cursor from the 'next' link of the previous page.",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": f"Number of results per page (max {self.max_page_size}). "
+                "Without this or 'cursor' the full list is returned.",
+                "schema": {"type": "integer"},
+            },
+        ]
@@ -0,0 +1,102 @@
+import logging
+import re
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger(__name__)
+
+# Per-endpoint SQL query budgets.
+#
+# Views declare the most queries one request may run:
+#     query_budgets = {"list": 4, "retrieve": 4, "create": 8}
+# ViewSets key the budgets by action, plain API views by lower-case HTTP method ("get", "patch").
+# app/tests/test_query_budgets.py requests every endpoint with 1, 100 and 1000 rows of data and
+# fails when a request goes over its budget, so an N+1 shows up as a failing test with a report
+# of the repeated statements. With QUERY_BUDGET_MODE=warn|raise the middleware below checks
+# every request at runtime too (e.g. `QUERY_BUDGET_MODE=raise python manage.py test`).
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN \((?:\s*(?:%s|\?)\s*,?)+\)", re.IGNORECASE)
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def get_query_budget(view_func, method):
+    """
+    Returns the budget 'view_func' (a resolved URL callback) declares for 'method', or None.
+    """
+    budgets = getattr(getattr(view_func, "cls", None), "query_budgets", None)
+    if not budgets:
+        return None
+    method = method.lower()
+    if method == "head":
+        method = "get"
+    actions = getattr(view_func, "actions", None)
+    key = actions.get(method) if actions is not None else method
+    return budgets.get(key)
+
+
+def normalize_sql(sql):
+    """Replaces literal values, so the same statement with different parameters compares equal."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = sql.replace("%s", "?")
+    return _IN_LIST_RE.sub("IN (...)", sql)
+
+
+def duplicated_queries(statements):
+    """Statements that ran more than once, most repeated first: [(count, normalized sql), ...]."""
+    counts = Counter(normalize_sql(sql) for sql in statements)
+    return [(count, sql) for sql, count in counts.most_common() if count > 1]
+
+
+def format_query_report(statements):
+    lines = [f"{len(statements)} queries"]
+    duplicated = duplicated_queries(statements)
+    if duplicated:
+        lines.append("repeated statements (likely N+1):")
+        lines.extend(f"  {count}x {sql}" for count, sql in duplicated)
+    return "\n".join(lines)
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts the queries of every request and compares them with the view's declared budget.
+    QUERY_BUDGET_MODE: "off" (default, no overhead beyond a settings lookup), "warn" logs, "raise" fails the request.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = getattr(settings, "QUERY_BUDGET_MODE", "off")
+        if mode not in ("warn", "raise"):
+            return self.get_response(request)
+
+        statements = []
+
+        def record(execute, sql, params, many, context):
+            statements.append(sql)
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(record):
+            response = self.get_response(request)
+
+        budget = get_query_budget(getattr(request, "query_budget_view", None), request.method)
+        if budget is not None and len(statements) > budget:
+            message = (
+                f"{request.method} {request.path} ran {len(statements)} queries, budget is {budget}.\n"
+                f"{format_query_report(statements)}"
+            )
+            if mode == "raise":
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget_view = view_func
@@ -11,6 +11,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
 import os
+from datetime import timedelta
 from pathlib import Path
 
 import dj_database_url
@@ -43,17 +44,22 @@ ALLOWED_HOSTS = [host.strip() for host in ALLOWED_HOSTS_STR.split(",") if host.s
 # Application definition
 
 INSTALLED_APPS = [
+    # First, so its runserver replaces Django's: the dev server then serves app.asgi too, which the
+    # streaming courier feed and the kitchen board WebSocket need (WSGI would buffer the endless feed).
+    "daphne",
     "django.contrib.admin",
     "django.contrib.auth",
     "django.contrib.contenttypes",
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "rest_framework",
     "rest_framework_simplejwt",
     "rest_framework_simplejwt.token_blacklist",
     "drf_spectacular",
     "drf_standardized_errors",
+    "channels",
     "orders",
     "restaurant",
     "accounts",
@@ -76,7 +82,56 @@ else:
     CORS_ALLOWED_ORIGINS = [origin.strip() for origin in CORS_ALLOWED_ORIGINS_PROD.split(",") if origin.strip()]
     CORS_ALLOW_ALL_ORIGINS = False
 
-CORS_ALLOW_HEADERS = list(default_headers) + ["Authorization"]
+CORS_ALLOW_HEADERS = list(default_headers) + ["Authorization", "Idempotency-Key"]
+CORS_EXPOSE_HEADERS = ["Idempotent-Replayed"]
+
+# How long an Idempotency-Key on the order creation endpoints is remembered (orders/services/idempotency.py).
+IDEMPOTENCY_KEY_TTL = timedelta(hours=float(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24")))
+# How long a request holds its key before a retry may take it over, in case its worker died.
+# Keep it above the server's request timeout, or a slow first request can run twice.
+IDEMPOTENCY_KEY_LEASE = timedelta(seconds=float(os.getenv("IDEMPOTENCY_KEY_LEASE_SECONDS", "60")))
+
+# Courier feed (Server-Sent Events, orders/views/feed.py): a comment line is sent after this many
+# idle seconds, so proxies keep the connection open; a client more than ORDER_FEED_QUEUE_SIZE
+# events behind gets a fresh snapshot instead of its backlog.
+ORDER_FEED_HEARTBEAT = float(os.getenv("ORDER_FEED_HEARTBEAT_SECONDS", "15"))
+ORDER_FEED_QUEUE_SIZE = int(os.getenv("ORDER_FEED_QUEUE_SIZE", "100"))
+
+# Country calling code for phone numbers written without one (orders/services/phones.py).
+PHONE_COUNTRY_CODE = os.getenv("PHONE_COUNTRY_CODE", "380")
+
+# Delivery address geocoding (orders/services/geocoding.py): a dotted path to the geocoder class;
+# the default looks addresses up in the GEOCODER_FILE CSV ("address,latitude,longitude").
+ORDER_GEOCODER = os.getenv("ORDER_GEOCODER", "orders.services.geocoding.FileGeocoder")
+GEOCODER_FILE = os.getenv("GEOCODER_FILE", str(BASE_DIR / "geocoding.csv"))
+GEOCODER_WORKERS = int(os.getenv("GEOCODER_WORKERS", "2"))
+# Couriers aren't offered ready orders farther away than this (orders/services/nearby.py).
+ORDER_NEARBY_MAX_KM = float(os.getenv("ORDER_NEARBY_MAX_KM", "40"))
+# Multi-stop batches proposed to couriers (orders/services/batching.py): at most this many orders
+# per trip, routes no longer than this, and this much CPU time per planning request.
+ORDER_BATCH_CAPACITY = int(os.getenv("ORDER_BATCH_CAPACITY", "4"))
+ORDER_BATCH_MAX_MINUTES = float(os.getenv("ORDER_BATCH_MAX_MINUTES", "45"))
+ORDER_BATCH_CPU_MS = float(os.getenv("ORDER_BATCH_CPU_MS", "50"))
+# Sales rollups (orders/services/sales.py): rollup_sales leaves the orders changed in the last
+# minutes to its next run, so transactions still open by then aren't skipped.
+SALES_ROLLUP_LAG = timedelta(minutes=float(os.getenv("SALES_ROLLUP_LAG_MINUTES", "5")))
+
+# Kitchen board (WebSocket, orders/consumers.py). Deltas go to the screens through the channel
+# layer: Redis when CHANNEL_LAYER_REDIS_URL is set, which every deployment with more than one
+# worker process needs; the in-memory layer only reaches screens connected to the same process.
+ASGI_APPLICATION = "app.asgi.application"
+CHANNEL_LAYER_REDIS_URL = os.getenv("CHANNEL_LAYER_REDIS_URL")
+if CHANNEL_LAYER_REDIS_URL:
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "channels_redis.core.RedisChannelLayer",
+            "CONFIG": {"hosts": [CHANNEL_LAYER_REDIS_URL]},
+        }
+    }
+else:
+    CHANNEL_LAYERS = {"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}}
+# How long board deltas are kept for screens resuming after a disconnect (prune_kitchen_events).
+KITCHEN_EVENT_RETENTION = timedelta(hours=float(os.getenv("KITCHEN_EVENT_RETENTION_HOURS", "12")))
 
 REST_FRAMEWORK = {
     # "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
@@ -84,13 +139,18 @@ REST_FRAMEWORK = {
     "DEFAULT_RENDERER_CLASSES": (
         ["rest_framework.renderers.JSONRenderer"] + (["rest_framework.renderers.BrowsableAPIRenderer"] if DEBUG else [])
     ),
-    "DEFAULT_AUTHENTICATION_CLASSES": ("rest_framework_simplejwt.authentication.JWTAuthentication",),
+    "DEFAULT_AUTHENTICATION_CLASSES": ("accounts.authentication.GenerationJWTAuthentication",),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",  # Example: Allow read-only for anonymous, require auth for write
     ),
     "EXCEPTION_HANDLER": "drf_standardized_errors.handler.exception_handler",
 }
 
+SIMPLE_JWT = {
+    # Issues tokens carrying the user's token generation (accounts/authentication.py).
+    "TOKEN_OBTAIN_SERIALIZER": "accounts.authentication.GenerationTokenObtainPairSerializer",  # noqa: S105
+}
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "Food Delivery API",
     "DESCRIPTION": "Auto-generated OpenAPI schema for our Django REST API.",
@@ -120,8 +180,12 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "app.query_budget.QueryBudgetMiddleware",
 ]
 
+# Per-endpoint SQL query budgets (see app/query_budget.py): "off", "warn" or "raise".
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off")
+
 ROOT_URLCONF = "app.urls"
 
 TEMPLATES = [
@@ -145,14 +209,25 @@ WSGI_APPLICATION = "app.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# The app is served over ASGI (app/asgi.py, startup.sh). There, sync ORM code of async requests may
+# run in threads of its own, and persistent connections (CONN_MAX_AGE > 0) would stay open per thread
+# until PostgreSQL refuses new ones. So connections are closed after every request (CONN_MAX_AGE 0)
+# and, on PostgreSQL, borrowed from a per-process psycopg pool of at most DB_POOL_MAX_SIZE.
+DB_POOL = {
+    "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "2")),
+    "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "10")),
+}
+
 # Use dj-database-url to parse DATABASE_URL provided by Render/Fly
 # Fallback to individual POSTGRES_ vars from .env for local docker-compose
 if "DATABASE_URL" in os.environ:
     DATABASES = {
         "default": dj_database_url.config(
-            conn_max_age=600, ssl_require=False
+            conn_max_age=0, ssl_require=False
         )  # Set ssl_require=True if Render requires SSL
     }
+    if DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+        DATABASES["default"].setdefault("OPTIONS", {})["pool"] = DB_POOL
 else:
     # Your existing local dev setup (reads POSTGRES_USER etc from .env)
     DATABASES = {
@@ -163,10 +238,9 @@ else:
             "PASSWORD": os.environ.get("POSTGRES_PASSWORD", "postgres"),
             "HOST": os.environ.get("DB_HOST", "db"),
             "PORT": os.environ.get("POSTGRES_PORT", "5432"),
-            # утримувати коннекшн до 60 c (зменшує overhead перепідключень)
-            "CONN_MAX_AGE": 60,
+            "CONN_MAX_AGE": 0,
             # statement_timeout = 3000 мс для кожного запиту
-            "OPTIONS": {"options": "-c statement_timeout=3000"},
+            "OPTIONS": {"options": "-c statement_timeout=3000", "pool": DB_POOL},
         }
     }
 
@@ -210,6 +284,10 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 # Define MEDIA settings for user uploads (like dish photos)
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
+# Dish photo variants (restaurant/services/photos.py): larger images are not decoded at all,
+# and the variants are rendered by this many background threads per process.
+DISH_PHOTO_MAX_PIXELS = int(os.getenv("DISH_PHOTO_MAX_PIXELS", str(40_000_000)))
+DISH_PHOTO_WORKERS = int(os.getenv("DISH_PHOTO_WORKERS", "2"))
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
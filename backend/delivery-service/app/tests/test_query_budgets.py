@@ -0,0 +1,367 @@
+from datetime import timedelta
+from types import SimpleNamespace
+from unittest import mock
+
+from accounts.models import User
+from app.query_budget import QueryBudgetExceeded, duplicated_queries, format_query_report, get_query_budget
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, resolve
+from django.utils import timezone
+from orders.models import Order, OrderItem
+from orders.services.sales import hour_of, rebuild_hours
+from rest_framework.routers import APIRootView
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+from restaurant.models import Category, Dish, DishIngredient, Ingredient
+from restaurant.services.categories import repair_category_counts
+from restaurant.services.menu_cache import invalidate_menu_documents
+from restaurant.views.dishes import DishViewSet
+
+# Every endpoint is requested with 1, 100 and 1000 rows of data (and of nested data for detail views).
+# A constant-query endpoint stays within its budget at every size; an N+1 blows through it.
+SCALES = (1, 100, 1000)
+URL_MODULES = ("restaurant.urls.api", "orders.urls.api", "accounts.urls")
+
+
+class _Rollback(Exception):
+    pass
+
+
+def seed(scale):
+    # No passwords: requests authenticate with JWTs, and hashing would dominate the test time.
+    manager = User.objects.create(
+        email="budget-manager@delivery.com", first_name="Budget", last_name="Manager", role=User.Role.MANAGER
+    )
+    users = User.objects.bulk_create(
+        [
+            User(email=f"user{index}@delivery.com", first_name="U", last_name=str(index), role=User.Role.COURIER)
+            for index in range(scale)
+        ]
+    )
+    categories = Category.objects.bulk_create(
+        [Category(name=f"Category {index}", slug=f"category-{index}") for index in range(scale)]
+    )
+    ingredients = Ingredient.objects.bulk_create([Ingredient(name=f"Ingredient {index}") for index in range(scale)])
+    dishes = Dish.objects.bulk_create(
+        [
+            Dish(name=f"Dish {index}", description="Budget.", price=10, category=categories[index % scale])
+            for index in range(scale)
+        ]
+    )
+    # Never ordered, so it can be deleted; carries all ingredients like the first dish.
+    spare_category = Category.objects.create(name="Spare")
+    spare_dish = Dish.objects.create(name="Spare dish", description="Budget.", price=5, category=spare_category)
+    DishIngredient.objects.bulk_create(
+        [DishIngredient(dish=dish, ingredient=ingredients[index % scale]) for index, dish in enumerate(dishes[1:], 1)]
+        + [
+            DishIngredient(dish=dish, ingredient=ingredient)
+            for dish in (dishes[0], spare_dish)
+            for ingredient in ingredients
+        ]
+    )
+
+    # bulk_create bypasses the dish services that keep the category counters.
+    repair_category_counts()
+
+    orders = Order.objects.bulk_create(
+        [Order(phone="0501234567", phone_e164="+380501234567", self_pickup=True) for _ in range(scale)]
+    )
+    OrderItem.objects.bulk_create(
+        [OrderItem(order=order, dish=dishes[0], name="Dish 0", unit_price=10, line_total=10) for order in orders]
+        + [OrderItem(order=orders[0], dish=dish, name=dish.name, unit_price=10, line_total=10) for dish in dishes]
+    )
+    # Both order APIs read the same table; these are the /api/v0/orders/ kind.
+    customer_orders = Order.objects.bulk_create(
+        [Order(user=users[index], guest_name="Guest") for index in range(scale)]
+    )
+    OrderItem.objects.bulk_create(
+        [OrderItem(order=customer_orders[0], dish=dish, quantity=1, unit_price=10) for dish in dishes]
+    )
+    # The manager's own order history (GET /api/v0/orders/mine/).
+    history = Order.objects.bulk_create([Order(user=manager, guest_name="Manager") for _ in range(scale)])
+    OrderItem.objects.bulk_create(
+        [OrderItem(order=order, dish=dishes[index % scale], unit_price=10) for index, order in enumerate(history)]
+    )
+    # bulk_create skips the incremental sales rollups as well.
+    rebuild_hours({hour_of(order.created_at) for order in orders + customer_orders + history})
+    return SimpleNamespace(
+        manager=manager,
+        user=users[0],
+        spare_user=User.objects.create(
+            email="spare@delivery.com", first_name="Spare", last_name="User", role=User.Role.COURIER
+        ),
+        category=categories[0],
+        spare_category=spare_category,
+        ingredient=ingredients[0],
+        ingredients=ingredients,
+        dish=dishes[0],
+        dishes=dishes,
+        spare_dish=spare_dish,
+        order=orders[0],
+        customer_order=customer_orders[0],
+        today=timezone.localdate(),
+    )
+
+
+def read_stream(response):
+    if not response.is_async:
+        return b"".join(response.streaming_content)
+
+    async def read():
+        return b"".join([part async for part in response.streaming_content])
+
+    return async_to_sync(read)()
+
+
+def routed_views(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from routed_views(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and not issubclass(pattern.callback.cls, APIRootView):
+            yield pattern.callback
+
+
+def routed_methods(callback):
+    if getattr(callback, "actions", None) is not None:
+        methods = callback.actions
+    else:
+        methods = [name for name in callback.cls.http_method_names if hasattr(callback.cls, name)]
+    return [method for method in methods if method not in ("options", "head")]
+
+
+# (label, authenticated as manager, method, path, payload)
+CASES = [
+    ("dish list", False, "get", lambda d: "/api/v0/dishes/", None),
+    ("dish list page", False, "get", lambda d: "/api/v0/dishes/?page_size=50", None),
+    ("dish list filtered", False, "get", lambda d: f"/api/v0/dishes/?with_ingredients={d.ingredient.id}", None),
+    ("dish list compact", False, "get", lambda d: "/api/v0/dishes/?view=compact", None),
+    ("dish detail", False, "get", lambda d: f"/api/v0/dishes/{d.dish.id}/", None),
+    (
+        "dish create",
+        True,
+        "post",
+        lambda d: "/api/v0/dishes/",
+        lambda d: {
+            "name": "New dish",
+            "description": "New.",
+            "price": "12.50",
+            "category_id": d.category.id,
+            "ingredients_data": [{"ingredient_id": ingredient.id} for ingredient in d.ingredients[:3]],
+        },
+    ),
+    ("dish update", True, "patch", lambda d: f"/api/v0/dishes/{d.dish.id}/", lambda d: {"price": "11.00"}),
+    (
+        "dish update ingredients",
+        True,
+        "patch",
+        lambda d: f"/api/v0/dishes/{d.dish.id}/",
+        lambda d: {"ingredients_data": [{"ingredient_id": ingredient.id} for ingredient in d.ingredients[:3]]},
+    ),
+    ("dish delete", True, "delete", lambda d: f"/api/v0/dishes/{d.spare_dish.id}/", None),
+    ("category list", False, "get", lambda d: "/api/v0/categories/", None),
+    ("category detail", False, "get", lambda d: f"/api/v0/categories/{d.category.id}/", None),
+    ("category create", True, "post", lambda d: "/api/v0/categories/", lambda d: {"name": "New category"}),
+    ("category update", True, "patch", lambda d: f"/api/v0/categories/{d.category.id}/", lambda d: {"name": "Renamed"}),
+    ("category delete", True, "delete", lambda d: f"/api/v0/categories/{d.spare_category.id}/", None),
+    ("ingredient list", False, "get", lambda d: "/api/v0/ingredients/", None),
+    ("ingredient detail", False, "get", lambda d: f"/api/v0/ingredients/{d.ingredient.id}/", None),
+    ("ingredient create", True, "post", lambda d: "/api/v0/ingredients/", lambda d: {"name": "New ingredient"}),
+    (
+        "ingredient update",
+        True,
+        "patch",
+        lambda d: f"/api/v0/ingredients/{d.ingredient.id}/",
+        lambda d: {"name": "Renamed"},
+    ),
+    ("ingredient delete", True, "delete", lambda d: f"/api/v0/ingredients/{d.ingredient.id}/", None),
+    ("restaurant order list", False, "get", lambda d: "/api/v0/menu/orders/?phone=050 123 45 67", None),
+    ("restaurant order export", True, "get", lambda d: "/api/v0/menu/orders/export/", None),
+    ("restaurant order detail", False, "get", lambda d: f"/api/v0/menu/orders/{d.order.id}/", None),
+    (
+        "restaurant order create",
+        False,
+        "post",
+        lambda d: "/api/v0/menu/orders/",
+        lambda d: {"phone": "0501234567", "self_pickup": True, "items_input": [{"dish_id": d.dish.id, "quantity": 2}]},
+    ),
+    (
+        "restaurant order create (50 lines)",
+        False,
+        "post",
+        lambda d: "/api/v0/menu/orders/",
+        lambda d: {
+            "phone": "0501234567",
+            "delivery_address": "Khreshchatyk 1",
+            # Repeats dishes at the small scales: 50 lines either way.
+            "items_input": [
+                {"dish_id": dish.id, "quantity": 1 + index % 3} for index, dish in enumerate((d.dishes * 50)[:50])
+            ],
+        },
+    ),
+    (
+        "restaurant order create (idempotent)",
+        False,
+        "post",
+        lambda d: "/api/v0/menu/orders/",
+        lambda d: {"phone": "0501234567", "self_pickup": True, "items_input": [{"dish_id": d.dish.id, "quantity": 2}]},
+        {"Idempotency-Key": "budget-restaurant-order"},
+    ),
+    ("order detail", True, "get", lambda d: f"/api/v0/orders/{d.customer_order.id}/", None),
+    (
+        "order status",
+        True,
+        "post",
+        lambda d: f"/api/v0/orders/{d.customer_order.id}/status/",
+        lambda d: {"status": "preparing", "expected_status": "new"},
+    ),
+    ("order history", True, "get", lambda d: "/api/v0/orders/mine/", None),
+    ("order history (summary, 100)", True, "get", lambda d: "/api/v0/orders/mine/?view=summary&page_size=100", None),
+    ("ready orders nearby", True, "get", lambda d: "/api/v0/orders/ready/nearby/?lat=50.45&lon=30.52", None),
+    ("ready order batches", True, "get", lambda d: "/api/v0/orders/ready/batches/?lat=50.45&lon=30.52", None),
+    (
+        "sales report",
+        True,
+        "get",
+        # Hours before and after two full days.
+        lambda d: f"/api/v0/orders/reports/sales/?start={d.today - timedelta(days=2)}T05:00"
+        f"&end={d.today + timedelta(days=1)}T03:00&group_by=dish",
+        None,
+    ),
+    (
+        "order create (idempotent)",
+        True,
+        "post",
+        lambda d: "/api/v0/orders/",
+        lambda d: {"dishes": [d.dish.id, d.dish.id, d.spare_dish.id]},
+        {"Idempotency-Key": "budget-order"},
+    ),
+    (
+        "order create",
+        True,
+        "post",
+        lambda d: "/api/v0/orders/",
+        lambda d: {"dishes": [d.dish.id, d.dish.id, d.spare_dish.id]},
+    ),
+    ("user list", True, "get", lambda d: "/api/v0/auth/users/", None),
+    ("user detail", True, "get", lambda d: f"/api/v0/auth/users/{d.user.id}/", None),
+    (
+        "user create",
+        True,
+        "post",
+        lambda d: "/api/v0/auth/users/",
+        lambda d: {
+            "email": "new@delivery.com",
+            "first_name": "New",
+            "last_name": "User",
+            "password": "correct horse battery staple",
+            "role": User.Role.COURIER,
+        },
+    ),
+    ("user update", True, "patch", lambda d: f"/api/v0/auth/users/{d.user.id}/", lambda d: {"is_active": False}),
+    ("user delete", True, "delete", lambda d: f"/api/v0/auth/users/{d.spare_user.id}/", None),
+    ("me", True, "get", lambda d: "/api/v0/auth/me/", None),
+    ("me update", True, "patch", lambda d: "/api/v0/auth/me/", lambda d: {"first_name": "Renamed"}),
+    (
+        "logout",
+        True,
+        "post",
+        lambda d: "/api/v0/auth/logout/",
+        lambda d: {"refresh": str(RefreshToken.for_user(d.manager))},
+    ),
+]
+
+
+class QueryBudgetTests(TestCase):
+    """
+    Every endpoint of the API routers stays within its declared query budget at every data size.
+    """
+
+    def measure(self, case, data):
+        """Runs one request against 'data' and undoes whatever it wrote."""
+        label, as_manager, method, path, payload, *options = case
+        headers = options[0] if options else {}
+        try:
+            with transaction.atomic():
+                cache.clear()
+                invalidate_menu_documents()
+                client = APIClient()
+                if as_manager:
+                    token = RefreshToken.for_user(data.manager).access_token
+                    client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")
+                url = path(data)
+                body = payload(data) if payload else None
+                with CaptureQueriesContext(connection) as queries:
+                    response = getattr(client, method)(url, body, format="json", headers=headers)
+                    if response.streaming:
+                        # Streamed bodies run their queries while they are read.
+                        read_stream(response)
+                raise _Rollback((url, response, [query["sql"] for query in queries]))
+        except _Rollback as measured:
+            return measured.args[0]
+
+    def test_endpoints_stay_within_budget_at_every_scale(self):
+        for scale in SCALES:
+            with transaction.atomic():
+                data = seed(scale)
+                for case in CASES:
+                    label, _, method = case[:3]
+                    with self.subTest(endpoint=label, scale=scale):
+                        url, response, statements = self.measure(case, data)
+                        self.assertLess(
+                            response.status_code,
+                            300,
+                            f"{label}: {read_stream(response)[:500] if response.streaming else response.content[:500]}",
+                        )
+                        budget = get_query_budget(resolve(url.split("?")[0]).func, method)
+                        self.assertIsNotNone(budget, f"{label}: no query budget declared for {method.upper()} {url}")
+                        self.assertLessEqual(
+                            len(statements),
+                            budget,
+                            f"{label} at {scale} rows: over budget ({budget}).\n{format_query_report(statements)}",
+                        )
+                transaction.set_rollback(True)
+
+    def test_every_routed_endpoint_declares_a_budget(self):
+        missing = set()
+        for module in URL_MODULES:
+            for callback in routed_views(get_resolver(module).url_patterns):
+                for method in routed_methods(callback):
+                    if get_query_budget(callback, method) is None:
+                        missing.add(f"{module}: {callback.cls.__name__}.{method}")
+        self.assertEqual(sorted(missing), [])
+
+    def test_repeated_statements_are_reported(self):
+        statements = [f'SELECT "name" FROM "dish" WHERE "id" = {index}' for index in range(3)]  # noqa: S608
+        statements.append("SELECT 'x'")
+        self.assertEqual(duplicated_queries(statements), [(3, 'SELECT "name" FROM "dish" WHERE "id" = ?')])
+        self.assertIn("3x SELECT", format_query_report(statements))
+
+    def test_middleware_enforces_budgets_in_raise_mode(self):
+        Dish.objects.create(
+            name="Margherita", description="Classic.", price=10, category=Category.objects.create(name="Pizza")
+        )
+        with override_settings(QUERY_BUDGET_MODE="raise"):
+            self.assertEqual(APIClient().get("/api/v0/dishes/").status_code, 200)
+            with mock.patch.object(DishViewSet, "query_budgets", {"list": 1}):
+                with self.assertRaisesMessage(QueryBudgetExceeded, "budget is 1"):
+                    APIClient().get("/api/v0/dishes/")
+
+    def test_order_admin_lists_are_constant(self):
+        admin = User.objects.create_superuser(
+            email="admin@delivery.com", password="password123", first_name="Ad", last_name="Min"  # nosec
+        )
+        self.client.force_login(admin)
+        for url in ["/admin/orders/order/", "/admin/orders/orderitem/"]:
+            counts = []
+            for scale in (1, 50):
+                with transaction.atomic():
+                    seed(scale)
+                    with CaptureQueriesContext(connection) as queries:
+                        self.assertEqual(self.client.get(url).status_code, 200)
+                    counts.append(len(queries))
+                    transaction.set_rollback(True)
+            self.assertEqual(counts[0], counts[1], url)
@@ -15,17 +15,21 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+from app.media import serve_media
 from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
+from orders.views.feed import courier_feed
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     # API v0
     path("api/v0/menu/", include("restaurant.urls.api")),
+    # Server-Sent Events, kept out of the DRF routers: a stream has no query budget.
+    path("api/v0/orders/feed/", courier_feed, name="courier-feed"),
     path("api/v0/orders/", include("orders.urls.api")),
     path("api/v0/auth/", include("accounts.urls")),
     path("api/v0/", include("restaurant.urls.api")),
@@ -39,4 +43,4 @@ urlpatterns = [
 ]
 
 if settings.DEBUG:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    urlpatterns += static(settings.MEDIA_URL, view=serve_media, document_root=settings.MEDIA_ROOT)
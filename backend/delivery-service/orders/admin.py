@@ -1,23 +1,47 @@
 from django.contrib import admin
-from orders.models import Order, OrderItem
+from orders.models import KitchenEvent, Order, OrderItem
+from orders.services.geocoding import schedule_geocoding
+from orders.services.kitchen import KITCHEN_STATUSES, order_items_changed, record_kitchen_event
 
 
 class OrderItemInline(admin.TabularInline):
     model = OrderItem
     extra = 0
-    readonly_fields = ("dish", "quantity", "unit_price")
+    readonly_fields = ("dish", "name", "quantity", "unit_price", "line_total")
 
 
 @admin.register(Order)
 class OrderAdmin(admin.ModelAdmin):
-    list_display = ("id", "user", "status", "total_price", "created_at")
-    list_filter = ("status", "created_at")
-    search_fields = ("id", "user__email")
+    list_display = ("id", "user", "phone", "status", "courier", "payment_method", "total_amount", "created_at")
+    list_select_related = ("user", "courier")
+    list_filter = ("status", "payment_method", "self_pickup", "created_at")
+    search_fields = ("id", "legacy_id", "user__email", "phone", "phone_e164")
     inlines = [OrderItemInline]
 
+    # Edits here bypass the services: geocode a changed address and tell the kitchen board.
+    def save_model(self, request, obj, form, change):
+        if "delivery_address" in form.changed_data:
+            obj.latitude = obj.longitude = None
+        super().save_model(request, obj, form, change)
+        if "delivery_address" in form.changed_data:
+            schedule_geocoding(obj)
+        if (
+            change
+            and "status" in form.changed_data
+            and (obj.status in KITCHEN_STATUSES or form.initial.get("status") in KITCHEN_STATUSES)
+        ):
+            record_kitchen_event(obj.pk, KitchenEvent.Kind.STATUS_CHANGED, {"id": obj.pk, "status": obj.status})
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        if change and ("notes" in form.changed_data or any(formset.has_changed() for formset in formsets)):
+            order_items_changed(form.instance.pk)
+
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
-    list_display = ("order", "dish", "quantity", "unit_price")
+    list_display = ("order", "dish", "quantity", "unit_price", "line_total")
+    # str(order) reads order.user
+    list_select_related = ("order__user", "dish")
     search_fields = ("order__id", "dish__name")
     list_filter = ("dish",)
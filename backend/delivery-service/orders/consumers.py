@@ -0,0 +1,42 @@
+from types import SimpleNamespace
+from urllib.parse import parse_qs
+
+from accounts.permissions import IsKitchenStaff
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from orders.services.kitchen import KITCHEN_GROUP, board_snapshot, deltas_since
+
+# Close code for screens that aren't kitchen staff (4000-4999 are free for applications).
+FORBIDDEN = 4403
+
+
+class KitchenBoardConsumer(AsyncJsonWebsocketConsumer):
+    """
+    ws/kitchen/[?since=<seq>] for kitchen staff, authenticated by ?access_token=.
+    Sends the board as a snapshot, or with 'since' just the deltas after that sequence number
+    when they are still kept, then every delta live (orders/services/kitchen.py):
+        {"type": "snapshot", "seq": 41, "orders": [...]}
+        {"type": "created" | "status_changed" | "items_changed", "seq": 42, "order": {...}}
+    """
+
+    async def connect(self):
+        request = SimpleNamespace(user=self.scope.get("user"))
+        if not IsKitchenStaff().has_permission(request, self):
+            await self.close(code=FORBIDDEN)
+            return
+        # Joined before catching up, so no delta committed meanwhile is missed (it may come twice).
+        await self.channel_layer.group_add(KITCHEN_GROUP, self.channel_name)
+        await self.accept()
+        for message in await database_sync_to_async(self._catch_up)():
+            await self.send_json(message)
+
+    def _catch_up(self):
+        since = parse_qs(self.scope.get("query_string", b"").decode()).get("since", [""])[0]
+        deltas = deltas_since(int(since)) if since.isdigit() else None
+        return [board_snapshot()] if deltas is None else deltas
+
+    async def disconnect(self, code):
+        await self.channel_layer.group_discard(KITCHEN_GROUP, self.channel_name)
+
+    async def kitchen_delta(self, event):
+        await self.send_json(event["delta"])
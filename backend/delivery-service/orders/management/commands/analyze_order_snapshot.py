@@ -0,0 +1,23 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from orders.services.analytics import standard_report
+from orders.services.snapshots import Snapshot, SnapshotError
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints the standard aggregates of an order snapshot written by export_order_snapshot as JSON: "
+        "totals, revenue by hour of week, basket sizes and price elasticity per dish."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+
+    def handle(self, *args, **options):
+        try:
+            with Snapshot(options["path"]) as snapshot:
+                report = standard_report(snapshot)
+        except (OSError, SnapshotError) as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(json.dumps(report, indent=2))
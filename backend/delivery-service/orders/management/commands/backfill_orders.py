@@ -0,0 +1,53 @@
+import time
+
+from django.core.management.base import BaseCommand
+from orders.services.backfill import (
+    backfill_item_snapshots,
+    backfill_phone_numbers,
+    copy_legacy_orders,
+    pending_legacy_orders,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves historical orders into the single order table: fills the name / line_total snapshots "
+        "of old order items, copies the legacy restaurant orders with their items, then normalizes "
+        "the phone numbers of orders without an E.164 one. Works in "
+        "short chunks and can be interrupted and run again at any time; it resumes where it stopped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000, help="Rows per transaction.")
+        parser.add_argument(
+            "--pause", type=float, default=0.0, help="Seconds to sleep between chunks, to go easy on the database."
+        )
+
+    def handle(self, *args, **options):
+        chunk_size, pause = options["chunk_size"], options["pause"]
+
+        filled = 0
+        for count in backfill_item_snapshots(chunk_size):
+            filled += count
+            self.stdout.write(f"Order items: {filled} snapshots filled...")
+            time.sleep(pause)
+
+        self.stdout.write(f"Legacy orders to copy: {pending_legacy_orders().count()}.")
+        copied = 0
+        for count in copy_legacy_orders(chunk_size):
+            copied += count
+            self.stdout.write(f"Legacy orders: {copied} copied...")
+            time.sleep(pause)
+
+        phones = 0
+        for count in backfill_phone_numbers(chunk_size):
+            phones += count
+            self.stdout.write(f"Phone numbers: {phones} orders normalized...")
+            time.sleep(pause)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done: {filled} order item snapshots filled, {copied} legacy orders copied, "
+                f"{phones} phone numbers normalized."
+            )
+        )
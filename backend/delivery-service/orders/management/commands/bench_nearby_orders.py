@@ -0,0 +1,75 @@
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from orders.models import Order
+from orders.services.nearby import NEARBY_FIELDS, haversine_km, nearest_ready_orders
+from restaurant.management.benchmarking import format_timing, rolled_back, timed
+
+# Kyiv; orders are spread over a ~30 km wide square around it.
+CENTER = (50.4501, 30.5234)
+SPREAD = 0.14
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the courier's nearest-ready-orders lookup against computing the distance to every "
+        "ready order in Python, at 10k ready orders by default. All seeded orders are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=10_000, help="Ready orders to seed.")
+        parser.add_argument("--limit", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=100)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)  # noqa: S311 - deterministic benchmark data
+        with rolled_back():
+            self.stdout.write(f"Seeding {options['orders']} ready orders...")
+            self.seed(rng, options["orders"])
+            positions = [self.position(rng) for _ in range(options["repeat"])]
+            self.run_case(
+                "bounding box + index", positions, lambda lat, lon: nearest_ready_orders(lat, lon, options["limit"])
+            )
+            self.run_case("haversine over every row", positions, lambda lat, lon: self.scan(lat, lon, options["limit"]))
+
+    def position(self, rng):
+        return CENTER[0] + rng.uniform(-SPREAD, SPREAD), CENTER[1] + rng.uniform(-SPREAD, SPREAD)
+
+    def seed(self, rng, count):
+        orders = []
+        for index in range(count):
+            latitude, longitude = self.position(rng)
+            orders.append(
+                Order(
+                    phone="0501234567",
+                    delivery_address=f"Bench street {index}",
+                    latitude=latitude,
+                    longitude=longitude,
+                    status=Order.Status.WAITING_FOR_COURIER,
+                )
+            )
+        Order.objects.bulk_create(orders, batch_size=2000)
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE orders_order")
+
+    def scan(self, latitude, longitude, limit):
+        rows = Order.objects.filter(status=Order.Status.WAITING_FOR_COURIER, latitude__isnull=False).values(
+            *NEARBY_FIELDS
+        )
+        for row in rows:
+            row["distance_km"] = haversine_km(latitude, longitude, row["latitude"], row["longitude"])
+        return sorted(rows, key=lambda row: row["distance_km"])[:limit]
+
+    def run_case(self, label, positions, lookup):
+        remaining = iter(positions * 2)
+
+        def run():
+            return lookup(*next(remaining))
+
+        with CaptureQueriesContext(connection) as queries:
+            run()
+        median, p95, _ = timed(run, len(positions))
+        self.stdout.write(format_timing(label, median, p95, f"{len(queries)} statements"))
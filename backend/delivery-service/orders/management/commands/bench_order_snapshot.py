@@ -0,0 +1,99 @@
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Max
+from django.utils import timezone
+from orders.models import Order
+from orders.services.analytics import standard_report
+from orders.services.snapshots import CHUNK_SIZE, Snapshot, write_snapshot
+from restaurant.management.benchmarking import rolled_back, seed_menu
+
+ITEMS_PER_ORDER = 3
+BATCH_ORDERS = 10_000
+_ORDER_COLUMNS = (
+    "id, guest_name, phone, phone_e164, delivery_address, self_pickup, notes, payment_method, status, "
+    "total_amount, created_at, updated_at"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks export_order_snapshot and the standard snapshot report at 10M order items by default. "
+        "The items are seeded in steps and both are measured after every step: time, and peak Python memory "
+        "(tracemalloc), which should stay flat as the history grows. All seeded rows are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--items", type=int, default=10_000_000, help="Order items to seed in total.")
+        parser.add_argument("--steps", type=int, default=4, help="Measure after this many equal seeding steps.")
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)  # noqa: S311 - deterministic benchmark data
+        orders_per_step = options["items"] // ITEMS_PER_ORDER // options["steps"]
+        with rolled_back(), tempfile.TemporaryDirectory() as directory:
+            _, _, dishes = seed_menu(dishes=200, ingredients=0, per_dish=0)
+            # Two or three prices per dish over time, for the elasticity figures.
+            prices = {dish.id: [dish.price * Decimal(factor) for factor in ("0.9", "1", "1.15")] for dish in dishes}
+            path = os.path.join(directory, "orders.zip")
+            for _ in range(options["steps"]):
+                self.seed(rng, orders_per_step, prices)
+                self.measure(path, options["chunk_size"])
+
+    def seed(self, rng, count, prices):
+        dish_ids = list(prices)
+        now = timezone.now()
+        next_id = (Order.objects.aggregate(last=Max("id"))["last"] or 0) + 1
+        for start in range(0, count, BATCH_ORDERS):
+            orders, items = [], []
+            for order_id in range(next_id + start, next_id + min(start + BATCH_ORDERS, count)):
+                created_at = now - timedelta(minutes=rng.randrange(365 * 24 * 60))
+                total = Decimal("0.00")
+                for dish_id in rng.sample(dish_ids, ITEMS_PER_ORDER):
+                    quantity = rng.randint(1, 3)
+                    price = prices[dish_id][created_at.month % 3]
+                    total += price * quantity
+                    items.append((order_id, dish_id, "Bench dish", quantity, price, price * quantity))
+                orders.append(
+                    (order_id, "", "0501234567", "+380501234567", "Bench street 1", False, "", "cash", "completed")
+                    + (total, created_at, created_at)
+                )
+            with connection.cursor() as cursor:
+                cursor.executemany(
+                    f"INSERT INTO orders_order ({_ORDER_COLUMNS}) VALUES ({', '.join(['%s'] * 12)})",  # noqa: S608
+                    orders,
+                )
+                cursor.executemany(
+                    "INSERT INTO orders_orderitem (order_id, dish_id, name, quantity, unit_price, line_total) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)",
+                    items,
+                )
+
+    def measure(self, path, chunk_size):
+        export_s, export_peak, rows = self.traced(lambda: sum(write_snapshot(path, chunk_size)))
+
+        def report():
+            with Snapshot(path) as snapshot:
+                return standard_report(snapshot)
+
+        report_s, report_peak, _ = self.traced(report)
+        self.stdout.write(
+            f"{rows:>10} items   export {export_s:7.1f} s, peak {export_peak:6.1f} MB   "
+            f"report {report_s:7.1f} s, peak {report_peak:6.1f} MB   snapshot {os.path.getsize(path) / 2**20:7.1f} MB"
+        )
+
+    def traced(self, func):
+        tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            result = func()
+            return time.perf_counter() - started, tracemalloc.get_traced_memory()[1] / 2**20, result
+        finally:
+            tracemalloc.stop()
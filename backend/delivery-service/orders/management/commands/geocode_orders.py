@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from orders.services.geocoding import geocode_missing
+
+
+class Command(BaseCommand):
+    help = (
+        "Geocodes the delivery addresses of orders that have no position yet (placed before geocoding "
+        "existed, or missed by a background worker), through the configured ORDER_GEOCODER and its cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        seen, geocoded = geocode_missing(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Geocoded {geocoded} of {seen} orders without a position."))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from orders.services.kitchen import prune_kitchen_events
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes kitchen board deltas older than KITCHEN_EVENT_RETENTION. Screens reconnecting "
+        "after a longer outage get a snapshot instead. Run it periodically, e.g. hourly from cron."
+    )
+
+    def handle(self, *args, **options):
+        deleted = prune_kitchen_events()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} kitchen board events."))
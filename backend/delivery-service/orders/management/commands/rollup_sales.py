@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from orders.services.sales import CHUNK_HOURS, catch_up_sales, reset_sales
+
+
+class Command(BaseCommand):
+    help = (
+        "Brings the sales rollups up to date with the orders changed since its last run (the watermark): "
+        "recomputes the hours those orders were placed in, a chunk of hours per transaction. Run it "
+        "periodically, e.g. every 15 minutes from cron, and after bulk changes to orders. --since "
+        "recomputes the orders changed after a moment; --rebuild starts over from all orders, e.g. after "
+        "backfill_orders or deleting orders."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-hours", type=int, default=CHUNK_HOURS, help="Hours recomputed per transaction.")
+        group = parser.add_mutually_exclusive_group()
+        group.add_argument("--since", help="Recompute the orders changed after this ISO date/time.")
+        group.add_argument("--rebuild", action="store_true", help="Empty the rollups and recompute every order.")
+
+    def handle(self, *args, **options):
+        if options["since"]:
+            since = parse_datetime(options["since"]) or parse_datetime(f"{options['since']}T00:00")
+            if since is None:
+                raise CommandError(f"Not a date/time: {options['since']}")
+            reset_sales(timezone.make_aware(since) if timezone.is_naive(since) else since)
+        elif options["rebuild"]:
+            reset_sales()
+
+        hours = 0
+        for count in catch_up_sales(options["chunk_hours"]):
+            hours += count
+            self.stdout.write(f"Sales rollups: {hours} hours recomputed...")
+        self.stdout.write(self.style.SUCCESS(f"Done: {hours} hours recomputed."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from orders.services.idempotency import sweep_expired_keys
+
+
+class Command(BaseCommand):
+    help = (
+        "Deletes expired Idempotency-Key records (IDEMPOTENCY_KEY_TTL) in small batches. "
+        "Run it periodically, e.g. hourly from cron, to keep the table bounded."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = sweep_expired_keys(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired idempotency keys."))
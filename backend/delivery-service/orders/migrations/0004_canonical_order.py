@@ -0,0 +1,69 @@
+from decimal import Decimal
+
+import django.core.validators
+from django.db import migrations, models
+
+# orders.Order becomes the one order table (see orders.models.Order): shared column names, the
+# fields of the former restaurant.Order, and item snapshots. Only renames, nullable or defaulted
+# columns and a dropped constraint, so no table rewrite; existing items get their name and
+# line_total from `backfill_orders`, in small batches.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0003_idempotencykey"),
+        ("restaurant", "0013_legacy_orders"),
+    ]
+
+    operations = [
+        migrations.RenameField("order", "guest_phone", "phone"),
+        migrations.RenameField("order", "guest_address", "delivery_address"),
+        migrations.RenameField("order", "total_price", "total_amount"),
+        migrations.AlterField("order", "delivery_address", models.TextField(blank=True)),
+        migrations.AddField("order", "self_pickup", models.BooleanField(default=False)),
+        migrations.AddField(
+            "order",
+            "payment_method",
+            models.CharField(choices=[("credit", "Credit"), ("cash", "Cash")], default="cash", max_length=16),
+        ),
+        migrations.AlterField(
+            "order",
+            "status",
+            models.CharField(
+                choices=[
+                    ("new", "New"),
+                    ("preparing", "Preparing"),
+                    ("in_progress", "In progress"),
+                    ("waiting_for_courier", "Waiting for courier"),
+                    ("delivering", "Delivering"),
+                    ("completed", "Completed"),
+                    ("paid_credit", "Paid (credit)"),
+                    ("awaiting_cash", "Awaiting cash payment"),
+                    ("paid_cash", "Paid (cash)"),
+                ],
+                default="new",
+                max_length=32,
+            ),
+        ),
+        migrations.AddField(
+            "order", "legacy_id", models.PositiveBigIntegerField(blank=True, editable=False, null=True, unique=True)
+        ),
+        migrations.AlterUniqueTogether(name="orderitem", unique_together=set()),
+        migrations.AddField("orderitem", "name", models.CharField(blank=True, default="", max_length=200)),
+        migrations.AddField(
+            "orderitem",
+            "line_total",
+            models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.00"),
+                max_digits=12,
+                validators=[django.core.validators.MinValueValidator(Decimal("0.00"))],
+            ),
+        ),
+        migrations.AlterField(
+            "orderitem",
+            "quantity",
+            models.PositiveIntegerField(default=1, validators=[django.core.validators.MinValueValidator(1)]),
+        ),
+    ]
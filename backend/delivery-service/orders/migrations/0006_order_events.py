@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+# Every new order and every status change is announced on the 'order_events' channel by a trigger,
+# so writes from the admin, queryset.update() and raw SQL are covered too, without an extra round
+# trip from the application. NOTIFY is transactional: listeners only see committed changes.
+# Rows copied by backfill_orders (legacy_id set) are not announced.
+CREATE_NOTIFY_SQL = [
+    """
+    CREATE OR REPLACE FUNCTION orders_order_notify() RETURNS trigger AS $$
+    BEGIN
+        PERFORM pg_notify('order_events', json_build_object(
+            'id', NEW.id,
+            'status', NEW.status,
+            'previous_status', CASE WHEN TG_OP = 'UPDATE' THEN OLD.status END,
+            'courier_id', NEW.courier_id,
+            'self_pickup', NEW.self_pickup,
+            'delivery_address', left(NEW.delivery_address, 1000),
+            'total_amount', NEW.total_amount::text,
+            'created_at', NEW.created_at
+        )::text);
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER orders_order_notify_insert
+    AFTER INSERT ON orders_order
+    FOR EACH ROW WHEN (NEW.legacy_id IS NULL) EXECUTE FUNCTION orders_order_notify()
+    """,
+    """
+    CREATE TRIGGER orders_order_notify_status
+    AFTER UPDATE OF status ON orders_order
+    FOR EACH ROW WHEN (OLD.status IS DISTINCT FROM NEW.status) EXECUTE FUNCTION orders_order_notify()
+    """,
+]
+
+DROP_NOTIFY_SQL = [
+    "DROP TRIGGER IF EXISTS orders_order_notify_status ON orders_order",
+    "DROP TRIGGER IF EXISTS orders_order_notify_insert ON orders_order",
+    "DROP FUNCTION IF EXISTS orders_order_notify()",
+]
+
+
+def create_notify_trigger(apps, schema_editor):
+    """
+    PostgreSQL only: elsewhere (e.g. SQLite for quick local runs) events are published in-process.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in CREATE_NOTIFY_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_notify_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in DROP_NOTIFY_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0005_order_courier"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("status", "waiting_for_courier")), fields=["created_at"], name="order_ready_idx"
+            ),
+        ),
+        migrations.RunPython(create_notify_trigger, drop_notify_trigger),
+    ]
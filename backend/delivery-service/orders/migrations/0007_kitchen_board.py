@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:50
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0006_order_events"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="notes",
+            field=models.TextField(blank=True),
+        ),
+        migrations.CreateModel(
+            name="KitchenEvent",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("created", "Created"),
+                            ("status_changed", "Status changed"),
+                            ("items_changed", "Items changed"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("payload", models.JSONField(encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                (
+                    "order",
+                    models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="+", to="orders.order"),
+                ),
+            ],
+        ),
+    ]
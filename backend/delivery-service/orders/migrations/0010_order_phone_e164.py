@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0009_order_history_index"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="phone_e164",
+            field=models.CharField(blank=True, editable=False, max_length=16),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("phone_e164", ""), _negated=True),
+                fields=["phone_e164", "-created_at", "-id"],
+                name="order_phone_idx",
+            ),
+        ),
+    ]
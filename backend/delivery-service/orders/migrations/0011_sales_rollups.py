@@ -0,0 +1,97 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:13
+
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0010_order_phone_e164"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollupWatermark",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=64, unique=True)),
+                ("position", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="SalesDaily",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("new", "New"),
+                            ("preparing", "Preparing"),
+                            ("in_progress", "In progress"),
+                            ("waiting_for_courier", "Waiting for courier"),
+                            ("delivering", "Delivering"),
+                            ("completed", "Completed"),
+                            ("paid_credit", "Paid (credit)"),
+                            ("awaiting_cash", "Awaiting cash payment"),
+                            ("paid_cash", "Paid (cash)"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("payment_method", models.CharField(choices=[("credit", "Credit"), ("cash", "Cash")], max_length=16)),
+                ("category_id", models.PositiveIntegerField(default=0)),
+                ("dish_id", models.PositiveIntegerField(default=0)),
+                ("orders", models.IntegerField(default=0)),
+                ("quantity", models.IntegerField(default=0)),
+                ("revenue", models.DecimalField(decimal_places=2, default=Decimal("0.00"), max_digits=14)),
+                ("day", models.DateField()),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("day", "status", "payment_method", "category_id", "dish_id"), name="sales_daily_unique"
+                    )
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="SalesHourly",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("new", "New"),
+                            ("preparing", "Preparing"),
+                            ("in_progress", "In progress"),
+                            ("waiting_for_courier", "Waiting for courier"),
+                            ("delivering", "Delivering"),
+                            ("completed", "Completed"),
+                            ("paid_credit", "Paid (credit)"),
+                            ("awaiting_cash", "Awaiting cash payment"),
+                            ("paid_cash", "Paid (cash)"),
+                        ],
+                        max_length=32,
+                    ),
+                ),
+                ("payment_method", models.CharField(choices=[("credit", "Credit"), ("cash", "Cash")], max_length=16)),
+                ("category_id", models.PositiveIntegerField(default=0)),
+                ("dish_id", models.PositiveIntegerField(default=0)),
+                ("orders", models.IntegerField(default=0)),
+                ("quantity", models.IntegerField(default=0)),
+                ("revenue", models.DecimalField(decimal_places=2, default=Decimal("0.00"), max_digits=14)),
+                ("hour", models.DateTimeField()),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("hour", "status", "payment_method", "category_id", "dish_id"),
+                        name="sales_hourly_unique",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -1,17 +1,34 @@
 from decimal import Decimal
 
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MinValueValidator
 from django.db import models
 from restaurant.models import Dish
 
 
 class Order(models.Model):
+    """
+    The one order table. Both order APIs are views over it: /api/v0/orders/ (users and guests,
+    orders/serializers/orders.py) and /api/v0/menu/orders/ (phone orders with a payment method,
+    restaurant/serializers/orders.py). Orders of the former restaurant.Order table are copied in by
+    `python manage.py backfill_orders` and keep their old id in legacy_id.
+    """
+
     class Status(models.TextChoices):
         NEW = "new", "New"
         PREPARING = "preparing", "Preparing"
+        IN_PROGRESS = "in_progress", "In progress"
+        WAITING_FOR_COURIER = "waiting_for_courier", "Waiting for courier"
         DELIVERING = "delivering", "Delivering"
         COMPLETED = "completed", "Completed"
+        PAID_CREDIT = "paid_credit", "Paid (credit)"
+        AWAITING_CASH = "awaiting_cash", "Awaiting cash payment"
+        PAID_CASH = "paid_cash", "Paid (cash)"
+
+    class PaymentMethod(models.TextChoices):
+        CREDIT = "credit", "Credit"
+        CASH = "cash", "Cash"
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -22,11 +39,31 @@ class Order(models.Model):
     )
 
     guest_name = models.CharField(max_length=255, blank=True)
-    guest_phone = models.CharField(max_length=50, blank=True)
-    guest_address = models.CharField(max_length=500, blank=True)
+    phone = models.CharField(max_length=50, blank=True)
+    # 'phone' in E.164, for lookups (orders/services/phones.py); empty when it isn't a valid number.
+    phone_e164 = models.CharField(max_length=16, blank=True, editable=False)
+    # Empty for self pickup.
+    delivery_address = models.TextField(blank=True)
+    self_pickup = models.BooleanField(default=False)
+    # Geocoded from delivery_address after the order is placed (orders/services/geocoding.py);
+    # empty for self pickup and for addresses the geocoder doesn't know.
+    latitude = models.FloatField(null=True, blank=True, editable=False)
+    longitude = models.FloatField(null=True, blank=True, editable=False)
+    # For the kitchen: allergies, "no onions", etc. Shown on the kitchen board.
+    notes = models.TextField(blank=True)
+    payment_method = models.CharField(max_length=16, choices=PaymentMethod.choices, default=PaymentMethod.CASH)
 
-    status = models.CharField(max_length=20, choices=Status.choices, default=Status.NEW)
-    total_price = models.DecimalField(
+    status = models.CharField(max_length=32, choices=Status.choices, default=Status.NEW)
+    # Set when a courier takes the order (orders/services/transitions.py).
+    courier = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="deliveries",
+    )
+    # Sum of the items' line_total, written together with the order.
+    total_amount = models.DecimalField(
         max_digits=10,
         decimal_places=2,
         default=Decimal("0.00"),
@@ -34,24 +71,193 @@ class Order(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Id of the restaurant_order row this order was copied from by backfill_orders.
+    legacy_id = models.PositiveBigIntegerField(null=True, blank=True, unique=True, editable=False)
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # The courier feed's snapshot of orders ready for pickup (orders/views/feed.py).
+            models.Index(
+                fields=["created_at"], condition=models.Q(status="waiting_for_courier"), name="order_ready_idx"
+            ),
+            # Order history pages (GET /api/v0/orders/mine/): a range scan in keyset order; the summary
+            # columns are included, so ?view=summary pages are index-only scans on PostgreSQL.
+            models.Index(
+                fields=["user", "-created_at", "-id"],
+                include=["status", "total_amount"],
+                name="order_user_history_idx",
+            ),
+            # Restaurant order lookup by phone (GET /api/v0/menu/orders/?phone=), in keyset order.
+            models.Index(
+                fields=["phone_e164", "-created_at", "-id"],
+                condition=~models.Q(phone_e164=""),
+                name="order_phone_idx",
+            ),
+            # Bounding-box lookups of the ready orders nearest to a courier (orders/services/nearby.py).
+            models.Index(
+                fields=["latitude", "longitude"],
+                condition=models.Q(status="waiting_for_courier", latitude__isnull=False),
+                name="order_ready_position_idx",
+            ),
+        ]
 
     def __str__(self):
         if self.user:
             return f"Order #{self.id} — {self.get_status_display()} — User {self.user.email}"
-        return f"Order #{self.id} — {self.get_status_display()} — Guest {self.guest_name}"
+        if self.guest_name:
+            return f"Order #{self.id} — {self.get_status_display()} — Guest {self.guest_name}"
+        return f"Order #{self.id} — {self.get_status_display()} — {self.phone}"
+
+    def placement_status(self):
+        """
+        The status a new order starts in: self pickup orders are paid for instantly
+        (PAID_CREDIT or, by default, PAID_CASH), everything else starts as NEW.
+        """
+        if not self.self_pickup:
+            return self.Status.NEW
+        if self.payment_method == self.PaymentMethod.CREDIT:
+            return self.Status.PAID_CREDIT
+        return self.Status.PAID_CASH
 
 
 class OrderItem(models.Model):
+    """
+    One line of an order. Name and unit price are snapshots taken when the order was placed.
+    A dish may appear on several lines.
+    """
+
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
     dish = models.ForeignKey(Dish, on_delete=models.PROTECT, related_name="order_items")
-    quantity = models.PositiveIntegerField(validators=[MinValueValidator(1)])
+    name = models.CharField(max_length=200, blank=True, default="")
+    quantity = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
     unit_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(Decimal("0.00"))])
+    line_total = models.DecimalField(
+        max_digits=12, decimal_places=2, default=Decimal("0.00"), validators=[MinValueValidator(Decimal("0.00"))]
+    )
+
+    def __str__(self):
+        return f"{self.name or self.dish.name} x{self.quantity}"
+
+    def save(self, *args, **kwargs):
+        # ensure line_total is consistent
+        self.line_total = (self.unit_price or Decimal("0.00")) * Decimal(self.quantity)
+        super().save(*args, **kwargs)
+
+
+class KitchenEvent(models.Model):
+    """
+    A change to the kitchen board, numbered by id: the sequence number a reconnecting board
+    screen resumes from (orders/services/kitchen.py). Pruned by prune_kitchen_events.
+    """
+
+    class Kind(models.TextChoices):
+        CREATED = "created", "Created"
+        STATUS_CHANGED = "status_changed", "Status changed"
+        ITEMS_CHANGED = "items_changed", "Items changed"
+
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="+")
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    # What the board receives: the whole order for "created" / "items_changed", id and status otherwise.
+    payload = models.JSONField(encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"#{self.id} {self.kind} order {self.order_id}"
+
+
+class IdempotencyKey(models.Model):
+    """
+    An Idempotency-Key sent with an order creation request, and the response it got.
+    A retry with the same key and body gets the stored response instead of a second order
+    (see orders/services/idempotency.py). Rows expire and are removed by sweep_idempotency_keys.
+    """
+
+    # Which endpoint and which client the key belongs to: keys are only unique per client.
+    scope = models.CharField(max_length=64)
+    owner = models.CharField(max_length=64)
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    # Both empty while the first request is still running.
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    # While it runs, the request holds the key until then; a retry may take over a key whose
+    # request died without a response. Empty once the response is stored.
+    locked_until = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
 
     class Meta:
-        unique_together = ("order", "dish")
+        constraints = [
+            models.UniqueConstraint(fields=["scope", "owner", "key"], name="idempotency_key_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"], name="idempotency_key_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.scope} {self.owner} {self.key}"
+
+
+class SalesRollup(models.Model):
+    """
+    Sales of one period per order status and payment method, at three levels: whole orders
+    (category_id = dish_id = 0), per category (dish_id = 0) and per dish. 'orders' counts the
+    orders at that level, so an order with two pizzas counts once for Pizza. Kept up to date by
+    orders/services/sales.py; sales reports read nothing else.
+    """
+
+    status = models.CharField(max_length=32, choices=Order.Status.choices)
+    payment_method = models.CharField(max_length=16, choices=Order.PaymentMethod.choices)
+    # Plain ids rather than foreign keys: 0 stands for "all", and rows outlive menu changes.
+    category_id = models.PositiveIntegerField(default=0)
+    dish_id = models.PositiveIntegerField(default=0)
+    orders = models.IntegerField(default=0)
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        abstract = True
+
+
+class SalesHourly(SalesRollup):
+    # Start of the hour the orders were placed in.
+    hour = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["hour", "status", "payment_method", "category_id", "dish_id"], name="sales_hourly_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.hour:%Y-%m-%d %H:00} {self.status} {self.payment_method} {self.category_id}/{self.dish_id}"
+
+
+class SalesDaily(SalesRollup):
+    # The local date (TIME_ZONE) the orders were placed on.
+    day = models.DateField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "status", "payment_method", "category_id", "dish_id"], name="sales_daily_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.day} {self.status} {self.payment_method} {self.category_id}/{self.dish_id}"
+
+
+class RollupWatermark(models.Model):
+    """
+    How far a rollup's catch-up got: orders changed (updated_at) up to 'position' are reflected in
+    it. Empty until the first run, which then covers every order.
+    """
+
+    name = models.CharField(max_length=64, unique=True)
+    position = models.DateTimeField(null=True, blank=True)
 
     def __str__(self):
-        return f"{self.dish.name} x{self.quantity}"
+        return f"{self.name} @ {self.position}"
@@ -0,0 +1,6 @@
+from django.urls import path
+from orders.consumers import KitchenBoardConsumer
+
+websocket_urlpatterns = [
+    path("ws/kitchen/", KitchenBoardConsumer.as_asgi()),
+]
@@ -2,6 +2,7 @@ from collections import Counter
 
 from orders.models import Order, OrderItem
 from orders.services.orders import create_order
+from orders.services.sales import GROUPS
 from rest_framework import serializers
 from restaurant.models import Dish
 
@@ -19,8 +20,10 @@ class OrderItemSerializer(serializers.ModelSerializer):
 class OrderSerializer(serializers.ModelSerializer):
     user_id = serializers.IntegerField(source="user.id", read_only=True)
     guest_name = serializers.CharField(required=False, allow_blank=True)
-    guest_phone = serializers.CharField(required=False, allow_blank=True)
-    guest_address = serializers.CharField(required=False, allow_blank=True)
+    # This API's names for the shared order columns.
+    guest_phone = serializers.CharField(source="phone", max_length=50, required=False, allow_blank=True)
+    guest_address = serializers.CharField(source="delivery_address", max_length=500, required=False, allow_blank=True)
+    total_price = serializers.DecimalField(source="total_amount", max_digits=10, decimal_places=2, read_only=True)
 
     items = OrderItemSerializer(many=True, read_only=True)
     dishes = serializers.ListField(child=serializers.IntegerField(min_value=1), write_only=True)
@@ -33,6 +36,7 @@ class OrderSerializer(serializers.ModelSerializer):
             "guest_name",
             "guest_phone",
             "guest_address",
+            "notes",
             "status",
             "total_price",
             "items",
@@ -48,7 +52,7 @@ class OrderSerializer(serializers.ModelSerializer):
         if request.user.is_authenticated:
             validated_data["user"] = request.user
         else:
-            if not validated_data.get("guest_name") or not validated_data.get("guest_phone"):
+            if not validated_data.get("guest_name") or not validated_data.get("phone"):
                 raise serializers.ValidationError("Guest orders require 'guest_name' and 'guest_phone'.")
 
         dish_ids = validated_data.pop("dishes", [])
@@ -71,3 +75,44 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
         validated_data["items_data"] = items_data
         return create_order(validated_data)
+
+
+class OrderSummarySerializer(serializers.ModelSerializer):
+    """Order history rows without the items (GET /api/v0/orders/mine/?view=summary)."""
+
+    total_price = serializers.DecimalField(source="total_amount", max_digits=10, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = Order
+        fields = ["id", "status", "total_price", "created_at"]
+        read_only_fields = fields
+
+
+class OrderTransitionSerializer(serializers.Serializer):
+    status = serializers.ChoiceField(choices=Order.Status.choices)
+    # The status the client last saw: the move only happens if the order is still in it.
+    expected_status = serializers.ChoiceField(choices=Order.Status.choices, required=False)
+
+
+class CourierPositionSerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lon = serializers.FloatField(min_value=-180, max_value=180)
+
+
+class NearbyOrdersSerializer(CourierPositionSerializer):
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+
+
+class SalesReportSerializer(serializers.Serializer):
+    # Dates mean their midnight; the rollups are hourly, so the period is made of whole hours.
+    start = serializers.DateTimeField(input_formats=["iso-8601", "%Y-%m-%d"])
+    end = serializers.DateTimeField(input_formats=["iso-8601", "%Y-%m-%d"])
+    group_by = serializers.ChoiceField(choices=GROUPS, required=False)
+    status = serializers.ChoiceField(choices=Order.Status.choices, required=False)
+
+    def validate(self, data):
+        if any(data[name].minute or data[name].second or data[name].microsecond for name in ("start", "end")):
+            raise serializers.ValidationError("start and end must be whole hours.")
+        if data["start"] >= data["end"]:
+            raise serializers.ValidationError("end must be after start.")
+        return data
@@ -0,0 +1,122 @@
+import math
+from collections import Counter, defaultdict
+from decimal import Decimal
+
+import numpy as np
+
+# Standard aggregates over an order snapshot (orders/services/snapshots.py), for analysts.
+#
+# One pass over the row groups, reading only the columns the aggregates need. Each group's column
+# buffers are mapped into NumPy as they are stored (numpy.frombuffer, no copy) and aggregated with
+# whole-array operations (add.at, reduceat, unique), so no Python code runs per row. Memory is one
+# row group plus the results, whatever the size of the history.
+#
+#   * totals: orders, order lines, items and revenue;
+#   * revenue by hour of week (TIME_ZONE, Monday 00:00 first);
+#   * basket sizes: how many orders had 1, 2, 3... items;
+#   * price elasticity per dish, for dishes sold at two or more prices: the least-squares slope of
+#     ln(items sold per day) over ln(price). The days at a price are the span between its first and
+#     last sale, so this assumes each price held for one stretch of time.
+
+DAY = 86_400
+DAYS = ("Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun")
+COLUMNS = ("order_id", "created_at", "hour_of_week", "dish_id", "quantity", "unit_price", "line_total")
+
+
+def _money(cents):
+    return f"{Decimal(cents) / 100:.2f}"
+
+
+def column_groups(snapshot, *columns):
+    """Yields every row group of 'snapshot' as {column: read-only NumPy array}."""
+    order = "<" if snapshot.byteorder == "little" else ">"
+    dtypes = {name: np.dtype(snapshot.typecode(name)).newbyteorder(order) for name in columns}
+    for buffers in snapshot.raw_row_groups(*columns):
+        yield {name: np.frombuffer(buffer, dtype=dtypes[name]) for name, buffer in buffers.items()}
+
+
+def standard_report(snapshot):
+    orders = lines = items = revenue = 0
+    by_hour = np.zeros(168, dtype=np.int64)
+    baskets = Counter()
+    # (dish_id, unit_price) -> [items, first day, last day]
+    prices = {}
+    # The last order of the previous group and its items so far: its lines may go on in this one.
+    current, basket = None, 0
+
+    for group in column_groups(snapshot, *COLUMNS):
+        order_id, quantity, line_total = group["order_id"], group["quantity"].astype(np.int64), group["line_total"]
+        if not len(order_id):
+            continue
+        lines += len(order_id)
+        items += int(quantity.sum())
+        revenue += int(line_total.sum())
+        np.add.at(by_hour, group["hour_of_week"], line_total)
+
+        # Rows come in order_id order: an order's lines are next to each other, across groups too.
+        starts = np.flatnonzero(np.concatenate(([True], order_id[1:] != order_id[:-1])))
+        sizes = np.add.reduceat(quantity, starts)
+        if int(order_id[0]) == current:
+            sizes[0] += basket
+            orders -= 1
+        elif current is not None:
+            baskets[basket] += 1
+        orders += len(starts)
+        current, basket = int(order_id[-1]), int(sizes[-1])
+        for size, count in zip(*np.unique(sizes[:-1], return_counts=True), strict=True):
+            baskets[int(size)] += int(count)
+
+        _add_price_points(prices, group["dish_id"], group["unit_price"], quantity, group["created_at"] // DAY)
+    if current is not None:
+        baskets[basket] += 1
+
+    return {
+        "rows": snapshot.rows,
+        "totals": {"orders": orders, "lines": lines, "items": items, "revenue": _money(revenue)},
+        "revenue_by_hour_of_week": [
+            {"day": DAYS[hour // 24], "hour": hour % 24, "revenue": _money(int(cents))}
+            for hour, cents in enumerate(by_hour)
+        ],
+        "basket_sizes": [{"items": size, "orders": count} for size, count in sorted(baskets.items())],
+        "price_elasticity": price_elasticity(prices),
+    }
+
+
+def _add_price_points(prices, dish_id, unit_price, quantity, day):
+    """Merges one group's (dish_id, unit_price) -> [items, first day, last day] into 'prices'."""
+    keys, point = np.unique(np.stack((dish_id, unit_price), axis=1), axis=0, return_inverse=True)
+    point = point.ravel()
+    sold = np.zeros(len(keys), dtype=np.int64)
+    np.add.at(sold, point, quantity)
+    first = np.full(len(keys), np.iinfo(np.int64).max)
+    last = np.full(len(keys), np.iinfo(np.int64).min)
+    np.minimum.at(first, point, day)
+    np.maximum.at(last, point, day)
+    for (dish, price), count, low, high in zip(
+        keys.tolist(), sold.tolist(), first.tolist(), last.tolist(), strict=True
+    ):
+        known = prices.get((dish, price))
+        if known is None:
+            prices[(dish, price)] = [count, low, high]
+        else:
+            known[0] += count
+            known[1] = min(known[1], low)
+            known[2] = max(known[2], high)
+
+
+def price_elasticity(prices):
+    """{(dish_id, price in cents): [items, first day, last day]} -> [{"dish_id", "prices", "elasticity"}]."""
+    points = defaultdict(list)
+    for (dish_id, unit_price), (quantity, first, last) in prices.items():
+        if unit_price > 0 and quantity > 0:
+            points[dish_id].append((math.log(unit_price), math.log(quantity / (last - first + 1))))
+    result = []
+    for dish_id, dish_points in sorted(points.items()):
+        if len(dish_points) < 2:
+            continue
+        mean_x = sum(x for x, _ in dish_points) / len(dish_points)
+        mean_y = sum(y for _, y in dish_points) / len(dish_points)
+        spread = sum((x - mean_x) ** 2 for x, _ in dish_points)
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in dish_points) / spread
+        result.append({"dish_id": dish_id, "prices": len(dish_points), "elasticity": round(slope, 3)})
+    return result
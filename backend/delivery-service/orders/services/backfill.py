@@ -0,0 +1,97 @@
+from django.db import connection, transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Max, OuterRef, Subquery
+from orders.models import Order, OrderItem
+from orders.services.phones import normalize_phone
+from restaurant.models import Dish, LegacyOrder
+
+# Moving the historical rows into the one order table (orders.Order, see its docstring).
+#
+# The steps work in primary key order, one short transaction per chunk, so they never hold
+# long locks, can run next to live traffic and can be stopped at any point: a new run resumes
+# after the last finished chunk.
+#   * backfill_item_snapshots(): items written before OrderItem had name / line_total.
+#   * copy_legacy_orders(): restaurant_order / restaurant_orderitem rows, with their timestamps,
+#     one INSERT ... SELECT per table and chunk. The copies keep the old id in legacy_id, which
+#     also marks how far the copy got.
+#   * backfill_phone_numbers(): the E.164 phone_e164 of orders written before it existed (and of
+#     the copies above), normalized in Python.
+
+_COPY_ORDERS_SQL = """
+    INSERT INTO orders_order (
+        guest_name, phone, phone_e164, delivery_address, self_pickup, notes, payment_method,
+        status, total_amount, created_at, updated_at, legacy_id
+    )
+    SELECT
+        '', phone, '', COALESCE(delivery_address, ''), self_pickup, '', payment_method,
+        status, total_amount, created_at, updated_at, id
+    FROM restaurant_order
+    WHERE id BETWEEN %s AND %s
+    ORDER BY id
+"""
+
+_COPY_ITEMS_SQL = """
+    INSERT INTO orders_orderitem (order_id, dish_id, name, unit_price, quantity, line_total)
+    SELECT o.id, i.dish_id, i.name, i.unit_price, i.quantity, i.line_total
+    FROM restaurant_orderitem i
+    JOIN orders_order o ON o.legacy_id = i.order_id
+    WHERE i.order_id BETWEEN %s AND %s
+    ORDER BY i.id
+"""
+
+
+def _next_chunk(queryset, after, chunk_size):
+    return list(queryset.filter(pk__gt=after).order_by("pk").values_list("pk", flat=True)[:chunk_size])
+
+
+def backfill_item_snapshots(chunk_size=1000):
+    """
+    Fills the dish name and line_total of order items that have none. Yields the number of
+    items updated per chunk.
+    """
+    last_id = 0
+    while chunk := _next_chunk(OrderItem.objects.filter(name=""), last_id, chunk_size):
+        OrderItem.objects.filter(pk__in=chunk, name="").update(
+            name=Subquery(Dish.objects.filter(pk=OuterRef("dish_id")).values("name")[:1]),
+            line_total=ExpressionWrapper(
+                F("unit_price") * F("quantity"), output_field=DecimalField(max_digits=12, decimal_places=2)
+            ),
+        )
+        last_id = chunk[-1]
+        yield len(chunk)
+
+
+def pending_legacy_orders():
+    """The legacy orders copy_legacy_orders() hasn't copied yet."""
+    copied_up_to = Order.objects.aggregate(last=Max("legacy_id"))["last"] or 0
+    return LegacyOrder.objects.filter(pk__gt=copied_up_to)
+
+
+def copy_legacy_orders(chunk_size=1000):
+    """
+    Copies the legacy orders and their items into orders.Order / OrderItem. Yields the number
+    of orders copied per chunk.
+    """
+    last_id = 0
+    while chunk := _next_chunk(pending_legacy_orders(), last_id, chunk_size):
+        # Orders and their items land together, or (on any error) not at all.
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(_COPY_ORDERS_SQL, [chunk[0], chunk[-1]])
+            cursor.execute(_COPY_ITEMS_SQL, [chunk[0], chunk[-1]])
+        last_id = chunk[-1]
+        yield len(chunk)
+
+
+def backfill_phone_numbers(chunk_size=1000):
+    """
+    Fills phone_e164 of the orders that have a phone but no normalized one. Yields the number of
+    orders looked at per chunk (numbers that can't be normalized stay empty).
+    """
+    last_id = 0
+    pending = Order.objects.filter(phone_e164="").exclude(phone="")
+    while chunk := list(pending.filter(pk__gt=last_id).order_by("pk").only("pk", "phone")[:chunk_size]):
+        for order in chunk:
+            order.phone_e164 = normalize_phone(order.phone) or ""
+        with transaction.atomic():
+            Order.objects.bulk_update([order for order in chunk if order.phone_e164], ["phone_e164"])
+        last_id = chunk[-1].pk
+        yield len(chunk)
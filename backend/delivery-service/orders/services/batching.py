@@ -0,0 +1,129 @@
+import time
+
+from django.conf import settings
+from orders.services.nearby import haversine_km, nearest_ready_orders
+
+# Multi-stop delivery batches for a courier (FR-053).
+#
+# The candidates are the ready orders nearest to the courier (orders/services/nearby.py). With a
+# distance matrix over them, computed once per request, batches are built one after another:
+#   * nearest neighbour: from the courier's position, keep driving to the nearest candidate left
+#     while the batch has room (ORDER_BATCH_CAPACITY) and the route still fits ORDER_BATCH_MAX_MINUTES;
+#   * 2-opt: reverse stretches of the route while that shortens it. The stops stay the same, so
+#     the route only gets shorter and keeps fitting the limits.
+# All of it runs against a CPU time budget (ORDER_BATCH_CPU_MS): when it is spent, 2-opt stops
+# improving and the batches found so far are returned as they are, so planning time stays flat
+# however busy the restaurant is.
+#
+# Travel time is distance over COURIER_SPEED_KMH plus STOP_MINUTES for every handover; distances
+# are great-circle, not road distances.
+
+COURIER_SPEED_KMH = 20
+STOP_MINUTES = 3
+CANDIDATES = 30
+MAX_BATCHES = 3
+
+
+def distance_matrix(points):
+    """Symmetric matrix of haversine distances (km) between (latitude, longitude) points."""
+    matrix = [[0.0] * len(points) for _ in points]
+    for i, first in enumerate(points):
+        for j in range(i + 1, len(points)):
+            matrix[i][j] = matrix[j][i] = haversine_km(*first, *points[j])
+    return matrix
+
+
+def route_minutes(distance_km, stops):
+    return distance_km / COURIER_SPEED_KMH * 60 + stops * STOP_MINUTES
+
+
+def route_length(matrix, route):
+    """Length of the path from point 0 (the courier) through 'route'."""
+    path = [0, *route]
+    return sum(matrix[a][b] for a, b in zip(path, path[1:]))
+
+
+def nearest_neighbour(matrix, remaining, capacity, max_minutes):
+    """Greedy route from point 0 over the points in 'remaining' (a set), within the limits."""
+    route, current, distance = [], 0, 0.0
+    while remaining and len(route) < capacity:
+        nearest = min(remaining, key=lambda point: (matrix[current][point], point))
+        if route_minutes(distance + matrix[current][nearest], len(route) + 1) > max_minutes:
+            break
+        distance += matrix[current][nearest]
+        route.append(nearest)
+        remaining.discard(nearest)
+        current = nearest
+    return route
+
+
+def two_opt(matrix, route, deadline):
+    """
+    Shortens the open path 0 → route by reversing segments until no reversal helps or the
+    thread's CPU time passes 'deadline'. Returns (route, finished).
+    """
+    path = [0, *route]
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(path) - 1):
+            if time.thread_time() > deadline:
+                return path[1:], False
+            for j in range(i + 1, len(path)):
+                # Reversing path[i..j] replaces the edges (i-1, i) and (j, j+1) with (i-1, j) and (i, j+1).
+                before = matrix[path[i - 1]][path[i]]
+                after = matrix[path[i - 1]][path[j]]
+                if j + 1 < len(path):
+                    before += matrix[path[j]][path[j + 1]]
+                    after += matrix[path[i]][path[j + 1]]
+                if after < before - 1e-9:
+                    path[i : j + 1] = reversed(path[i : j + 1])
+                    improved = True
+    return path[1:], True
+
+
+def plan_batches(latitude, longitude, capacity=None, max_minutes=None, cpu_ms=None):
+    """
+    Proposes up to MAX_BATCHES disjoint batches of ready orders for a courier at (latitude,
+    longitude), nearest first. Returns {"batches": [...], "optimized": whether 2-opt finished for all}.
+    """
+    capacity = capacity or settings.ORDER_BATCH_CAPACITY
+    max_minutes = max_minutes or settings.ORDER_BATCH_MAX_MINUTES
+    deadline = time.thread_time() + (cpu_ms or settings.ORDER_BATCH_CPU_MS) / 1000
+
+    candidates = nearest_ready_orders(latitude, longitude, limit=CANDIDATES)
+    matrix = distance_matrix(
+        [(latitude, longitude)] + [(order["latitude"], order["longitude"]) for order in candidates]
+    )
+    remaining = set(range(1, len(matrix)))
+    batches, optimized = [], True
+    while remaining and len(batches) < MAX_BATCHES:
+        route = nearest_neighbour(matrix, remaining, capacity, max_minutes)
+        if not route:
+            break
+        route, finished = two_opt(matrix, route, deadline)
+        optimized = optimized and finished
+        batches.append(_batch(matrix, route, candidates))
+    return {"batches": batches, "optimized": optimized}
+
+
+def _batch(matrix, route, candidates):
+    path = [0, *route]
+    stops = []
+    for previous, point in zip(path, path[1:]):
+        order = candidates[point - 1]
+        stops.append(
+            {
+                "id": order["id"],
+                "delivery_address": order["delivery_address"],
+                "latitude": order["latitude"],
+                "longitude": order["longitude"],
+                "leg_km": round(matrix[previous][point], 3),
+            }
+        )
+    distance = route_length(matrix, route)
+    return {
+        "orders": stops,
+        "distance_km": round(distance, 3),
+        "minutes": round(route_minutes(distance, len(route)), 1),
+    }
@@ -0,0 +1,121 @@
+import asyncio
+import json
+import logging
+
+import psycopg
+from django.db import connection, connections, transaction
+from orders.models import Order
+
+logger = logging.getLogger(__name__)
+
+# Order events for the real-time feeds.
+#
+# On PostgreSQL a trigger (orders migration 0006) sends every new order and status change with
+# NOTIFY on ORDER_EVENTS_CHANNEL. Each process keeps ONE listening connection, owned by `broker`,
+# and fans the events out to its subscribers: an asyncio queue per connected client, so thousands
+# of idle clients cost no database connections. Elsewhere (SQLite for quick local runs) the
+# services publish their own changes to the broker of the same process.
+#
+# A subscriber too slow to keep up never blocks the others: when its queue is full, its backlog
+# is dropped and replaced by RESYNC, telling the stream to send a fresh snapshot instead. The
+# same happens to everyone after the listener (re)connects, since events may have been missed.
+
+ORDER_EVENTS_CHANNEL = "order_events"
+# Fields of an order event, the same as the trigger's payload.
+ORDER_EVENT_FIELDS = ("id", "status", "courier_id", "self_pickup", "delivery_address", "total_amount", "created_at")
+RESYNC = object()
+_LISTEN_RETRY_MAX = 30
+
+
+class Subscription:
+    def __init__(self, maxsize):
+        self.queue = asyncio.Queue(maxsize)
+
+    def push(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout):
+        """The next event, RESYNC, or TimeoutError after 'timeout' seconds without one."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class OrderEventBroker:
+    def __init__(self):
+        self.subscribers = set()
+        self._loop = None
+        self._listener = None
+
+    def subscribe(self, maxsize):
+        """Registers a subscriber on the running event loop (starting the listener if needed)."""
+        self._loop = asyncio.get_running_loop()
+        if connection.vendor == "postgresql" and (
+            self._listener is None or self._listener.done() or self._listener.get_loop() is not self._loop
+        ):
+            self._listener = self._loop.create_task(self._listen())
+        subscription = Subscription(maxsize)
+        self.subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self.subscribers.discard(subscription)
+
+    def publish(self, event):
+        """Hands 'event' (a dict, or RESYNC) to every subscriber. Call it on the broker's loop."""
+        for subscription in self.subscribers:
+            subscription.push(event)
+
+    def publish_threadsafe(self, event):
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self.publish, event)
+
+    async def _listen(self):
+        params = connections["default"].get_connection_params()
+        # Only notifications are read on this connection: no Django cursors or adapters needed.
+        params.pop("cursor_factory", None)
+        params.pop("context", None)
+        delay = 1
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(autocommit=True, **params) as listener:
+                    await listener.execute(f"LISTEN {ORDER_EVENTS_CHANNEL}")
+                    delay = 1
+                    self.publish(RESYNC)
+                    async for notify in listener.notifies():
+                        self._dispatch(notify.payload)
+            except (psycopg.Error, OSError):
+                logger.exception("Order event listener lost its connection; retrying in %s s", delay)
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _LISTEN_RETRY_MAX)
+
+    def _dispatch(self, payload):
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            logger.warning("Ignoring malformed order event: %.200s", payload)
+            return
+        self.publish(event)
+
+
+broker = OrderEventBroker()
+
+
+def publish_order_change(order_id, previous_status=None):
+    """
+    Announces a new order or a status change made by the services, once the transaction commits.
+    A no-op on PostgreSQL, where the trigger does it for every write.
+    """
+    if connection.vendor == "postgresql":
+        return
+
+    def publish():
+        event = Order.objects.filter(pk=order_id).values(*ORDER_EVENT_FIELDS).first()
+        if event is not None:
+            broker.publish_threadsafe({**event, "previous_status": previous_status})
+
+    transaction.on_commit(publish)
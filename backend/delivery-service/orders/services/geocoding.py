@@ -0,0 +1,136 @@
+import csv
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+from django.utils.module_loading import import_string
+from orders.models import Order
+
+logger = logging.getLogger(__name__)
+
+# Delivery address geocoding (FR-053).
+#
+# Orders store a free-text delivery address. Once an order commits, a small thread pool turns it
+# into coordinates with the geocoder named by ORDER_GEOCODER (a dotted path to a class with
+# geocode(address) -> (latitude, longitude) or None) and stores them on the order, unless the
+# address has changed meanwhile. Answers are cached by normalized address, unknown addresses too
+# (for a shorter time), so a regular customer's address reaches the geocoder once.
+# `python manage.py geocode_orders` fills in orders placed before this or missed by a worker.
+#
+# FileGeocoder, the default, is the local stand-in: it looks addresses up in a CSV file. A real
+# geocoding service plugs in as another class with the same method.
+
+GEOCODE_TIMEOUT = 60 * 60 * 24 * 30
+MISS_TIMEOUT = 60 * 60
+_MISS = "miss"
+
+_executor = None
+_executor_lock = threading.Lock()
+_geocoder = None
+
+
+def normalize_address(address):
+    return " ".join(address.casefold().split())
+
+
+class FileGeocoder:
+    """
+    Looks addresses up in GEOCODER_FILE, a CSV file of "address,latitude,longitude" rows
+    (addresses are compared normalized). A missing file knows no addresses.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.GEOCODER_FILE
+        self.positions = {}
+        try:
+            with open(self.path, newline="", encoding="utf-8") as csv_file:
+                for address, latitude, longitude in csv.reader(csv_file):
+                    self.positions[normalize_address(address)] = (float(latitude), float(longitude))
+        except FileNotFoundError:
+            logger.warning("Geocoder file %s not found: no address will be geocoded.", self.path)
+
+    def geocode(self, address):
+        return self.positions.get(normalize_address(address))
+
+
+def get_geocoder():
+    global _geocoder
+    if _geocoder is None:
+        _geocoder = import_string(settings.ORDER_GEOCODER)()
+    return _geocoder
+
+
+def _cache_key(address):
+    return "geocode:" + hashlib.sha256(normalize_address(address).encode()).hexdigest()
+
+
+def geocode(address):
+    """(latitude, longitude) of an address, or None; through the cache."""
+    key = _cache_key(address)
+    cached = cache.get(key)
+    if cached is not None:
+        return None if cached == _MISS else tuple(cached)
+    position = get_geocoder().geocode(address)
+    cache.set(key, _MISS if position is None else list(position), MISS_TIMEOUT if position is None else GEOCODE_TIMEOUT)
+    return position
+
+
+def geocode_order(order_id, address):
+    """
+    Stores the position of 'address' on the order if it still has that address. Returns the
+    position (None for an unknown address).
+    """
+    position = geocode(address)
+    if position is not None:
+        Order.objects.filter(pk=order_id, delivery_address=address).update(latitude=position[0], longitude=position[1])
+    return position
+
+
+def _run_in_worker(order_id, address):
+    try:
+        geocode_order(order_id, address)
+    except Exception:
+        logger.exception("Geocoding failed for order %s", order_id)
+    finally:
+        close_old_connections()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=settings.GEOCODER_WORKERS, thread_name_prefix="order-geocoding")
+        return _executor
+
+
+def schedule_geocoding(order):
+    """Geocodes the order's delivery address off the request thread, once the transaction commits."""
+    if order.self_pickup or not order.delivery_address:
+        return
+    order_id, address = order.pk, order.delivery_address
+    transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, order_id, address))
+
+
+def geocode_missing(batch_size=500):
+    """
+    Geocodes the orders that have a delivery address but no position yet, in batches, in this
+    thread. Returns (orders looked at, orders geocoded).
+    """
+    pending = (
+        Order.objects.filter(self_pickup=False, latitude__isnull=True)
+        .exclude(delivery_address="")
+        .order_by("pk")
+        .values_list("pk", "delivery_address")
+    )
+    seen = geocoded = 0
+    after = 0
+    while batch := list(pending.filter(pk__gt=after)[:batch_size]):
+        for order_id, address in batch:
+            seen += 1
+            geocoded += geocode_order(order_id, address) is not None
+        after = batch[-1][0]
+    return seen, geocoded
@@ -0,0 +1,97 @@
+import hashlib
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.utils import timezone
+from orders.models import IdempotencyKey
+
+# Idempotency-Key support for the order creation endpoints.
+#
+# The first request with a key claims it by inserting its row (the unique constraint settles
+# races between parallel retries), runs normally, and stores its successful response on the row.
+# A later request with the same key and the same body gets that response back from this one row,
+# without touching the order tables. Same key with another body is a client bug (422); a repeat
+# while the first request is still running gets 409. Failed requests release their key, so the
+# client can retry them. A running request holds its key for IDEMPOTENCY_KEY_LEASE: if its worker
+# dies before storing a response, a retry takes the key over once the lease is up. Rows live for
+# IDEMPOTENCY_KEY_TTL.
+
+IDEMPOTENCY_KEY_HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = IdempotencyKey._meta.get_field("key").max_length
+
+
+def request_hash(body):
+    return hashlib.sha256(body).hexdigest()
+
+
+def claim_key(scope, owner, key, body_hash):
+    """
+    Returns (record, claimed). 'claimed' is True when this request owns the key and must run;
+    otherwise 'record' holds the earlier request's outcome (or its absence, while it runs).
+    """
+    while True:
+        now = timezone.now()
+        expires_at = now + settings.IDEMPOTENCY_KEY_TTL
+        locked_until = now + settings.IDEMPOTENCY_KEY_LEASE
+        try:
+            with transaction.atomic():
+                record = IdempotencyKey.objects.create(
+                    scope=scope,
+                    owner=owner,
+                    key=key,
+                    request_hash=body_hash,
+                    expires_at=expires_at,
+                    locked_until=locked_until,
+                )
+            return record, True
+        except IntegrityError:
+            pass
+
+        record = IdempotencyKey.objects.filter(scope=scope, owner=owner, key=key).first()
+        if record is None:
+            continue  # swept in between: claim it again
+        if record.expires_at <= now:
+            # Expired but not swept yet: anyone may take it over.
+            stale = Q(expires_at__lte=now)
+        elif record.response_status is None and record.request_hash == body_hash and _lease_over(record, now):
+            # A retry of a request that never answered and no longer holds the key.
+            stale = Q(response_status__isnull=True) & (Q(locked_until__isnull=True) | Q(locked_until__lte=now))
+        else:
+            return record, False
+        # Unless a parallel retry just took it over.
+        taken_over = IdempotencyKey.objects.filter(stale, pk=record.pk).update(
+            request_hash=body_hash,
+            response_status=None,
+            response_body=None,
+            created_at=now,
+            expires_at=expires_at,
+            locked_until=locked_until,
+        )
+        if taken_over:
+            record.refresh_from_db()
+            return record, True
+
+
+def _lease_over(record, now):
+    # Keys claimed before leases existed have none.
+    return record.locked_until is None or record.locked_until <= now
+
+
+def store_response(record, status, body):
+    IdempotencyKey.objects.filter(pk=record.pk).update(response_status=status, response_body=body, locked_until=None)
+
+
+def release_key(record):
+    IdempotencyKey.objects.filter(pk=record.pk, response_status__isnull=True).delete()
+
+
+def sweep_expired_keys(batch_size=1000):
+    """Deletes the expired keys in short batches (no long table locks). Returns how many."""
+    deleted = 0
+    now = timezone.now()
+    while True:
+        batch = list(IdempotencyKey.objects.filter(expires_at__lte=now).values_list("id", flat=True)[:batch_size])
+        if not batch:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(id__in=batch).delete()[0]
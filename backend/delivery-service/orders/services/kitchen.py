@@ -0,0 +1,111 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min, Prefetch
+from django.utils import timezone
+from orders.models import KitchenEvent, Order, OrderItem
+
+# Kitchen board (FR-051): the orders being cooked, with their notes, on a kitchen screen.
+#
+# A screen gets the whole board once (snapshot) and then only deltas: an order was created, changed
+# status (possibly leaving the board), or had its items changed. Every delta is written to
+# KitchenEvent in the same transaction as the change, so its id is a sequence number: a screen
+# that reconnects with the last one it saw gets just the deltas after it, as long as they are
+# still kept (KITCHEN_EVENT_RETENTION), and a snapshot otherwise. Live deltas go to the connected
+# screens through the channel layer group KITCHEN_GROUP once the change commits
+# (orders/consumers.py).
+
+KITCHEN_GROUP = "kitchen"
+# Orders shown on the board: waiting to be cooked (delivery orders placed, self-pickup orders
+# paid or awaiting cash) or being cooked. An order moving to any other status leaves it.
+KITCHEN_STATUSES = (
+    Order.Status.NEW,
+    Order.Status.PAID_CREDIT,
+    Order.Status.PAID_CASH,
+    Order.Status.AWAITING_CASH,
+    Order.Status.PREPARING,
+    Order.Status.IN_PROGRESS,
+)
+RESUME_OVERLAP = 20
+
+
+def kitchen_order(order, items):
+    """Board representation of an order and its items."""
+    return {
+        "id": order.pk,
+        "status": order.status,
+        "notes": order.notes,
+        "self_pickup": order.self_pickup,
+        "created_at": order.created_at.isoformat(),
+        "items": [{"name": item.name, "quantity": item.quantity} for item in items],
+    }
+
+
+def kitchen_orders(queryset):
+    """Board representations of the orders in 'queryset', oldest first, in two queries."""
+    items = OrderItem.objects.only("order_id", "name", "quantity").order_by("id")
+    orders = (
+        queryset.only("id", "status", "notes", "self_pickup", "created_at")
+        .order_by("created_at", "id")
+        .prefetch_related(Prefetch("items", queryset=items))
+    )
+    return [kitchen_order(order, order.items.all()) for order in orders]
+
+
+def delta(event):
+    return {"type": event.kind, "seq": event.pk, "order": event.payload}
+
+
+def record_kitchen_event(order_id, kind, payload):
+    """
+    Logs a board delta in the current transaction and sends it to the connected screens once
+    that commits.
+    """
+    event = KitchenEvent.objects.create(order_id=order_id, kind=kind, payload=payload)
+    transaction.on_commit(lambda: _send(delta(event)))
+    return event
+
+
+def _send(message):
+    layer = get_channel_layer()
+    if layer is not None:
+        async_to_sync(layer.group_send)(KITCHEN_GROUP, {"type": "kitchen.delta", "delta": message})
+
+
+def order_items_changed(order_id):
+    """Records an 'items_changed' delta for an order on the board (a no-op for other orders)."""
+    orders = kitchen_orders(Order.objects.filter(pk=order_id, status__in=KITCHEN_STATUSES))
+    if orders:
+        record_kitchen_event(order_id, KitchenEvent.Kind.ITEMS_CHANGED, orders[0])
+
+
+def board_snapshot():
+    """{"type": "snapshot", "seq": last delta so far, "orders": [...]}"""
+    seq = KitchenEvent.objects.aggregate(last=Max("id"))["last"] or 0
+    return {"type": "snapshot", "seq": seq, "orders": kitchen_orders(Order.objects.filter(status__in=KITCHEN_STATUSES))}
+
+
+def deltas_since(seq):
+    """
+    The deltas after 'seq' (and a few before: ids are taken before commit, so a delta numbered
+    just below one the screen saw may have committed after it), or None when some of them were
+    pruned already and the screen needs a snapshot. Deltas carry state, so repeats are harmless.
+    """
+    bounds = KitchenEvent.objects.aggregate(first=Min("id"), last=Max("id"))
+    if bounds["last"] is None:
+        return [] if seq == 0 else None
+    if seq > bounds["last"] or seq < bounds["first"] - 1:
+        return None
+    events = KitchenEvent.objects.filter(id__gt=max(seq - RESUME_OVERLAP, 0)).order_by("id")
+    return [delta(event) for event in events]
+
+
+def prune_kitchen_events(retention=None):
+    """
+    Deletes the deltas older than KITCHEN_EVENT_RETENTION, except the last one (it marks where
+    the sequence is). Returns how many.
+    """
+    cutoff = timezone.now() - (retention or settings.KITCHEN_EVENT_RETENTION)
+    last = KitchenEvent.objects.aggregate(last=Max("id"))["last"]
+    return KitchenEvent.objects.filter(created_at__lt=cutoff).exclude(id=last).delete()[0]
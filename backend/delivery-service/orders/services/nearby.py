@@ -0,0 +1,76 @@
+import math
+
+from django.conf import settings
+from django.db.models import F, Value
+from django.db.models.functions import Power
+from orders.models import Order
+
+# Ready orders nearest to a courier (FR-053).
+#
+# The ready orders with a position are indexed on (latitude, longitude) (order_ready_position_idx),
+# so a bounding box around the courier is a range scan of just the orders inside it. Within the
+# box the database orders them by an equirectangular approximation of the distance and returns
+# the first 'limit'; only those get an exact (haversine) distance here. Nothing reads every ready
+# order, wherever the courier is.
+#
+# The box starts NEARBY_START_KM wide and doubles while it holds fewer than 'limit' orders within
+# its inscribed circle (an order outside the box could be nearer than one in its corner), up to
+# ORDER_NEARBY_MAX_KM: orders farther away than that are not listed.
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+NEARBY_START_KM = 2.5
+NEARBY_FIELDS = ("id", "delivery_address", "latitude", "longitude", "self_pickup", "total_amount", "created_at")
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def search_radii(max_km=None):
+    max_km = max_km or settings.ORDER_NEARBY_MAX_KM
+    radius = min(NEARBY_START_KM, max_km)
+    while radius < max_km:
+        yield radius
+        radius *= 2
+    yield max_km
+
+
+def _in_box(latitude, longitude, radius_km, limit):
+    lat_span = radius_km / KM_PER_DEGREE
+    # Longitude degrees shrink towards the poles; the box stays at least as wide as the circle.
+    lon_scale = max(math.cos(math.radians(latitude)), 0.01)
+    lon_span = min(lat_span / lon_scale, 180)
+    approximate = Power(F("latitude") - Value(latitude), 2) + Power(
+        (F("longitude") - Value(longitude)) * Value(lon_scale), 2
+    )
+    return (
+        Order.objects.filter(
+            status=Order.Status.WAITING_FOR_COURIER,
+            latitude__range=(latitude - lat_span, latitude + lat_span),
+            longitude__range=(longitude - lon_span, longitude + lon_span),
+        )
+        .annotate(approximate_distance=approximate)
+        .order_by("approximate_distance", "id")
+        .values(*NEARBY_FIELDS)[:limit]
+    )
+
+
+def nearest_ready_orders(latitude, longitude, limit=20, max_km=None):
+    """
+    Up to 'limit' orders waiting for a courier, nearest to (latitude, longitude) first, each with
+    its "distance_km". One query per search radius, see above.
+    """
+    for radius in search_radii(max_km):
+        orders = list(_in_box(latitude, longitude, radius, limit))
+        for order in orders:
+            order["distance_km"] = round(haversine_km(latitude, longitude, order["latitude"], order["longitude"]), 3)
+        nearby = sorted(
+            (order for order in orders if order["distance_km"] <= radius),
+            key=lambda order: (order["distance_km"], order["id"]),
+        )
+        if len(nearby) == limit:
+            return nearby
+    return nearby
@@ -1,7 +1,12 @@
 from decimal import Decimal
 
 from django.db import transaction
-from orders.models import Order, OrderItem
+from django.db.models import Prefetch, prefetch_related_objects
+from orders.models import KitchenEvent, Order, OrderItem
+from orders.services.geocoding import schedule_geocoding
+from orders.services.kitchen import KITCHEN_STATUSES, kitchen_order, record_kitchen_event
+from orders.services.phones import normalize_phone
+from orders.services.sales import record_order_sales
 from rest_framework.exceptions import ValidationError
 
 
@@ -29,23 +34,48 @@ def _validate_order_payload(items_data):
             raise ValidationError({"items": f"Quantity for dish {dish.id} must be at least 1."})
 
 
+def place_order(order_fields, lines):
+    """
+    Inserts an order and its items; the caller owns the transaction and has validated the input.
+    'lines' is [(dish, quantity), ...] with loaded dishes (id, name, price and category_id are used).
+    A constant number of statements whatever the cart size: the order insert, which already carries
+    the final total and status, one multi-row insert for the items, the kitchen board delta (for
+    orders that start on the board) and the two sales rollup upserts.
+    """
+    items = []
+    total = Decimal("0.00")
+    for dish, quantity in lines:
+        unit_price = dish.price or Decimal("0.00")  # snapshot current price
+        # bulk_create skips OrderItem.save(), so line_total is computed here, the same way.
+        line_total = unit_price * Decimal(quantity)
+        items.append(
+            OrderItem(dish=dish, name=dish.name, unit_price=unit_price, quantity=quantity, line_total=line_total)
+        )
+        total += line_total
+
+    order = Order(total_amount=total, **order_fields)
+    if not order.phone_e164:
+        order.phone_e164 = normalize_phone(order.phone) or ""
+    # business rule: if self_pickup -> paid instantly
+    order.status = order.placement_status()
+    order.save(force_insert=True)
+
+    for item in items:
+        item.order = order
+    OrderItem.objects.bulk_create(items)
+    if order.status in KITCHEN_STATUSES:
+        record_kitchen_event(order.pk, KitchenEvent.Kind.CREATED, kitchen_order(order, items))
+    record_order_sales(order, items)
+    schedule_geocoding(order)
+    return order
+
+
 @transaction.atomic
 def create_order(validated_data):
     items_data = validated_data.pop("items_data", [])
     _validate_order_payload(items_data)
 
-    order = Order.objects.create(total_price=Decimal("0.00"), **validated_data)
-
-    order_items = []
-    running_total = Decimal("0.00")
-    for item in items_data:
-        dish = item["dish"]
-        quantity = item.get("quantity", 1)
-        unit_price = dish.price
-        running_total += unit_price * quantity
-        order_items.append(OrderItem(order=order, dish=dish, quantity=quantity, unit_price=unit_price))
-
-    OrderItem.objects.bulk_create(order_items)
-    Order.objects.filter(id=order.id).update(total_price=running_total)
-    order.total_price = running_total
+    order = place_order(validated_data, [(item["dish"], item.get("quantity", 1)) for item in items_data])
+    # The response renders the items with their dish names: load them in one joined query.
+    prefetch_related_objects([order], Prefetch("items", queryset=OrderItem.objects.select_related("dish")))
     return order
@@ -0,0 +1,26 @@
+import re
+
+from django.conf import settings
+
+# Phone numbers in E.164 ("+380501234567"): what Order.phone_e164 stores and phone lookups compare.
+#
+# Customers type numbers in many ways: "050 123 45 67", "(050) 123-45-67", "380501234567",
+# "+38 050 123 4567", "00380501234567". National numbers (trunk prefix 0) are read as numbers of
+# PHONE_COUNTRY_CODE, the restaurant's country. This is deliberately not a full numbering plan:
+# it checks the shape (country code + up to 15 digits), not whether the number exists.
+
+_SEPARATORS_RE = re.compile(r"[\s().\-/]")
+_E164_RE = re.compile(r"^\+[1-9]\d{7,14}$")
+
+
+def normalize_phone(raw):
+    """The E.164 form of 'raw', or None when it can't be a phone number."""
+    number = _SEPARATORS_RE.sub("", raw or "")
+    country = settings.PHONE_COUNTRY_CODE
+    if number.startswith("00"):
+        number = "+" + number[2:]
+    elif number.startswith("0"):
+        number = f"+{country}{number[1:]}"
+    elif number.startswith(country) and not number.startswith("+"):
+        number = "+" + number
+    return number if _E164_RE.match(number) else None
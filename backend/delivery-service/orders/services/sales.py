@@ -0,0 +1,304 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q, Sum
+from django.db.models.functions import TruncDate, TruncHour
+from django.utils import timezone
+from orders.models import Order, RollupWatermark, SalesDaily, SalesHourly
+from restaurant.models import Category, Dish
+
+# Sales rollups for manager reports (FR-054).
+#
+# SalesHourly / SalesDaily hold revenue, order count and quantity per period, order status and
+# payment method, for whole orders, per category and per dish (see SalesRollup). They are kept
+# up to date in two ways:
+#   * incrementally, in the transaction that changes the order: placing an order adds its cells
+#     (record_order_sales), a status transition moves them from the old status to the new one
+#     (move_order_sales). One upsert per table: INSERT ... ON CONFLICT DO UPDATE SET x = x + excluded.x.
+#   * by catch_up_sales() (the rollup_sales command), for everything else: admin edits, orders
+#     written with raw SQL (backfill_orders), deletions (--rebuild). It recomputes from the orders
+#     every hour touched by an order changed after the watermark, rebuilds the days around those
+#     hours from the hourly rows, then moves the watermark. Recomputing is idempotent, so it can
+#     overlap the incremental updates and be interrupted and run again.
+# Orders count in the hour and day they were placed; days are local days (TIME_ZONE), which
+# needs a time zone a whole number of hours off UTC.
+
+WATERMARK = "sales"
+TOTAL = 0  # category_id / dish_id of the whole-order and per-category rows
+GROUPS = ("dish", "category", "payment_method", "status")
+CHUNK_HOURS = 24
+_SUMS = ("orders", "quantity", "revenue")
+
+
+def _empty_cell():
+    return [0, 0, Decimal("0.00")]
+
+
+def hour_of(moment):
+    return moment.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def day_of(moment):
+    return timezone.localdate(moment)
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def order_cells(status, payment_method, lines, sign=1):
+    """
+    An order's contribution to one period: {(status, payment_method, category_id, dish_id): [orders,
+    quantity, revenue]}. 'lines' are (dish_id, category_id, quantity, line_total) tuples.
+    """
+    cells = defaultdict(_empty_cell)
+    seen = set()
+    for dish_id, category_id, quantity, line_total in lines:
+        # The whole order, its category and its dish.
+        for key in ((TOTAL, TOTAL), (category_id, TOTAL), (category_id, dish_id)):
+            cell = cells[(status, payment_method, *key)]
+            if key not in seen:
+                seen.add(key)
+                cell[0] += sign
+            cell[1] += sign * quantity
+            cell[2] += sign * line_total
+    if not lines:
+        cells[(status, payment_method, TOTAL, TOTAL)][0] += sign
+    return cells
+
+
+def _upsert(model, period_field, period, cells):
+    if not cells:
+        return
+    table = connection.ops.quote_name(model._meta.db_table)
+    keys = [period_field, "status", "payment_method", "category_id", "dish_id"]
+    period = model._meta.get_field(period_field).get_db_prep_value(period, connection)
+    revenue_field = model._meta.get_field("revenue")
+    params = []
+    for key, (orders, quantity, revenue) in cells.items():
+        params += [period, *key, orders, quantity, revenue_field.get_db_prep_value(revenue, connection)]
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s, %s)"] * len(cells))
+    updates = ", ".join(f"{column} = {table}.{column} + excluded.{column}" for column in _SUMS)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} ({', '.join(keys + list(_SUMS))}) VALUES {values} "  # noqa: S608 - no user input
+            f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {updates}",
+            params,
+        )
+
+
+def _add(created_at, cells):
+    _upsert(SalesHourly, "hour", hour_of(created_at), cells)
+    _upsert(SalesDaily, "day", day_of(created_at), cells)
+
+
+def record_order_sales(order, items):
+    """Adds a new order, with its OrderItems (their dish loaded), to the rollups. Two statements."""
+    lines = [(item.dish_id, item.dish.category_id, item.quantity, item.line_total) for item in items]
+    _add(order.created_at, order_cells(order.status, order.payment_method, lines))
+
+
+def move_order_sales(order_id, previous, status):
+    """
+    Moves an order's cells from status 'previous' to 'status', after the order was updated: one
+    query for the order and its items, then the two upserts.
+    """
+    rows = list(
+        Order.objects.filter(pk=order_id).values_list(
+            "created_at",
+            "payment_method",
+            "items__dish_id",
+            "items__dish__category_id",
+            "items__quantity",
+            "items__line_total",
+        )
+    )
+    if not rows:
+        return
+    created_at, payment_method = rows[0][:2]
+    lines = [row[2:] for row in rows if row[2] is not None]
+    cells = order_cells(previous, payment_method, lines, sign=-1)
+    cells.update(order_cells(status, payment_method, lines))
+    _add(created_at, cells)
+
+
+def rebuild_hours(hours):
+    """Recomputes the hourly rows of 'hours' (hour starts, UTC) from the orders, then their days."""
+    if not hours:
+        return
+    placed = Q()
+    for hour in hours:
+        placed |= Q(created_at__gte=hour, created_at__lt=hour + timedelta(hours=1))
+    rows = Order.objects.filter(placed).values_list(
+        "pk",
+        "created_at",
+        "status",
+        "payment_method",
+        "items__dish_id",
+        "items__dish__category_id",
+        "items__quantity",
+        "items__line_total",
+    )
+    orders, lines = {}, defaultdict(list)
+    for pk, created_at, status, payment_method, *line in rows.iterator():
+        orders[pk] = (created_at, status, payment_method)
+        if line[0] is not None:
+            lines[pk].append(line)
+
+    cells = defaultdict(_empty_cell)
+    for pk, (created_at, status, payment_method) in orders.items():
+        hour = hour_of(created_at)
+        for key, values in order_cells(status, payment_method, lines[pk]).items():
+            cell = cells[(hour, *key)]
+            for index, value in enumerate(values):
+                cell[index] += value
+
+    with transaction.atomic():
+        SalesHourly.objects.filter(hour__in=hours).delete()
+        SalesHourly.objects.bulk_create(
+            SalesHourly(
+                hour=hour,
+                status=status,
+                payment_method=payment_method,
+                category_id=category_id,
+                dish_id=dish_id,
+                **dict(zip(_SUMS, values)),
+            )
+            for (hour, status, payment_method, category_id, dish_id), values in cells.items()
+        )
+        rebuild_days({day_of(hour) for hour in hours})
+
+
+def rebuild_days(days):
+    """Recomputes the daily rows of 'days' by adding up their hourly rows."""
+    if not days:
+        return
+    hourly = SalesHourly.objects.filter(
+        hour__gte=day_start(min(days)), hour__lt=day_start(max(days) + timedelta(days=1))
+    )
+    sums = (
+        hourly.annotate(day=TruncDate("hour", tzinfo=timezone.get_current_timezone()))
+        .filter(day__in=days)
+        .values("day", "status", "payment_method", "category_id", "dish_id")
+        .annotate(**{f"total_{name}": Sum(name) for name in _SUMS})
+        .order_by()
+    )
+    rows = [
+        SalesDaily(
+            day=row["day"],
+            status=row["status"],
+            payment_method=row["payment_method"],
+            category_id=row["category_id"],
+            dish_id=row["dish_id"],
+            **{name: row[f"total_{name}"] for name in _SUMS},
+        )
+        for row in sums
+    ]
+    SalesDaily.objects.filter(day__in=days).delete()
+    SalesDaily.objects.bulk_create(rows)
+
+
+def catch_up_sales(chunk_hours=CHUNK_HOURS, now=None):
+    """
+    Recomputes the rollups for every order changed since the watermark (up to SALES_ROLLUP_LAG
+    ago, so transactions still open are picked up by the next run) and moves the watermark there.
+    Yields the number of hours recomputed per chunk.
+    """
+    upper = (now or timezone.now()) - settings.SALES_ROLLUP_LAG
+    watermark, _ = RollupWatermark.objects.get_or_create(name=WATERMARK)
+    changed = Order.objects.filter(updated_at__lte=upper)
+    if watermark.position is not None:
+        changed = changed.filter(updated_at__gt=watermark.position)
+    hours = sorted(
+        changed.annotate(hour=TruncHour("created_at", tzinfo=dt_timezone.utc))
+        .values_list("hour", flat=True)
+        .distinct()
+        .order_by()
+    )
+    for start in range(0, len(hours), chunk_hours):
+        chunk = hours[start : start + chunk_hours]
+        rebuild_hours(chunk)
+        yield len(chunk)
+    watermark.position = upper
+    watermark.save(update_fields=["position"])
+
+
+def reset_sales(since=None):
+    """
+    Makes the next catch_up_sales() recompute the orders changed after 'since', or, without it,
+    rebuild the rollups from scratch.
+    """
+    with transaction.atomic():
+        if since is None:
+            SalesHourly.objects.all().delete()
+            SalesDaily.objects.all().delete()
+        RollupWatermark.objects.update_or_create(name=WATERMARK, defaults={"position": since})
+
+
+def sales_report(start, end, group_by=None, status=None):
+    """
+    Revenue, orders and quantity of the orders placed in [start, end) (whole hours), in total and,
+    with 'group_by', per dish, category, payment method or status. Full days are read from the
+    daily rows and only the hours around them from the hourly ones, so the cost depends on the
+    number of days and dishes, not on the number of orders.
+    """
+    first_day = day_of(start) if day_start(day_of(start)) == start else day_of(start) + timedelta(days=1)
+    last_day = day_of(end)
+    if first_day < last_day:
+        hours = Q(hour__gte=start, hour__lt=day_start(first_day)) | Q(hour__gte=day_start(last_day), hour__lt=end)
+        sources = [SalesHourly.objects.filter(hours), SalesDaily.objects.filter(day__gte=first_day, day__lt=last_day)]
+    else:
+        sources = [SalesHourly.objects.filter(hour__gte=start, hour__lt=end)]
+
+    level = Q(category_id=TOTAL, dish_id=TOTAL)
+    if group_by == "dish":
+        level |= Q(dish_id__gt=TOTAL)
+    elif group_by == "category":
+        level |= Q(category_id__gt=TOTAL, dish_id=TOTAL)
+    dimensions = ["category_id", "dish_id"] + ([group_by] if group_by in ("payment_method", "status") else [])
+
+    totals = dict.fromkeys(_SUMS, 0)
+    groups = defaultdict(lambda: dict.fromkeys(_SUMS, 0))
+    for source in sources:
+        if status:
+            source = source.filter(status=status)
+        rows = source.filter(level).values(*dimensions).annotate(**{f"total_{name}": Sum(name) for name in _SUMS})
+        for row in rows.order_by():
+            sums = {name: row[f"total_{name}"] for name in _SUMS}
+            if row["dish_id"] == TOTAL and row["category_id"] == TOTAL:
+                _accumulate(totals, sums)
+                if group_by in ("payment_method", "status"):
+                    _accumulate(groups[row[group_by]], sums)
+            else:
+                _accumulate(groups[row["dish_id"] if group_by == "dish" else row["category_id"]], sums)
+
+    report = {"start": start, "end": end, "group_by": group_by, "totals": _rendered(totals)}
+    if group_by:
+        names = _group_names(group_by, groups)
+        report["rows"] = sorted(
+            ({"key": key, "name": names.get(key, str(key)), **_rendered(sums)} for key, sums in groups.items()),
+            key=lambda row: (-Decimal(row["revenue"]), str(row["key"])),
+        )
+    return report
+
+
+def _accumulate(into, sums):
+    for name, value in sums.items():
+        into[name] += value
+
+
+def _rendered(sums):
+    return {"orders": sums["orders"], "quantity": sums["quantity"], "revenue": f"{Decimal(sums['revenue']):.2f}"}
+
+
+def _group_names(group_by, groups):
+    if group_by == "dish":
+        return dict(Dish.objects.filter(pk__in=groups).values_list("pk", "name"))
+    if group_by == "category":
+        return dict(Category.objects.filter(pk__in=groups).values_list("pk", "name"))
+    choices = Order.Status if group_by == "status" else Order.PaymentMethod
+    return {key: choices(key).label for key in groups if key in choices.values}
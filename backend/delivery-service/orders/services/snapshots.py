@@ -0,0 +1,194 @@
+import json
+import sys
+import zipfile
+from array import array
+from datetime import datetime
+from datetime import timezone as dt_timezone
+from functools import lru_cache
+
+from django.conf import settings
+from django.utils import timezone
+from orders.models import Order, OrderItem
+
+# Columnar snapshots of the order history, for ad-hoc analysis (orders/services/analytics.py).
+#
+# One row per order item, with its order's fields repeated, in (order_id, item id) order. Each
+# column is a typed array (array.array) of plain numbers: money in cents, times as UTC epoch
+# seconds, statuses and payment methods as indexes into the lists in the manifest. The rows are
+# cut into row groups of 'chunk_size' rows, and each group's columns are separate members of a
+# deflate-compressed zip:
+#     manifest.json             format version, columns and their type codes, rows per group, codes
+#     rows-00000/order_id       the raw bytes of the array (byte order in the manifest)
+#     rows-00000/created_at     ...
+# The export reads the items through iterator(chunk_size=...), a server-side cursor on PostgreSQL,
+# and holds one row group at a time, so its memory doesn't depend on the size of the history.
+# Readers load just the columns they need, one group at a time. Orders without items are left out.
+
+FORMAT = "orders-snapshot"
+VERSION = 1
+CHUNK_SIZE = 50_000
+COLUMNS = {
+    "order_id": "q",
+    "created_at": "q",
+    # Hours since Monday 00:00 in TIME_ZONE, 0-167.
+    "hour_of_week": "B",
+    "status": "B",
+    "payment_method": "B",
+    "self_pickup": "B",
+    "dish_id": "q",
+    "category_id": "q",
+    "quantity": "i",
+    "unit_price": "q",
+    "line_total": "q",
+}
+STATUSES = list(Order.Status.values)
+PAYMENT_METHODS = list(Order.PaymentMethod.values)
+_SOURCE_FIELDS = (
+    "order_id",
+    "order__created_at",
+    "order__status",
+    "order__payment_method",
+    "order__self_pickup",
+    "dish_id",
+    "dish__category_id",
+    "quantity",
+    "unit_price",
+    "line_total",
+)
+
+
+class SnapshotError(Exception):
+    pass
+
+
+@lru_cache(maxsize=32_768)
+def _hour_of_week(epoch_hour):
+    local = timezone.localtime(datetime.fromtimestamp(epoch_hour * 3600, dt_timezone.utc))
+    return local.weekday() * 24 + local.hour
+
+
+def _cents(value):
+    return int(value * 100)
+
+
+def _empty_group():
+    return {name: array(typecode) for name, typecode in COLUMNS.items()}
+
+
+def write_snapshot(path, chunk_size=CHUNK_SIZE, queryset=None):
+    """
+    Writes the items of 'queryset' (all order items by default) to a snapshot at 'path'. Yields
+    the number of rows of every row group written.
+    """
+    statuses = {status: index for index, status in enumerate(STATUSES)}
+    payment_methods = {method: index for index, method in enumerate(PAYMENT_METHODS)}
+    items = (queryset if queryset is not None else OrderItem.objects.all()).order_by("order_id", "id")
+    rows = items.values_list(*_SOURCE_FIELDS).iterator(chunk_size=chunk_size)
+    row_groups = []
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as archive:
+
+        def flush(group):
+            for name, values in group.items():
+                archive.writestr(f"rows-{len(row_groups):05}/{name}", values.tobytes())
+            row_groups.append(len(group["order_id"]))
+
+        group = _empty_group()
+        for order_id, created_at, status, payment_method, self_pickup, dish_id, category_id, *line in rows:
+            quantity, unit_price, line_total = line
+            epoch = int(created_at.timestamp())
+            group["order_id"].append(order_id)
+            group["created_at"].append(epoch)
+            group["hour_of_week"].append(_hour_of_week(epoch // 3600))
+            group["status"].append(statuses[status])
+            group["payment_method"].append(payment_methods[payment_method])
+            group["self_pickup"].append(self_pickup)
+            group["dish_id"].append(dish_id)
+            group["category_id"].append(category_id)
+            group["quantity"].append(quantity)
+            group["unit_price"].append(_cents(unit_price))
+            group["line_total"].append(_cents(line_total))
+            if len(group["order_id"]) == chunk_size:
+                flush(group)
+                yield chunk_size
+                group = _empty_group()
+        if group["order_id"]:
+            flush(group)
+            yield len(group["order_id"])
+
+        manifest = {
+            "format": FORMAT,
+            "version": VERSION,
+            "created_at": timezone.now().isoformat(),
+            "time_zone": settings.TIME_ZONE,
+            "byteorder": sys.byteorder,
+            "columns": COLUMNS,
+            "row_groups": row_groups,
+            "statuses": STATUSES,
+            "payment_methods": PAYMENT_METHODS,
+        }
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+
+
+class Snapshot:
+    """
+    A snapshot opened for reading:
+        with Snapshot(path) as snapshot:
+            for group in snapshot.row_groups("dish_id", "line_total"):
+                ...  # {"dish_id": array, "line_total": array}
+    """
+
+    def __init__(self, path):
+        try:
+            self.archive = zipfile.ZipFile(path)
+        except zipfile.BadZipFile as exc:
+            raise SnapshotError(f"{path} is not an order snapshot.") from exc
+        try:
+            self.manifest = json.loads(self.archive.read("manifest.json"))
+        except KeyError as exc:
+            self.archive.close()
+            raise SnapshotError(f"{path} is not an order snapshot.") from exc
+        if self.manifest.get("format") != FORMAT or self.manifest.get("version") != VERSION:
+            self.archive.close()
+            raise SnapshotError(f"{path} is not a version {VERSION} order snapshot.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.archive.close()
+
+    @property
+    def rows(self):
+        return sum(self.manifest["row_groups"])
+
+    @property
+    def byteorder(self):
+        return self.manifest["byteorder"]
+
+    def typecode(self, column):
+        return self.manifest["columns"][column]
+
+    def raw_row_groups(self, *columns):
+        """
+        Yields every row group as {column: bytes}, the columns' stored buffers in the snapshot's
+        byteorder, for readers that map them themselves (numpy.frombuffer).
+        """
+        unknown = set(columns) - set(self.manifest["columns"])
+        if unknown:
+            raise SnapshotError(f"Unknown columns: {', '.join(sorted(unknown))}")
+        for index in range(len(self.manifest["row_groups"])):
+            yield {name: self.archive.read(f"rows-{index:05}/{name}") for name in columns}
+
+    def row_groups(self, *columns):
+        """Yields every row group as {column: array}, with only the columns asked for."""
+        swap = self.byteorder != sys.byteorder
+        for buffers in self.raw_row_groups(*columns):
+            group = {}
+            for name, buffer in buffers.items():
+                values = array(self.typecode(name))
+                values.frombytes(buffer)
+                if swap:
+                    values.byteswap()
+                group[name] = values
+            yield group
@@ -0,0 +1,139 @@
+from accounts.models import User
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from orders.models import KitchenEvent, Order
+from orders.services.events import publish_order_change
+from orders.services.kitchen import KITCHEN_STATUSES, record_kitchen_event
+from orders.services.sales import move_order_sales
+
+# Order status workflow (FR-022 to FR-026):
+#     new → preparing → waiting_for_courier → delivering → completed
+# The kitchen starts and finishes cooking, a courier takes a ready order and completes it.
+# Self-pickup orders start paid (paid_credit, paid_cash) or awaiting_cash (Order.placement_status())
+# and go through the kitchen the same way; once ready, the kitchen completes them when they are
+# picked up at the counter, and no courier ever takes them:
+#     paid_* / awaiting_cash → preparing → waiting_for_courier → completed
+# Orders from the old restaurant store may still be in_progress; they go to preparing too.
+#
+# A transition is one conditional UPDATE (WHERE id = ? AND status = ?), a compare-and-set: of
+# several kitchen screens or couriers acting on the same order at once, exactly one matches the
+# row and wins; the others update nothing and get TransitionConflict (409). Nothing is locked, and
+# whether a transition is allowed at all is decided here, in memory. Only when the target can be
+# reached from several statuses and the client didn't say which one it saw is the status read
+# first (unlocked), so the UPDATE and the sales rollups know where the order comes from. In the same
+# transaction, a move on or off the kitchen board logs a board delta (orders/services/kitchen.py)
+# and the order's sales move to the new status in the rollups (orders/services/sales.py).
+
+ALLOWED_TRANSITIONS = {
+    Order.Status.NEW: {Order.Status.PREPARING},
+    Order.Status.PAID_CREDIT: {Order.Status.PREPARING},
+    Order.Status.PAID_CASH: {Order.Status.PREPARING},
+    Order.Status.AWAITING_CASH: {Order.Status.PREPARING},
+    Order.Status.IN_PROGRESS: {Order.Status.PREPARING},
+    Order.Status.PREPARING: {Order.Status.WAITING_FOR_COURIER},
+    Order.Status.WAITING_FOR_COURIER: {Order.Status.DELIVERING, Order.Status.COMPLETED},
+    Order.Status.DELIVERING: {Order.Status.COMPLETED},
+}
+# Who may move an order into each status; managers may do any allowed transition.
+TRANSITION_ROLES = {
+    Order.Status.PREPARING: {User.Role.KITCHEN_STAFF},
+    Order.Status.WAITING_FOR_COURIER: {User.Role.KITCHEN_STAFF},
+    Order.Status.DELIVERING: {User.Role.COURIER},
+    # Couriers complete their deliveries, the kitchen hands over self-pickup orders.
+    Order.Status.COMPLETED: {User.Role.COURIER, User.Role.KITCHEN_STAFF},
+}
+_SOURCES = {
+    target: tuple(source for source, targets in ALLOWED_TRANSITIONS.items() if target in targets)
+    for target in TRANSITION_ROLES
+}
+
+
+class TransitionNotAllowed(Exception):
+    pass
+
+
+class TransitionConflict(Exception):
+    """The order isn't (any more) in a status the transition starts from."""
+
+    def __init__(self, current_status):
+        super().__init__(f"The order is {current_status}.")
+        self.current_status = current_status
+
+
+def can_transition(user, target):
+    return user.role == User.Role.MANAGER or user.role in TRANSITION_ROLES.get(target, ())
+
+
+def transition_sources(target, expected=None):
+    """
+    The statuses the order may be in for a move to 'target': just 'expected' when the client
+    says which status it saw, otherwise every allowed one. Raises TransitionNotAllowed.
+    """
+    sources = _SOURCES.get(target, ())
+    if expected is not None:
+        sources = (expected,) if expected in sources else ()
+    if not sources:
+        raise TransitionNotAllowed(f"An order can't go from {expected or 'any status'} to {target}.")
+    return sources
+
+
+def transition_order(order_id, target, user, expected=None):
+    """
+    Moves the order to 'target' if it is still in an allowed source status, in one UPDATE.
+    Taking an order for delivery assigns it to the courier, and only that courier (or a manager)
+    can complete it; a ready self-pickup order is completed without a courier instead.
+    Returns the new state as {"id": ..., "status": ...}.
+    Raises TransitionNotAllowed, TransitionConflict, or Order.DoesNotExist.
+    """
+    sources = transition_sources(target, expected)
+    condition = Q(pk=order_id, status__in=sources)
+    changes = {"status": target, "updated_at": timezone.now()}
+    if target == Order.Status.DELIVERING:
+        condition &= Q(self_pickup=False)
+        changes["courier"] = user
+    elif target == Order.Status.COMPLETED:
+        condition &= _completable_by(user)
+
+    if len(sources) == 1:
+        previous = sources[0]
+    else:
+        previous = _current_status(order_id)
+        if previous not in sources:
+            raise TransitionConflict(previous)
+        condition &= Q(status=previous)
+
+    # Starting or finishing cooking changes the kitchen board: the delta is logged with the update.
+    on_board = target in KITCHEN_STATUSES or previous in KITCHEN_STATUSES
+    with transaction.atomic():
+        updated = Order.objects.filter(condition).update(**changes)
+        if updated and on_board:
+            record_kitchen_event(order_id, KitchenEvent.Kind.STATUS_CHANGED, {"id": order_id, "status": target})
+        if updated:
+            move_order_sales(order_id, previous, target)
+    if updated:
+        publish_order_change(order_id, previous_status=previous)
+        return {"id": order_id, "status": target}
+
+    # Lost: only now read the row, to tell a missing order from a conflict.
+    raise TransitionConflict(_current_status(order_id))
+
+
+def _completable_by(user):
+    """Orders 'user' may complete: their own deliveries, or ready self-pickup orders."""
+    delivered = Q(status=Order.Status.DELIVERING)
+    if user.role != User.Role.MANAGER:
+        delivered &= Q(courier=user)
+    picked_up = Q(status=Order.Status.WAITING_FOR_COURIER, self_pickup=True)
+    if user.role == User.Role.COURIER:
+        return delivered
+    if user.role == User.Role.KITCHEN_STAFF:
+        return picked_up
+    return delivered | picked_up
+
+
+def _current_status(order_id):
+    current = Order.objects.filter(pk=order_id).values_list("status", flat=True).first()
+    if current is None:
+        raise Order.DoesNotExist(f"No order {order_id}.")
+    return current
@@ -0,0 +1,196 @@
+import asyncio
+import json
+from unittest import skipUnless
+
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django.contrib.auth import get_user_model
+from django.core.management import get_commands, load_command_class
+from django.db import connection
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from orders.models import Order
+from orders.services.events import RESYNC, Subscription, broker
+from orders.services.transitions import transition_order
+from orders.views.feed import _event_stream
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+
+def parse(chunk):
+    fields = dict(line.split(": ", 1) for line in chunk.decode().strip().splitlines())
+    return fields["event"], json.loads(fields["data"])
+
+
+@override_settings(ORDER_FEED_HEARTBEAT=0.05)
+class CourierFeedTests(TestCase):
+    def setUp(self):
+        self.courier = User.objects.create_user(
+            email="courier@example.com", password="Test12345!", first_name="C", last_name="U", role=User.Role.COURIER
+        )
+        self.kitchen = User.objects.create_user(
+            email="kitchen@example.com",
+            password="Test12345!",
+            first_name="K",
+            last_name="U",
+            role=User.Role.KITCHEN_STAFF,
+        )
+        self.ready = Order.objects.create(
+            phone="0501234567", delivery_address="Khreshchatyk 1", status=Order.Status.WAITING_FOR_COURIER
+        )
+        self.cooking = Order.objects.create(
+            phone="0501234568", delivery_address="Khreshchatyk 2", status=Order.Status.PREPARING
+        )
+
+        self.tokens = {user: str(RefreshToken.for_user(user).access_token) for user in (self.courier, self.kitchen)}
+
+    def move(self, order, target, user):
+        with self.captureOnCommitCallbacks(execute=True):
+            transition_order(order.id, target, user)
+
+    async def test_snapshot_then_events_then_heartbeat(self):
+        response = await self.async_client.get(f"/api/v0/orders/feed/?access_token={self.tokens[self.courier]}")
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = response.streaming_content
+        try:
+            self.assertEqual(await anext(stream), b"retry: 3000\n\n")
+            name, data = parse(await anext(stream))
+            self.assertEqual(name, "snapshot")
+            self.assertEqual([order["id"] for order in data["orders"]], [self.ready.id])
+
+            await sync_to_async(self.move)(self.cooking, Order.Status.WAITING_FOR_COURIER, self.kitchen)
+            name, data = parse(await anext(stream))
+            self.assertEqual(
+                (name, data["id"], data["delivery_address"]), ("order_ready", self.cooking.id, "Khreshchatyk 2")
+            )
+
+            await sync_to_async(self.move)(self.ready, Order.Status.DELIVERING, self.courier)
+            name, data = parse(await anext(stream))
+            self.assertEqual((name, data["id"], data["courier_id"]), ("order_taken", self.ready.id, self.courier.id))
+
+            self.assertEqual(await anext(stream), b": ping\n\n")
+        finally:
+            await stream.aclose()
+
+    async def test_closing_the_stream_unsubscribes(self):
+        subscribed = set(broker.subscribers)
+        stream = _event_stream()
+        await anext(stream)
+        self.assertEqual(len(broker.subscribers - subscribed), 1)
+
+        await stream.aclose()
+
+        self.assertEqual(broker.subscribers - subscribed, set())
+
+    async def test_header_authentication(self):
+        response = await self.async_client.get(
+            "/api/v0/orders/feed/", headers={"Authorization": f"Bearer {self.tokens[self.courier]}"}
+        )
+        self.assertEqual(response.status_code, 200)
+        await response.streaming_content.aclose()
+
+    async def test_couriers_only(self):
+        response = await self.async_client.get("/api/v0/orders/feed/")
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get("/api/v0/orders/feed/?access_token=garbage")
+        self.assertEqual(response.status_code, 401)
+        response = await self.async_client.get(f"/api/v0/orders/feed/?access_token={self.tokens[self.kitchen]}")
+        self.assertEqual(response.status_code, 403)
+
+
+class SubscriptionTests(SimpleTestCase):
+    async def test_slow_subscriber_gets_a_resync_instead_of_a_backlog(self):
+        subscription = Subscription(maxsize=3)
+        for index in range(5):
+            subscription.push({"id": index})
+
+        # 0-2 filled the queue, 3 overflowed it: only the resync and what came after are left.
+        self.assertIs(await subscription.get(1), RESYNC)
+        self.assertEqual(await subscription.get(1), {"id": 4})
+        self.assertTrue(subscription.queue.empty())
+
+    async def test_times_out_when_idle(self):
+        with self.assertRaises(TimeoutError):
+            await Subscription(maxsize=3).get(0.01)
+
+    async def test_publish_threadsafe_reaches_subscribers(self):
+        subscription = broker.subscribe(10)
+        try:
+            await asyncio.to_thread(broker.publish_threadsafe, {"id": 1})
+            self.assertEqual(await subscription.get(1), {"id": 1})
+        finally:
+            broker.unsubscribe(subscription)
+
+
+@skipUnless(connection.vendor == "postgresql", "LISTEN/NOTIFY needs PostgreSQL")
+class PostgresOrderEventTests(TransactionTestCase):
+    """The trigger and the listener (orders/services/events.py) against a real database, as in CI."""
+
+    async def test_committed_changes_reach_subscribers(self):
+        kitchen = await sync_to_async(User.objects.create_user)(
+            email="kitchen@example.com",
+            password="Test12345!",
+            first_name="K",
+            last_name="U",
+            role=User.Role.KITCHEN_STAFF,
+        )
+        subscription = broker.subscribe(100)
+        try:
+            # The listener sends RESYNC once it is listening.
+            self.assertIs(await subscription.get(10), RESYNC)
+
+            order = await Order.objects.acreate(phone="0501234567", delivery_address="Khreshchatyk 1")
+            event = await subscription.get(10)
+            self.assertEqual((event["id"], event["status"], event["previous_status"]), (order.id, "new", None))
+
+            await sync_to_async(transition_order)(order.id, Order.Status.PREPARING, kitchen)
+            event = await subscription.get(10)
+            self.assertEqual((event["id"], event["status"], event["previous_status"]), (order.id, "preparing", "new"))
+        finally:
+            broker.unsubscribe(subscription)
+            broker._listener.cancel()
+
+
+class DevServerFeedTests(TransactionTestCase):
+    """
+    The feed as `python manage.py runserver` (startup.sh, local docker-compose) serves it.
+    Transactional: the server reads the user on a connection of its own.
+    """
+
+    def setUp(self):
+        courier = User.objects.create(
+            email="courier@example.com", first_name="C", last_name="U", role=User.Role.COURIER
+        )
+        self.token = str(RefreshToken.for_user(courier).access_token)
+
+    async def test_runserver_streams_the_feed(self):
+        command = load_command_class(get_commands()["runserver"], "runserver")
+        self.assertEqual(type(command).__module__, "daphne.management.commands.runserver")
+
+        application = command.get_application({})
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": "/api/v0/orders/feed/",
+            "raw_path": b"/api/v0/orders/feed/",
+            "query_string": f"access_token={self.token}".encode(),
+            "headers": [(b"host", b"testserver")],
+            "client": ("127.0.0.1", 50000),
+            "server": ("testserver", 80),
+        }
+        communicator = ApplicationCommunicator(application, scope)
+        await communicator.send_input({"type": "http.request", "body": b""})
+        try:
+            start = await communicator.receive_output(5)
+            self.assertEqual(start["status"], 200)
+            self.assertIn((b"Content-Type", b"text/event-stream"), start["headers"])
+            # Sent as they are produced: under WSGI the endless stream would never get this far.
+            self.assertEqual((await communicator.receive_output(5))["body"], b"retry: 3000\n\n")
+            name, data = parse((await communicator.receive_output(5))["body"])
+            self.assertEqual((name, data["orders"]), ("snapshot", []))
+        finally:
+            await communicator.send_input({"type": "http.disconnect"})
+            await communicator.wait(5)
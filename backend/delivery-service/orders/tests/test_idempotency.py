@@ -0,0 +1,175 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from orders.models import IdempotencyKey, Order
+from orders.services.idempotency import claim_key, request_hash
+from rest_framework.test import APITestCase
+from restaurant.models import Category, Dish
+
+User = get_user_model()
+
+
+class IdempotentOrderCreateTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="idem@example.com", password="Test12345!", first_name="Idem", last_name="User"
+        )
+        category = Category.objects.create(name="Pizza")
+        self.dish = Dish.objects.create(name="Margherita", category=category, price=100, description="Test pizza")
+        self.client.force_authenticate(self.user)
+
+    def post(self, body, key="key-1"):
+        return self.client.post("/api/v0/orders/", body, format="json", headers={"Idempotency-Key": key})
+
+    def test_without_key_nothing_is_recorded(self):
+        response = self.client.post("/api/v0/orders/", {"dishes": [self.dish.id]}, format="json")
+
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post({"dishes": [self.dish.id]})
+        with CaptureQueriesContext(connection) as queries:
+            retry = self.post({"dishes": [self.dish.id]})
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry.headers["Idempotent-Replayed"], "true")
+        self.assertNotIn("Idempotent-Replayed", first.headers)
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertFalse(any(Order._meta.db_table in query["sql"] for query in queries.captured_queries))
+
+    def test_keys_are_per_user(self):
+        self.post({"dishes": [self.dish.id]})
+        other = User.objects.create_user(
+            email="other@example.com", password="Test12345!", first_name="Other", last_name="User"
+        )
+        self.client.force_authenticate(other)
+
+        response = self.post({"dishes": [self.dish.id]})
+
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+        self.assertEqual(Order.objects.count(), 2)
+
+    def test_same_key_with_another_body_is_rejected(self):
+        self.post({"dishes": [self.dish.id]})
+
+        response = self.post({"dishes": [self.dish.id, self.dish.id]})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_key_in_progress_conflicts(self):
+        self.post({"dishes": [self.dish.id]})
+        # As if the first request were still running.
+        IdempotencyKey.objects.update(
+            response_status=None, response_body=None, locked_until=timezone.now() + timedelta(minutes=1)
+        )
+
+        response = self.post({"dishes": [self.dish.id]})
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(Order.objects.count(), 1)
+
+    def test_failed_request_releases_the_key(self):
+        failed = self.post({"dishes": [self.dish.id + 100]})
+        self.assertEqual(failed.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+        response = self.post({"dishes": [self.dish.id]})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+
+    def test_expired_key_is_taken_over(self):
+        self.post({"dishes": [self.dish.id]})
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        response = self.post({"dishes": [self.dish.id, self.dish.id]})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+        self.assertEqual(Order.objects.count(), 2)
+        self.assertEqual(IdempotencyKey.objects.get().response_body["id"], response.json()["id"])
+
+    def test_key_of_a_dead_request_is_taken_over_after_its_lease(self):
+        # Claimed by a request whose worker died before it answered.
+        record, _ = claim_key(
+            "orders", f"user:{self.user.pk}", "key-1", request_hash(b'{"dishes":[%d]}' % self.dish.id)
+        )
+        self.assertEqual(self.post({"dishes": [self.dish.id]}).status_code, 409)
+
+        IdempotencyKey.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.post({"dishes": [self.dish.id, self.dish.id]}).status_code, 422)
+        response = self.post({"dishes": [self.dish.id]})
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Order.objects.count(), 1)
+        record.refresh_from_db()
+        self.assertEqual((record.response_status, record.locked_until), (201, None))
+
+    def test_invalid_key_is_rejected(self):
+        response = self.post({"dishes": [self.dish.id]}, key="x" * 256)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Order.objects.exists())
+
+    def test_sweep_deletes_only_expired_keys(self):
+        self.post({"dishes": [self.dish.id]}, key="fresh")
+        self.post({"dishes": [self.dish.id]}, key="stale")
+        IdempotencyKey.objects.filter(key="stale").update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        call_command("sweep_idempotency_keys", "--batch-size", "1", stdout=StringIO())
+
+        self.assertEqual(list(IdempotencyKey.objects.values_list("key", flat=True)), ["fresh"])
+
+
+class IdempotentRestaurantOrderCreateTests(APITestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Pizza")
+        self.dish = Dish.objects.create(name="Margherita", category=category, price=100, description="Test pizza")
+        self.body = {
+            "phone": "0501234567",
+            "self_pickup": True,
+            "items_input": [{"dish_id": self.dish.id, "quantity": 2}],
+        }
+
+    def test_anonymous_retry_replays_the_first_response(self):
+        headers = {"Idempotency-Key": "guest-key"}
+        first = self.client.post("/api/v0/menu/orders/", self.body, format="json", headers=headers)
+        retry = self.client.post("/api/v0/menu/orders/", self.body, format="json", headers=headers)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.json(), first.json())
+        self.assertEqual(retry.headers["Idempotent-Replayed"], "true")
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(IdempotencyKey.objects.get().scope, "restaurant-orders")
+
+    def test_guests_keys_are_per_phone(self):
+        headers = {"Idempotency-Key": "guest-key"}
+        self.client.post("/api/v0/menu/orders/", self.body, format="json", headers=headers)
+        other = {**self.body, "phone": "0671112233"}
+
+        # Another guest's identical key neither conflicts nor gets the first guest's order back.
+        response = self.client.post("/api/v0/menu/orders/", other, format="json", headers=headers)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertNotIn("Idempotent-Replayed", response.headers)
+        self.assertEqual(response.json()["phone"], "0671112233")
+        self.assertEqual(
+            sorted(IdempotencyKey.objects.values_list("owner", flat=True)),
+            ["phone:+380501234567", "phone:+380671112233"],
+        )
+
+    def test_guest_key_needs_a_valid_phone(self):
+        body = {**self.body, "phone": "12"}
+        response = self.client.post("/api/v0/menu/orders/", body, format="json", headers={"Idempotency-Key": "k"})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(IdempotencyKey.objects.exists())
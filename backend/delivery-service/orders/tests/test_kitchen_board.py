@@ -0,0 +1,146 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from accounts.websocket import JWTAuthMiddleware
+from asgiref.sync import sync_to_async
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from orders.consumers import FORBIDDEN
+from orders.models import KitchenEvent, Order
+from orders.routing import websocket_urlpatterns
+from orders.services.kitchen import deltas_since, prune_kitchen_events
+from orders.services.transitions import transition_order
+from rest_framework_simplejwt.tokens import RefreshToken
+from restaurant.models import Category, Dish
+from restaurant.services.orders import create_order_with_items
+
+User = get_user_model()
+
+application = JWTAuthMiddleware(URLRouter(websocket_urlpatterns))
+
+
+@override_settings(CHANNEL_LAYERS={"default": {"BACKEND": "channels.layers.InMemoryChannelLayer"}})
+class KitchenBoardTests(TestCase):
+    def setUp(self):
+        self.kitchen = User.objects.create_user(
+            email="kitchen@example.com",
+            password="Test12345!",
+            first_name="K",
+            last_name="U",
+            role=User.Role.KITCHEN_STAFF,
+        )
+        self.courier = User.objects.create_user(
+            email="courier@example.com", password="Test12345!", first_name="C", last_name="U", role=User.Role.COURIER
+        )
+        category = Category.objects.create(name="Pizza")
+        self.dish = Dish.objects.create(category=category, name="Margherita", description="-", price=Decimal("150"))
+        self.cooking = Order.objects.create(phone="0501234567", notes="No basil", status=Order.Status.PREPARING)
+        Order.objects.create(phone="0501234568", status=Order.Status.WAITING_FOR_COURIER)
+
+        self.tokens = {user: str(RefreshToken.for_user(user).access_token) for user in (self.kitchen, self.courier)}
+
+    def place(self, notes=""):
+        with self.captureOnCommitCallbacks(execute=True):
+            return create_order_with_items(
+                {"phone": "0501234569", "delivery_address": "Khreshchatyk 1", "notes": notes},
+                [{"dish_id": self.dish.id, "quantity": 2}],
+            )
+
+    def move(self, order_id, target):
+        with self.captureOnCommitCallbacks(execute=True):
+            transition_order(order_id, target, self.kitchen)
+
+    async def connect(self, user=None, query=""):
+        token = self.tokens[user or self.kitchen]
+        communicator = WebsocketCommunicator(application, f"/ws/kitchen/?access_token={token}{query}")
+        connected, code = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_snapshot_then_deltas(self):
+        board = await self.connect()
+        try:
+            snapshot = await board.receive_json_from()
+            self.assertEqual(snapshot["type"], "snapshot")
+            self.assertEqual(
+                [(order["id"], order["notes"]) for order in snapshot["orders"]], [(self.cooking.id, "No basil")]
+            )
+
+            order = await sync_to_async(self.place)(notes="Extra cheese")
+            created = await board.receive_json_from()
+            self.assertEqual((created["type"], created["order"]["id"]), ("created", order.id))
+            self.assertEqual(created["order"]["notes"], "Extra cheese")
+            self.assertEqual(created["order"]["items"], [{"name": "Margherita", "quantity": 2}])
+            self.assertGreater(created["seq"], snapshot["seq"])
+
+            # Leaving the board is a delta too; moves off the board entirely are not.
+            await sync_to_async(self.move)(self.cooking.id, Order.Status.WAITING_FOR_COURIER)
+            changed = await board.receive_json_from()
+            self.assertEqual(
+                (changed["type"], changed["order"]),
+                ("status_changed", {"id": self.cooking.id, "status": "waiting_for_courier"}),
+            )
+            await sync_to_async(transition_order)(self.cooking.id, Order.Status.DELIVERING, self.courier)
+            self.assertTrue(await board.receive_nothing())
+        finally:
+            await board.disconnect()
+
+    async def test_resumes_from_a_sequence_number(self):
+        first = await sync_to_async(self.place)()
+        seen = await KitchenEvent.objects.aget(order_id=first.id)
+        second = await sync_to_async(self.place)()
+
+        board = await self.connect(query=f"&since={seen.id}")
+        try:
+            # No snapshot: the deltas after 'since', plus the last few before it again (RESUME_OVERLAP).
+            resumed = [await board.receive_json_from(), await board.receive_json_from()]
+            self.assertEqual(
+                [(delta["type"], delta["order"]["id"]) for delta in resumed],
+                [
+                    ("created", first.id),
+                    ("created", second.id),
+                ],
+            )
+            self.assertTrue(await board.receive_nothing())
+        finally:
+            await board.disconnect()
+
+    async def test_snapshot_when_the_deltas_were_pruned(self):
+        await sync_to_async(self.place)()
+        await sync_to_async(self.place)()
+        await KitchenEvent.objects.aupdate(created_at=self.cooking.created_at - timedelta(days=1))
+        self.assertEqual(await sync_to_async(prune_kitchen_events)(), 1)
+
+        board = await self.connect(query="&since=0")
+        try:
+            snapshot = await board.receive_json_from()
+            self.assertEqual(snapshot["type"], "snapshot")
+            self.assertEqual(len(snapshot["orders"]), 3)
+        finally:
+            await board.disconnect()
+
+    async def test_only_kitchen_staff(self):
+        for path in (f"/ws/kitchen/?access_token={self.tokens[self.courier]}", "/ws/kitchen/"):
+            communicator = WebsocketCommunicator(application, path)
+            connected, code = await communicator.connect()
+            self.assertEqual((connected, code), (False, FORBIDDEN))
+
+
+class DeltasSinceTests(TestCase):
+    def test_sequence_bounds(self):
+        self.assertEqual(deltas_since(0), [])
+        self.assertIsNone(deltas_since(5))
+
+        order = Order.objects.create(phone="0501234567")
+        events = [
+            KitchenEvent.objects.create(order=order, kind=KitchenEvent.Kind.STATUS_CHANGED, payload={"id": order.id})
+            for _ in range(3)
+        ]
+        self.assertEqual([delta["seq"] for delta in deltas_since(events[1].id)][-1:], [events[2].id])
+        self.assertEqual([delta["seq"] for delta in deltas_since(events[2].id)][-1:], [events[2].id])
+        self.assertIsNone(deltas_since(events[2].id + 1))
+
+        KitchenEvent.objects.filter(pk=events[0].pk).delete()
+        self.assertIsNone(deltas_since(events[0].id - 1))
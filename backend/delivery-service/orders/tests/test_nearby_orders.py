@@ -0,0 +1,152 @@
+import random
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from orders.models import Order
+from orders.services import geocoding
+from orders.services.nearby import haversine_km, nearest_ready_orders
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from restaurant.models import Category, Dish
+from restaurant.services.orders import create_order_with_items
+
+User = get_user_model()
+
+KHRESHCHATYK = (50.4474, 30.5223)
+PODIL = (50.4654, 30.5186)
+
+
+class InlineExecutor:
+    def submit(self, func, *args):
+        func(*args)
+
+
+class GeocodingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        path = Path(directory.name) / "addresses.csv"
+        path.write_text(f"Khreshchatyk 1,{KHRESHCHATYK[0]},{KHRESHCHATYK[1]}\n", encoding="utf-8")
+        self.geocoder = geocoding.FileGeocoder(path)
+        patcher = mock.patch("orders.services.geocoding._geocoder", self.geocoder)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        category = Category.objects.create(name="Pizza")
+        self.dish = Dish.objects.create(category=category, name="Margherita", description="-", price=10)
+
+    def test_placed_orders_are_geocoded_on_commit(self):
+        with mock.patch("orders.services.geocoding._get_executor", return_value=InlineExecutor()):
+            with self.captureOnCommitCallbacks(execute=True):
+                order = create_order_with_items(
+                    {"phone": "0501234567", "delivery_address": "  khreshchatyk   1 "},
+                    [{"dish_id": self.dish.id, "quantity": 1}],
+                )
+        order.refresh_from_db()
+        self.assertEqual((order.latitude, order.longitude), KHRESHCHATYK)
+
+    def test_answers_are_cached_misses_too(self):
+        with mock.patch.object(self.geocoder, "geocode", wraps=self.geocoder.geocode) as geocode:
+            self.assertEqual(geocoding.geocode("Khreshchatyk 1"), KHRESHCHATYK)
+            self.assertEqual(geocoding.geocode("KHRESHCHATYK 1"), KHRESHCHATYK)
+            self.assertIsNone(geocoding.geocode("Nowhere 7"))
+            self.assertIsNone(geocoding.geocode("Nowhere 7"))
+        self.assertEqual(geocode.call_count, 2)
+
+    def test_command_fills_in_missing_positions(self):
+        known = Order.objects.create(phone="0501234567", delivery_address="Khreshchatyk 1")
+        unknown = Order.objects.create(phone="0501234567", delivery_address="Nowhere 7")
+        Order.objects.create(phone="0501234567", self_pickup=True)
+
+        call_command("geocode_orders", batch_size=1, stdout=None)
+
+        self.assertEqual(Order.objects.values_list("latitude", flat=True).get(pk=known.pk), KHRESHCHATYK[0])
+        self.assertIsNone(Order.objects.values_list("latitude", flat=True).get(pk=unknown.pk))
+
+
+class NearestReadyOrdersTests(TestCase):
+    def ready(self, position, **fields):
+        return Order.objects.create(
+            phone="0501234567",
+            delivery_address="Somewhere",
+            latitude=position[0],
+            longitude=position[1],
+            status=fields.pop("status", Order.Status.WAITING_FOR_COURIER),
+            **fields,
+        )
+
+    def test_nearest_first_with_distances(self):
+        far = self.ready(PODIL)
+        near = self.ready(KHRESHCHATYK)
+        self.ready(KHRESHCHATYK, status=Order.Status.DELIVERING)
+        Order.objects.create(phone="0501234567", status=Order.Status.WAITING_FOR_COURIER)  # not geocoded
+
+        orders = nearest_ready_orders(50.4500, 30.5234)
+
+        self.assertEqual([order["id"] for order in orders], [near.id, far.id])
+        self.assertAlmostEqual(orders[0]["distance_km"], 0.3, delta=0.05)
+        self.assertAlmostEqual(orders[1]["distance_km"], haversine_km(50.45, 30.5234, *PODIL), places=2)
+
+    @override_settings(ORDER_NEARBY_MAX_KM=40)
+    def test_matches_a_full_scan(self):
+        rng = random.Random(7)  # noqa: S311 - deterministic test data
+        for _ in range(300):
+            # Up to ~80 km away, so some are beyond ORDER_NEARBY_MAX_KM and most beyond the first box.
+            self.ready((50.45 + rng.uniform(-0.7, 0.7), 30.52 + rng.uniform(-1.1, 1.1)))
+        courier = (50.47, 30.40)
+        expected = sorted(
+            (haversine_km(*courier, latitude, longitude), pk)
+            for pk, latitude, longitude in Order.objects.values_list("pk", "latitude", "longitude")
+        )
+        expected = [pk for distance, pk in expected if distance <= 40]
+
+        for limit in (1, 20, 100, len(expected) + 10):
+            with self.subTest(limit=limit):
+                self.assertEqual(
+                    [order["id"] for order in nearest_ready_orders(*courier, limit=limit)], expected[:limit]
+                )
+
+
+class ReadyOrdersNearbyApiTests(APITestCase):
+    def setUp(self):
+        self.courier = User.objects.create_user(
+            email="courier@example.com", password="Test12345!", first_name="C", last_name="U", role=User.Role.COURIER
+        )
+        self.kitchen = User.objects.create_user(
+            email="kitchen@example.com",
+            password="Test12345!",
+            first_name="K",
+            last_name="U",
+            role=User.Role.KITCHEN_STAFF,
+        )
+        self.order = Order.objects.create(
+            phone="0501234567",
+            delivery_address="Khreshchatyk 1",
+            latitude=KHRESHCHATYK[0],
+            longitude=KHRESHCHATYK[1],
+            status=Order.Status.WAITING_FOR_COURIER,
+        )
+
+    def get(self, user, query):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+        return self.client.get(f"/api/v0/orders/ready/nearby/{query}")
+
+    def test_courier_gets_the_nearest_orders(self):
+        response = self.get(self.courier, "?lat=50.45&lon=30.5234&limit=5")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(order["id"], order["delivery_address"]) for order in response.json()], [(self.order.id, "Khreshchatyk 1")]
+        )
+
+    def test_position_is_required(self):
+        self.assertEqual(self.get(self.courier, "?lat=50.45").status_code, 400)
+        self.assertEqual(self.get(self.courier, "?lat=91&lon=30").status_code, 400)
+
+    def test_only_couriers_and_managers(self):
+        self.assertEqual(self.get(self.kitchen, "?lat=50.45&lon=30.5234").status_code, 403)
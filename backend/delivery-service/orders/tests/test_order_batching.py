@@ -0,0 +1,114 @@
+import itertools
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from orders.models import Order
+from orders.services.batching import (
+    distance_matrix,
+    nearest_neighbour,
+    plan_batches,
+    route_length,
+    route_minutes,
+    two_opt,
+)
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+
+User = get_user_model()
+
+COURIER = (50.4501, 30.5234)
+
+
+def random_points(rng, count, spread=0.05):
+    return [COURIER] + [
+        (COURIER[0] + rng.uniform(-spread, spread), COURIER[1] + rng.uniform(-spread, spread)) for _ in range(count)
+    ]
+
+
+class RouteTests(SimpleTestCase):
+    def test_two_opt_untangles_a_crossing_route(self):
+        # Courier in one corner of a square; the route crosses it along a diagonal.
+        matrix = distance_matrix([(0.0, 0.0), (0.0, 0.01), (0.01, 0.0), (0.01, 0.01)])
+        route, finished = two_opt(matrix, [2, 1, 3], time.thread_time() + 1)
+        self.assertTrue(finished)
+        self.assertIn(route, ([1, 3, 2], [2, 3, 1]))
+        self.assertLess(route_length(matrix, route), route_length(matrix, [2, 1, 3]))
+
+    def test_never_worse_than_nearest_neighbour_and_near_optimal(self):
+        rng = random.Random(3)  # noqa: S311 - deterministic test data
+        for _ in range(20):
+            matrix = distance_matrix(random_points(rng, 6))
+            greedy = nearest_neighbour(matrix, set(range(1, 7)), capacity=6, max_minutes=10_000)
+            improved, _ = two_opt(matrix, greedy, time.thread_time() + 1)
+            best = min(route_length(matrix, order) for order in itertools.permutations(range(1, 7)))
+            self.assertEqual(sorted(improved), list(range(1, 7)))
+            self.assertLessEqual(route_length(matrix, improved), route_length(matrix, greedy) + 1e-9)
+            self.assertLessEqual(route_length(matrix, improved), best * 1.15)
+
+    def test_limits(self):
+        matrix = distance_matrix(random_points(random.Random(5), 10))  # noqa: S311
+        self.assertEqual(len(nearest_neighbour(matrix, set(range(1, 11)), capacity=3, max_minutes=10_000)), 3)
+
+        route = nearest_neighbour(matrix, set(range(1, 11)), capacity=10, max_minutes=20)
+        self.assertLessEqual(route_minutes(route_length(matrix, route), len(route)), 20)
+        self.assertLess(len(route), 10)
+
+    def test_spent_budget_keeps_the_route(self):
+        matrix = distance_matrix(random_points(random.Random(9), 8))  # noqa: S311
+        route = [8, 1, 7, 2, 6, 3, 5, 4]
+        self.assertEqual(two_opt(matrix, route, deadline=0), (route, False))
+
+
+@override_settings(ORDER_BATCH_CAPACITY=3, ORDER_BATCH_MAX_MINUTES=60)
+class PlanBatchesTests(TestCase):
+    def test_disjoint_batches_within_the_limits(self):
+        for latitude, longitude in random_points(random.Random(11), 10)[1:]:  # noqa: S311
+            Order.objects.create(
+                phone="0501234567",
+                delivery_address="Somewhere",
+                latitude=latitude,
+                longitude=longitude,
+                status=Order.Status.WAITING_FOR_COURIER,
+            )
+
+        plan = plan_batches(*COURIER)
+
+        self.assertTrue(plan["optimized"])
+        self.assertEqual([len(batch["orders"]) for batch in plan["batches"]], [3, 3, 3])
+        ids = [order["id"] for batch in plan["batches"] for order in batch["orders"]]
+        self.assertEqual(len(ids), len(set(ids)))
+        for batch in plan["batches"]:
+            self.assertAlmostEqual(batch["distance_km"], sum(order["leg_km"] for order in batch["orders"]), places=2)
+            self.assertLessEqual(batch["minutes"], 60)
+
+    def test_nothing_ready(self):
+        self.assertEqual(plan_batches(*COURIER), {"batches": [], "optimized": True})
+
+
+class ReadyOrderBatchesApiTests(APITestCase):
+    def get(self, role, query="?lat=50.45&lon=30.52"):
+        user = User.objects.create_user(
+            email=f"{role.lower()}@example.com", password="Test12345!", first_name="T", last_name="U", role=role
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+        return self.client.get(f"/api/v0/orders/ready/batches/{query}")
+
+    def test_courier_gets_batches(self):
+        Order.objects.create(
+            phone="0501234567",
+            delivery_address="Khreshchatyk 1",
+            latitude=50.4474,
+            longitude=30.5223,
+            status=Order.Status.WAITING_FOR_COURIER,
+        )
+        response = self.get(User.Role.COURIER)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([len(batch["orders"]) for batch in response.json()["batches"]], [1])
+
+    def test_only_couriers_and_managers(self):
+        self.assertEqual(self.get(User.Role.KITCHEN_STAFF).status_code, 403)
+
+    def test_position_is_required(self):
+        self.assertEqual(self.get(User.Role.COURIER, "?lon=30.52").status_code, 400)
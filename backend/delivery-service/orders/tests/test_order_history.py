@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from orders.models import Order, OrderItem
+from rest_framework.test import APITestCase
+from restaurant.models import Category, Dish
+
+User = get_user_model()
+
+
+class OrderHistoryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="user@example.com", password="Test12345!", first_name="U", last_name="U"
+        )
+        other = User.objects.create_user(
+            email="other@example.com", password="Test12345!", first_name="O", last_name="U"
+        )
+        dish = Dish.objects.create(
+            category=Category.objects.create(name="Pizza"), name="Margherita", description="-", price=10
+        )
+
+        now = timezone.now()
+        orders = Order.objects.bulk_create([Order(user=self.user, guest_name="U") for _ in range(25)])
+        Order.objects.create(user=other, guest_name="O")
+        OrderItem.objects.bulk_create([OrderItem(order=order, dish=dish, unit_price=10) for order in orders])
+        # Groups of five share a timestamp, so the id has to break the ties.
+        created = {order.id: now - timedelta(minutes=index // 5) for index, order in enumerate(orders)}
+        for pk, created_at in created.items():
+            Order.objects.filter(pk=pk).update(created_at=created_at)
+        self.expected = sorted(created, key=lambda pk: (created[pk], pk), reverse=True)
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url):
+        ids, pages = [], 0
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [order["id"] for order in response.json()["results"]]
+            url, pages = response.json()["next"], pages + 1
+        return ids, pages
+
+    def test_pages_follow_created_at_then_id(self):
+        ids, pages = self.walk("/api/v0/orders/mine/?page_size=10")
+        self.assertEqual(ids, self.expected)
+        self.assertEqual(pages, 3)
+
+    def test_always_paginated(self):
+        response = self.client.get("/api/v0/orders/mine/")
+        self.assertEqual(len(response.json()["results"]), 20)
+        self.assertIsNotNone(response.json()["next"])
+        self.assertEqual(response.json()["results"][0]["items"][0]["dish_name"], "Margherita")
+
+    def test_summary_skips_the_items(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/v0/orders/mine/?view=summary&page_size=100")
+        first = response.json()["results"][0]
+        self.assertEqual(sorted(first), ["created_at", "id", "status", "total_price"])
+        self.assertEqual((first["id"], first["status"]), (self.expected[0], "new"))
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn("orders_orderitem", queries[0]["sql"])
+
+    def test_items_in_one_query_per_page(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get("/api/v0/orders/mine/?page_size=25")
+        self.assertEqual(len(queries), 2)
+
+    def test_rejects_unknown_views_and_anonymous_users(self):
+        self.assertEqual(self.client.get("/api/v0/orders/mine/?view=full").status_code, 400)
+        self.client.force_authenticate(None)
+        self.assertEqual(self.client.get("/api/v0/orders/mine/").status_code, 401)
@@ -0,0 +1,106 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+from orders.models import Order
+from orders.services.analytics import standard_report
+from orders.services.snapshots import Snapshot, SnapshotError, write_snapshot
+from restaurant.models import Category, Dish
+from restaurant.services.orders import create_order_with_items
+
+
+class OrderSnapshotTests(TestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Pizza")
+        self.margherita = Dish.objects.create(category=category, name="Margherita", description="-", price=10)
+        self.cola = Dish.objects.create(category=category, name="Cola", description="-", price=3)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "orders.zip")
+
+    def place(self, lines, created_at, **order_data):
+        order = create_order_with_items(
+            {"phone": "0501234567", "delivery_address": "Khreshchatyk 1", **order_data},
+            [{"dish_id": dish.id, "quantity": quantity} for dish, quantity in lines],
+        )
+        Order.objects.filter(pk=order.pk).update(created_at=created_at)
+        return order
+
+    def test_columns_round_trip_in_row_groups(self):
+        # Monday 9 March 2026, 13:30 UTC.
+        monday = timezone.make_aware(datetime(2026, 3, 9, 13, 30))
+        first = self.place([(self.margherita, 2), (self.cola, 1)], monday, payment_method="credit")
+        second = self.place([(self.cola, 3)], monday + timedelta(days=1), self_pickup=True, delivery_address="")
+
+        self.assertEqual(list(write_snapshot(self.path, chunk_size=2)), [2, 1])
+
+        with Snapshot(self.path) as snapshot:
+            self.assertEqual(snapshot.rows, 3)
+            groups = list(snapshot.row_groups("order_id", "hour_of_week", "payment_method", "line_total"))
+        self.assertEqual([list(group["order_id"]) for group in groups], [[first.id, first.id], [second.id]])
+        self.assertEqual(list(groups[0]["hour_of_week"]), [13, 13])
+        self.assertEqual(list(groups[1]["hour_of_week"]), [24 + 13])
+        self.assertEqual([list(group["line_total"]) for group in groups], [[2000, 300], [900]])
+        self.assertEqual(snapshot.manifest["payment_methods"][groups[0]["payment_method"][0]], "credit")
+        self.assertEqual(set(groups[0]), {"order_id", "hour_of_week", "payment_method", "line_total"})
+
+    def test_standard_report(self):
+        monday = timezone.make_aware(datetime(2026, 3, 9, 18))
+        self.place([(self.margherita, 1), (self.cola, 2)], monday)
+        self.place([(self.margherita, 1)], monday + timedelta(days=1))
+        # Cheaper Margherita for a day: it sells twice as much.
+        Dish.objects.filter(pk=self.margherita.pk).update(price=5)
+        self.place([(self.margherita, 2)], monday + timedelta(days=2))
+        list(write_snapshot(self.path, chunk_size=1))
+
+        with Snapshot(self.path) as snapshot:
+            report = standard_report(snapshot)
+
+        self.assertEqual(report["totals"], {"orders": 3, "lines": 4, "items": 6, "revenue": "36.00"})
+        self.assertEqual(report["revenue_by_hour_of_week"][18], {"day": "Mon", "hour": 18, "revenue": "16.00"})
+        self.assertEqual(report["revenue_by_hour_of_week"][24 + 18]["revenue"], "10.00")
+        self.assertEqual(
+            report["basket_sizes"], [{"items": 1, "orders": 1}, {"items": 2, "orders": 1}, {"items": 3, "orders": 1}]
+        )
+        # Half the price, twice the items per day.
+        self.assertEqual(report["price_elasticity"], [{"dish_id": self.margherita.id, "prices": 2, "elasticity": -1.0}])
+
+    def test_report_does_not_depend_on_the_row_groups(self):
+        start = timezone.make_aware(datetime(2026, 3, 9, 12))
+        for index in range(7):
+            lines = [(self.margherita, 1 + index % 3), (self.cola, 1)][: 1 + index % 2]
+            self.place(lines, start + timedelta(hours=5 * index))
+
+        reports = []
+        for chunk_size in (1, 2, 3, 100):
+            list(write_snapshot(self.path, chunk_size=chunk_size))
+            with Snapshot(self.path) as snapshot:
+                reports.append(standard_report(snapshot))
+        self.assertEqual(reports[0]["totals"], {"orders": 7, "lines": 10, "items": 16, "revenue": "139.00"})
+        for report in reports[1:]:
+            self.assertEqual(report, reports[0])
+
+    def test_export_reads_through_an_iterator(self):
+        self.place([(self.cola, 1)], timezone.now())
+        with self.assertNumQueries(1):
+            list(write_snapshot(self.path, chunk_size=1000))
+
+    def test_commands(self):
+        self.place([(self.cola, 1)], timezone.now())
+        call_command("export_order_snapshot", self.path, stdout=StringIO())
+        out = StringIO()
+        call_command("analyze_order_snapshot", self.path, stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["totals"]["revenue"], "3.00")
+
+        with open(self.path, "w") as not_a_snapshot:
+            not_a_snapshot.write("orders")
+        with self.assertRaises(SnapshotError):
+            Snapshot(self.path)
+        with self.assertRaises(CommandError):
+            call_command("analyze_order_snapshot", self.path, stdout=StringIO())
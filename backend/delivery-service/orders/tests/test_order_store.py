@@ -0,0 +1,127 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.utils import timezone
+from orders.models import Order, OrderItem
+from orders.services.backfill import copy_legacy_orders
+from rest_framework.test import APITestCase
+from restaurant.models import Category, Dish, LegacyOrder, LegacyOrderItem
+
+
+class OneOrderTableTests(APITestCase):
+    """
+    Both order APIs are views over orders.Order.
+    """
+
+    def setUp(self):
+        category = Category.objects.create(name="Pizza")
+        self.dish = Dish.objects.create(name="Margherita", category=category, price=100, description="Test pizza")
+
+    def test_restaurant_order_in_both_shapes(self):
+        body = {"phone": "0501234567", "self_pickup": True, "items_input": [{"dish_id": self.dish.id, "quantity": 2}]}
+        created = self.client.post("/api/v0/menu/orders/", body, format="json").json()
+
+        self.assertIsNone(created["delivery_address"])
+        self.assertEqual(created["total_amount"], "200.00")
+        self.assertEqual(created["items"][0]["line_total"], "200.00")
+
+        order = self.client.get(f"/api/v0/orders/{created['id']}/").json()
+        self.assertEqual(order["guest_phone"], "0501234567")
+        self.assertEqual(order["guest_address"], "")
+        self.assertEqual(order["total_price"], "200.00")
+        self.assertEqual(
+            order["items"],
+            [{"dish_id": self.dish.id, "dish_name": "Margherita", "quantity": 2, "unit_price": "100.00"}],
+        )
+
+    def test_guest_order_in_both_shapes(self):
+        body = {
+            "guest_name": "Guest",
+            "guest_phone": "0501234567",
+            "guest_address": "Khreshchatyk 1",
+            "dishes": [self.dish.id],
+        }
+        created = self.client.post("/api/v0/orders/", body, format="json").json()
+
+        order = self.client.get(f"/api/v0/menu/orders/{created['id']}/").json()
+        self.assertEqual(order["phone"], "0501234567")
+        self.assertEqual(order["delivery_address"], "Khreshchatyk 1")
+        self.assertEqual(order["total_amount"], "100.00")
+        self.assertEqual(order["items"][0]["name"], "Margherita")
+        self.assertEqual(Order.objects.count(), 1)
+
+
+class BackfillOrdersTests(APITestCase):
+    def setUp(self):
+        category = Category.objects.create(name="Pizza")
+        self.dish = Dish.objects.create(name="Margherita", category=category, price=100, description="Test pizza")
+        self.placed_at = timezone.now() - timedelta(days=30)
+        self.legacy = []
+        for index in range(5):
+            legacy = LegacyOrder.objects.create(
+                status="paid_cash",
+                payment_method="cash",
+                delivery_address=None if index % 2 else f"Street {index}",
+                self_pickup=bool(index % 2),
+                phone=f"050000000{index}",
+                created_at=self.placed_at,
+                updated_at=self.placed_at,
+                total_amount=Decimal("30.00"),
+            )
+            LegacyOrderItem.objects.bulk_create(
+                [
+                    LegacyOrderItem(
+                        order=legacy,
+                        dish=self.dish,
+                        name="Old name",
+                        unit_price=Decimal("10.00"),
+                        quantity=quantity,
+                        line_total=Decimal("10.00") * quantity,
+                    )
+                    for quantity in (1, 2)
+                ]
+            )
+            self.legacy.append(legacy)
+
+    def backfill(self, *args):
+        call_command("backfill_orders", "--chunk-size", "2", *args, stdout=StringIO())
+
+    def test_copies_legacy_orders_with_their_items_and_timestamps(self):
+        self.backfill()
+
+        self.assertEqual(Order.objects.count(), 5)
+        for legacy in self.legacy:
+            order = Order.objects.get(legacy_id=legacy.id)
+            self.assertEqual(
+                (order.phone, order.delivery_address, order.self_pickup, order.status, order.total_amount),
+                (legacy.phone, legacy.delivery_address or "", legacy.self_pickup, "paid_cash", Decimal("30.00")),
+            )
+            self.assertEqual(order.created_at, self.placed_at)
+            self.assertEqual(
+                list(order.items.order_by("id").values_list("name", "quantity", "line_total")),
+                [("Old name", 1, Decimal("10.00")), ("Old name", 2, Decimal("20.00"))],
+            )
+
+    def test_resumes_after_an_interruption(self):
+        chunks = copy_legacy_orders(chunk_size=2)
+        next(chunks)
+        chunks.close()
+        self.assertEqual(Order.objects.count(), 2)
+
+        self.backfill()
+        self.backfill()
+
+        self.assertEqual(
+            sorted(Order.objects.values_list("legacy_id", flat=True)), [legacy.id for legacy in self.legacy]
+        )
+        self.assertEqual(OrderItem.objects.count(), 10)
+
+    def test_fills_old_item_snapshots(self):
+        order = Order.objects.create(guest_name="Guest", phone="0501234567")
+        OrderItem.objects.bulk_create([OrderItem(order=order, dish=self.dish, quantity=3, unit_price=Decimal("12.50"))])
+
+        self.backfill()
+
+        self.assertEqual(order.items.values_list("name", "line_total").get(), ("Margherita", Decimal("37.50")))
@@ -0,0 +1,161 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError, connection, connections
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from orders.models import Order
+from orders.services.kitchen import board_snapshot
+from orders.services.transitions import TransitionConflict, transition_order
+from rest_framework.test import APITestCase
+
+User = get_user_model()
+
+
+def make_user(role, email):
+    return User.objects.create_user(email=email, password="Test12345!", first_name="Test", last_name="User", role=role)
+
+
+class OrderStatusApiTests(APITestCase):
+    def setUp(self):
+        self.kitchen = make_user(User.Role.KITCHEN_STAFF, "kitchen@example.com")
+        self.courier = make_user(User.Role.COURIER, "courier@example.com")
+        self.order = Order.objects.create(phone="0501234567", delivery_address="Khreshchatyk 1")
+
+    def move(self, user, target, expected=None, order_id=None):
+        self.client.force_authenticate(user)
+        body = {"status": target} if expected is None else {"status": target, "expected_status": expected}
+        return self.client.post(f"/api/v0/orders/{order_id or self.order.id}/status/", body, format="json")
+
+    def test_full_workflow(self):
+        self.assertEqual(
+            self.move(self.kitchen, "preparing", "new").json(), {"id": self.order.id, "status": "preparing"}
+        )
+        self.assertEqual(self.move(self.kitchen, "waiting_for_courier").status_code, 200)
+        self.assertEqual(self.move(self.courier, "delivering").status_code, 200)
+        self.assertEqual(self.move(self.courier, "completed").status_code, 200)
+
+        self.order.refresh_from_db()
+        self.assertEqual((self.order.status, self.order.courier), (Order.Status.COMPLETED, self.courier))
+
+    def test_roles(self):
+        self.assertEqual(self.move(self.courier, "preparing").status_code, 403)
+        self.client.force_authenticate(None)
+        response = self.client.post(f"/api/v0/orders/{self.order.id}/status/", {"status": "preparing"}, format="json")
+        self.assertEqual(response.status_code, 401)
+
+        self.move(self.kitchen, "preparing")
+        self.move(self.kitchen, "waiting_for_courier")
+        self.assertEqual(self.move(self.kitchen, "delivering").status_code, 403)
+
+    def test_transition_not_in_the_table(self):
+        self.assertEqual(self.move(self.kitchen, "waiting_for_courier", "new").status_code, 400)
+        self.assertEqual(self.move(self.kitchen, "new").status_code, 400)
+
+    def test_stale_status_conflicts(self):
+        self.move(self.kitchen, "preparing", "new")
+
+        response = self.move(self.kitchen, "preparing", "new")
+
+        self.assertEqual(response.status_code, 409)
+        self.order.refresh_from_db()
+        self.assertEqual(self.order.status, Order.Status.PREPARING)
+
+    def test_only_the_assigned_courier_completes(self):
+        other = make_user(User.Role.COURIER, "other@example.com")
+        Order.objects.filter(pk=self.order.pk).update(status=Order.Status.WAITING_FOR_COURIER)
+        self.move(self.courier, "delivering")
+
+        self.assertEqual(self.move(other, "delivering").status_code, 409)
+        self.assertEqual(self.move(other, "completed").status_code, 409)
+        self.assertEqual(self.move(self.courier, "completed").status_code, 200)
+
+    def test_self_pickup_workflow(self):
+        order = Order.objects.create(phone="0501234567", self_pickup=True, payment_method="credit")
+        order.status = order.placement_status()
+        order.save()
+        self.assertIn(order.id, [entry["id"] for entry in board_snapshot()["orders"]])
+
+        self.assertEqual(self.move(self.kitchen, "preparing", "paid_credit", order_id=order.id).status_code, 200)
+        self.assertEqual(self.move(self.kitchen, "waiting_for_courier", order_id=order.id).status_code, 200)
+        self.assertNotIn(order.id, [entry["id"] for entry in board_snapshot()["orders"]])
+        # Picked up at the counter: no courier takes it.
+        self.assertEqual(self.move(self.courier, "delivering", order_id=order.id).status_code, 409)
+        self.assertEqual(self.move(self.courier, "completed", order_id=order.id).status_code, 409)
+        self.assertEqual(self.move(self.kitchen, "completed", order_id=order.id).status_code, 200)
+
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.courier), (Order.Status.COMPLETED, None))
+
+    def test_awaiting_cash_and_legacy_orders_go_to_the_kitchen(self):
+        for status in (Order.Status.AWAITING_CASH, Order.Status.PAID_CASH, Order.Status.IN_PROGRESS):
+            order = Order.objects.create(phone="0501234567", self_pickup=True, status=status)
+            self.assertEqual(self.move(self.kitchen, "preparing", order_id=order.id).status_code, 200)
+
+    def test_kitchen_does_not_complete_deliveries(self):
+        Order.objects.filter(pk=self.order.pk).update(status=Order.Status.WAITING_FOR_COURIER)
+        self.assertEqual(self.move(self.kitchen, "completed").status_code, 409)
+        self.move(self.courier, "delivering")
+        self.assertEqual(self.move(self.kitchen, "completed").status_code, 409)
+
+    def test_missing_order(self):
+        self.assertEqual(self.move(self.kitchen, "preparing", order_id=self.order.id + 1).status_code, 404)
+
+    def test_one_conditional_update_and_no_lock(self):
+        with CaptureQueriesContext(connection) as queries:
+            transition_order(self.order.id, Order.Status.PREPARING, self.kitchen, Order.Status.NEW)
+
+        # The UPDATE comes first, unlocked and without a read; then the kitchen board delta and the
+        # sales rollup move (the order's items, one upsert per rollup table), in its savepoint.
+        statements = [query["sql"] for query in queries if not query["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+        self.assertEqual([sql.split()[0] for sql in statements], ["UPDATE", "INSERT", "SELECT", "INSERT", "INSERT"])
+        self.assertIn("orders_kitchenevent", statements[1])
+        self.assertIn("orders_saleshourly", statements[3])
+        self.assertIn("orders_salesdaily", statements[4])
+        self.assertNotIn("FOR UPDATE", statements[0])
+
+    def test_status_read_first_only_without_a_single_source(self):
+        with CaptureQueriesContext(connection) as queries:
+            transition_order(self.order.id, Order.Status.PREPARING, self.kitchen)
+
+        # preparing can be reached from several statuses: the current one is read, then compared.
+        statements = [query["sql"] for query in queries if not query["sql"].startswith(("SAVEPOINT", "RELEASE"))]
+        self.assertEqual([sql.split()[0] for sql in statements[:2]], ["SELECT", "UPDATE"])
+        self.assertIn("orders_salesdaily", statements[-1])
+
+
+class ConcurrentTakeTests(TransactionTestCase):
+    THREADS = 16
+
+    def test_exactly_one_courier_takes_the_order(self):
+        couriers = [make_user(User.Role.COURIER, f"courier{index}@example.com") for index in range(self.THREADS)]
+        order = Order.objects.create(phone="0501234567", status=Order.Status.WAITING_FOR_COURIER)
+        start = threading.Barrier(self.THREADS)
+        won, lost = [], []
+
+        def take(courier):
+            try:
+                start.wait()
+                while True:
+                    try:
+                        transition_order(order.id, Order.Status.DELIVERING, courier)
+                        break
+                    except OperationalError:
+                        # SQLite's shared-cache test database fails on table locks instead of waiting.
+                        continue
+                won.append(courier)
+            except TransitionConflict as exc:
+                lost.append(exc.current_status)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=take, args=(courier,)) for courier in couriers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(won), 1)
+        self.assertEqual(lost, [Order.Status.DELIVERING] * (self.THREADS - 1))
+        order.refresh_from_db()
+        self.assertEqual((order.status, order.courier), (Order.Status.DELIVERING, won[0]))
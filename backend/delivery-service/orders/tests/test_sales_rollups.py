@@ -0,0 +1,150 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from orders.models import Order, SalesDaily, SalesHourly
+from orders.services.sales import catch_up_sales, order_cells, reset_sales, sales_report
+from orders.services.transitions import transition_order
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from restaurant.models import Category, Dish
+from restaurant.services.orders import create_order_with_items
+
+User = get_user_model()
+
+LATER = timedelta(hours=1)
+
+
+def rollup_rows():
+    fields = ("status", "payment_method", "category_id", "dish_id", "orders", "quantity", "revenue")
+    return {
+        "hourly": sorted(SalesHourly.objects.exclude(orders=0).values_list("hour", *fields)),
+        "daily": sorted(SalesDaily.objects.exclude(orders=0).values_list("day", *fields)),
+    }
+
+
+def catch_up():
+    return sum(catch_up_sales(now=timezone.now() + LATER))
+
+
+class SalesRollupTests(TestCase):
+    def setUp(self):
+        pizza, drinks = Category.objects.create(name="Pizza"), Category.objects.create(name="Drinks")
+        self.margherita = Dish.objects.create(category=pizza, name="Margherita", description="-", price=10)
+        self.pepperoni = Dish.objects.create(category=pizza, name="Pepperoni", description="-", price=12)
+        self.cola = Dish.objects.create(category=drinks, name="Cola", description="-", price=3)
+        self.kitchen = User.objects.create_user(
+            email="kitchen@example.com", password="Test12345!", first_name="K", last_name="S", role="KITCHEN_STAFF"
+        )
+
+    def place(self, lines, **order_data):
+        return create_order_with_items(
+            {"phone": "0501234567", "delivery_address": "Khreshchatyk 1", **order_data},
+            [{"dish_id": dish.id, "quantity": quantity} for dish, quantity in lines],
+        )
+
+    def test_an_order_counts_once_per_level(self):
+        lines = [(1, 7, 2, Decimal("20")), (2, 7, 1, Decimal("12")), (1, 7, 1, Decimal("10"))]
+        cells = order_cells("new", "cash", lines)
+        self.assertEqual(cells[("new", "cash", 0, 0)], [1, 4, Decimal("42")])
+        self.assertEqual(cells[("new", "cash", 7, 0)], [1, 4, Decimal("42")])
+        self.assertEqual(cells[("new", "cash", 7, 1)], [1, 3, Decimal("30")])
+
+    def test_incremental_updates_match_a_rebuild(self):
+        first = self.place([(self.margherita, 2), (self.cola, 1)])
+        self.place([(self.pepperoni, 1), (self.margherita, 1)], payment_method="credit")
+        self.place([(self.cola, 3)], self_pickup=True, delivery_address="")
+        transition_order(first.id, Order.Status.PREPARING, self.kitchen)
+
+        incremental = rollup_rows()
+        reset_sales()
+        self.assertEqual(catch_up(), 1)
+
+        self.assertEqual(rollup_rows(), incremental)
+        totals = sales_report(*self.today())["totals"]
+        self.assertEqual(totals, {"orders": 3, "quantity": 8, "revenue": "54.00"})
+
+    def test_catch_up_picks_up_other_changes_after_the_watermark(self):
+        order = self.place([(self.margherita, 1)])
+        self.assertEqual(catch_up(), 1)
+        self.assertEqual(catch_up(), 0)
+
+        # An edit that skips the services, e.g. in the admin.
+        Order.objects.filter(pk=order.pk).update(payment_method="credit", updated_at=timezone.now() + LATER)
+        self.assertEqual(sales_report(*self.today(), group_by="payment_method")["rows"][0]["key"], "cash")
+        self.assertEqual(sum(catch_up_sales(now=timezone.now() + 2 * LATER)), 1)
+
+        rows = sales_report(*self.today(), group_by="payment_method")["rows"]
+        self.assertEqual([(row["key"], row["orders"]) for row in rows], [("credit", 1)])
+
+    def test_report_adds_full_days_and_the_hours_around_them(self):
+        base = timezone.make_aware(datetime(2026, 3, 10, 12))
+        for offset, dish in ((-26, self.cola), (-12, self.margherita), (0, self.margherita), (30, self.pepperoni)):
+            order = self.place([(dish, 1)])
+            Order.objects.filter(pk=order.pk).update(created_at=base + timedelta(hours=offset))
+        reset_sales()
+        catch_up()
+
+        # 9 March 10:00 (the -26 h order) to 11 March 19:00: the hours of the 9th and 11th, all of the 10th.
+        start, end = base - timedelta(hours=26), base + timedelta(hours=31)
+        with CaptureQueriesContext(connection) as queries:
+            report = sales_report(start, end, group_by="category")
+        self.assertEqual(report["totals"], {"orders": 4, "quantity": 4, "revenue": "35.00"})
+        self.assertEqual(
+            [(row["name"], row["orders"], row["revenue"]) for row in report["rows"]],
+            [("Pizza", 3, "32.00"), ("Drinks", 1, "3.00")],
+        )
+        self.assertFalse(any("orders_order" in query["sql"] for query in queries))
+
+        self.assertEqual(sales_report(start + LATER, end - LATER)["totals"]["orders"], 2)
+        self.assertEqual(sales_report(start, end, status="preparing")["totals"]["orders"], 0)
+
+    @override_settings(SALES_ROLLUP_LAG=timedelta(0))
+    def test_command_rebuilds(self):
+        self.place([(self.margherita, 1)])
+        SalesHourly.objects.all().delete()
+
+        call_command("rollup_sales", "--rebuild", stdout=StringIO())
+
+        self.assertEqual(sales_report(*self.today())["totals"]["orders"], 1)
+
+    def today(self):
+        start = timezone.now().replace(minute=0, second=0, microsecond=0)
+        return start - timedelta(days=1), start + timedelta(days=1)
+
+
+class SalesReportApiTests(APITestCase):
+    url = "/api/v0/orders/reports/sales/"
+
+    def authenticate(self, role):
+        user = User.objects.create_user(
+            email=f"{role.lower()}@example.com", password="Test12345!", first_name="T", last_name="U", role=role
+        )
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {RefreshToken.for_user(user).access_token}")
+
+    def test_managers_get_the_report(self):
+        self.authenticate(User.Role.MANAGER)
+        response = self.client.get(self.url, {"start": "2026-03-01", "end": "2026-04-01", "group_by": "dish"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["totals"], {"orders": 0, "quantity": 0, "revenue": "0.00"})
+        self.assertEqual(response.json()["rows"], [])
+
+    def test_period_is_validated(self):
+        self.authenticate(User.Role.MANAGER)
+        for query in (
+            {"start": "2026-03-01T10:30", "end": "2026-04-01"},
+            {"start": "2026-04-01", "end": "2026-03-01"},
+            {"start": "2026-03-01", "end": "2026-04-01", "group_by": "courier"},
+        ):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(self.url, query).status_code, 400)
+
+    def test_managers_only(self):
+        self.authenticate(User.Role.COURIER)
+        self.assertEqual(self.client.get(self.url, {"start": "2026-03-01", "end": "2026-04-01"}).status_code, 403)
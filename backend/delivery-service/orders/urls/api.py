@@ -1,10 +1,20 @@
 from django.urls import include, path
-from orders.views.orders import OrderViewSet
+from orders.views.orders import (
+    OrderStatusView,
+    OrderViewSet,
+    ReadyOrderBatchesView,
+    ReadyOrdersNearbyView,
+    SalesReportView,
+)
 from rest_framework.routers import DefaultRouter
 
 router = DefaultRouter()
 router.register(r"", OrderViewSet, basename="order")
 
 urlpatterns = [
+    path("ready/nearby/", ReadyOrdersNearbyView.as_view(), name="order-ready-nearby"),
+    path("ready/batches/", ReadyOrderBatchesView.as_view(), name="order-ready-batches"),
+    path("reports/sales/", SalesReportView.as_view(), name="order-sales-report"),
+    path("<int:pk>/status/", OrderStatusView.as_view(), name="order-status"),
     path("", include(router.urls)),
 ]
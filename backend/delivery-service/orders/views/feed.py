@@ -0,0 +1,92 @@
+import json
+
+from accounts.authentication import GenerationJWTAuthentication
+from accounts.models import User
+from accounts.services import user_for_access_token
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from orders.models import Order
+from orders.services.events import ORDER_EVENT_FIELDS, RESYNC, broker
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+
+# Courier feed: GET /api/v0/orders/feed/ streams Server-Sent Events (text/event-stream):
+#     event: snapshot      {"orders": [every order waiting for a courier, oldest first]}
+#     event: order_ready   an order is waiting for a courier
+#     event: order_taken   an order stopped waiting (taken by courier_id, or moved on otherwise)
+# plus a ": ping" comment after ORDER_FEED_HEARTBEAT idle seconds. A new snapshot may come at any
+# time (after a listener reconnect, or when the client fell behind); it replaces the list.
+# Self-pickup orders are ready for pickup at the counter, not for couriers, and never show up.
+#
+# An async view: served through app/asgi.py, an idle connection is a suspended coroutine, not a
+# worker (see orders/services/events.py for the fan-out). EventSource can't send headers, so the
+# JWT access token may also come as ?access_token=.
+
+READY = Order.Status.WAITING_FOR_COURIER
+FEED_ROLES = (User.Role.COURIER, User.Role.MANAGER)
+
+
+def _authenticate(request):
+    if "access_token" in request.GET:
+        return user_for_access_token(request.GET["access_token"])
+    try:
+        result = GenerationJWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return result[0] if result else None
+
+
+def feed_event_name(event):
+    if event["self_pickup"]:
+        return None
+    if event["status"] == READY:
+        return "order_ready"
+    if event.get("previous_status") == READY:
+        return "order_taken"
+    return None
+
+
+def _sse(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def _ready_orders():
+    orders = Order.objects.filter(status=READY, self_pickup=False).order_by("created_at").values(*ORDER_EVENT_FIELDS)
+    return [order async for order in orders]
+
+
+async def _event_stream():
+    # Subscribed before the snapshot is read: nothing that changes in between is missed.
+    subscription = broker.subscribe(settings.ORDER_FEED_QUEUE_SIZE)
+    try:
+        yield "retry: 3000\n\n"
+        yield _sse("snapshot", {"orders": await _ready_orders()})
+        while True:
+            try:
+                event = await subscription.get(settings.ORDER_FEED_HEARTBEAT)
+            except TimeoutError:
+                yield ": ping\n\n"
+                continue
+            if event is RESYNC:
+                yield _sse("snapshot", {"orders": await _ready_orders()})
+            elif name := feed_event_name(event):
+                yield _sse(name, event)
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def courier_feed(request):
+    if request.method != "GET":
+        return JsonResponse({"detail": f'Method "{request.method}" not allowed.'}, status=405)
+    user = await sync_to_async(_authenticate)(request)
+    if user is None:
+        return JsonResponse({"detail": "Authentication credentials were not provided or are invalid."}, status=401)
+    if user.role not in FEED_ROLES:
+        return JsonResponse({"detail": "Only couriers and managers can follow the courier feed."}, status=403)
+    return StreamingHttpResponse(
+        _event_stream(),
+        content_type="text/event-stream",
+        # No caching, and no buffering in nginx: events must reach the client as they happen.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
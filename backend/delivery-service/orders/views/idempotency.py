@@ -0,0 +1,72 @@
+from orders.services.idempotency import (
+    IDEMPOTENCY_KEY_HEADER,
+    MAX_KEY_LENGTH,
+    claim_key,
+    release_key,
+    request_hash,
+    store_response,
+)
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+from rest_framework.response import Response
+
+
+class IdempotencyKeyInUse(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "A request with this Idempotency-Key is still being processed."
+    default_code = "idempotency_key_in_use"
+
+
+class IdempotencyKeyMismatch(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = "This Idempotency-Key was already used with a different request body."
+    default_code = "idempotency_key_mismatch"
+
+
+class IdempotentCreateMixin:
+    """
+    Makes POST (create) honour an optional Idempotency-Key header; see orders/services/idempotency.py.
+    Set 'idempotency_scope' to a name unique to the endpoint.
+    """
+
+    idempotency_scope = None
+
+    def get_idempotency_owner(self, request):
+        """
+        Whose keys these are: a key is only looked up among its owner's. Anonymous requests have no
+        owner by default, and their keys are refused: guests sharing one namespace would get each
+        other's conflicts and stored responses. Endpoints open to guests override this.
+        """
+        return f"user:{request.user.pk}" if request.user.is_authenticated else None
+
+    def create(self, request, *args, **kwargs):
+        key = request.headers.get(IDEMPOTENCY_KEY_HEADER)
+        if key is None:
+            return super().create(request, *args, **kwargs)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            raise ValidationError({IDEMPOTENCY_KEY_HEADER: f"Must be 1 to {MAX_KEY_LENGTH} characters."})
+        owner = self.get_idempotency_owner(request)
+        if owner is None:
+            raise ValidationError({IDEMPOTENCY_KEY_HEADER: "Only accepted on authenticated requests here."})
+
+        body_hash = request_hash(request.body)
+        record, claimed = claim_key(self.idempotency_scope, owner, key, body_hash)
+        if not claimed:
+            if record.request_hash != body_hash:
+                raise IdempotencyKeyMismatch()
+            if record.response_status is None:
+                raise IdempotencyKeyInUse()
+            return Response(
+                record.response_body, status=record.response_status, headers={"Idempotent-Replayed": "true"}
+            )
+
+        try:
+            response = super().create(request, *args, **kwargs)
+        except Exception:
+            release_key(record)
+            raise
+        if status.is_success(response.status_code):
+            store_response(record, response.status_code, response.data)
+        else:
+            release_key(record)
+        return response
@@ -1,12 +1,57 @@
-from orders.models import Order
-from orders.serializers.orders import OrderSerializer
-from rest_framework import mixins, permissions, viewsets
+from accounts.permissions import IsCourier, IsKitchenStaff, IsManager
+from app.pagination import KeysetPagination
+from django.db.models import Prefetch
+from django.http import Http404
+from orders.models import Order, OrderItem
+from orders.serializers.orders import (
+    CourierPositionSerializer,
+    NearbyOrdersSerializer,
+    OrderSerializer,
+    OrderSummarySerializer,
+    OrderTransitionSerializer,
+    SalesReportSerializer,
+)
+from orders.services.batching import plan_batches
+from orders.services.nearby import nearest_ready_orders
+from orders.services.sales import sales_report
+from orders.services.transitions import (
+    TransitionConflict,
+    TransitionNotAllowed,
+    can_transition,
+    transition_order,
+    transition_sources,
+)
+from orders.views.idempotency import IdempotentCreateMixin
+from rest_framework import mixins, permissions, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import APIException, PermissionDenied, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 
-class OrderViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
-    queryset = Order.objects.select_related("user").prefetch_related("items__dish")
+class OrderHistoryPagination(KeysetPagination):
+    # Regular customers have hundreds of orders: the history always comes in pages.
+    always_paginate = True
+    page_size = 20
+    max_page_size = 100
+
+
+class OrderViewSet(IdempotentCreateMixin, mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    # Items come with their dish (OrderItemSerializer renders dish.name) in one joined query.
+    queryset = Order.objects.select_related("user").prefetch_related(
+        Prefetch("items", queryset=OrderItem.objects.select_related("dish"))
+    )
     serializer_class = OrderSerializer
     http_method_names = ["get", "post", "head", "options"]
+    # Max SQL queries per request (see app/query_budget.py).
+    # Create includes the two sales rollup upserts; with an Idempotency-Key it also claims the key
+    # and stores the response (+4).
+    # mine: the page of orders and, unless ?view=summary, one query for all their items.
+    query_budgets = {"create": 15, "retrieve": 3, "mine": 3}
+    idempotency_scope = "orders"
+    pagination_class = OrderHistoryPagination
+    # Served by order_user_history_idx.
+    keyset_ordering = ("-created_at", "-id")
 
     def get_permissions(self):
         """
@@ -15,4 +60,115 @@ class OrderViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, viewsets.
         """
         if self.action == "create":
             return [permissions.AllowAny()]
+        if self.action == "mine":
+            return [permissions.IsAuthenticated()]
         return [permissions.IsAuthenticatedOrReadOnly()]
+
+    @action(detail=False, methods=["get"])
+    def mine(self, request):
+        """
+        FR-040: the current user's orders, newest first, in keyset pages (?page_size=, ?cursor=).
+        ?view=summary leaves the items out (and doesn't load them).
+        """
+        view = request.query_params.get("view")
+        if view not in (None, "summary"):
+            raise ValidationError({"view": "Must be 'summary'."})
+        if view == "summary":
+            queryset = Order.objects.filter(user=request.user).only("id", "status", "total_amount", "created_at")
+            serializer_class = OrderSummarySerializer
+        else:
+            queryset = self.get_queryset().filter(user=request.user)
+            serializer_class = OrderSerializer
+        page = self.paginate_queryset(queryset)
+        return self.get_paginated_response(
+            serializer_class(page, many=True, context=self.get_serializer_context()).data
+        )
+
+
+class OrderStatusConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = "The order changed status meanwhile."
+    default_code = "order_status_conflict"
+
+
+class OrderStatusView(APIView):
+    """
+    POST {"status": ..., "expected_status": ... (optional)} moves an order along the workflow
+    in orders/services/transitions.py. 409 when another request moved it first.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsManager | IsKitchenStaff | IsCourier]
+    # One conditional UPDATE, in a savepoint with the sales rollup move (the order's items and two
+    # upserts); a lost race reads the current status once more, and so does a move to a status with
+    # several sources without expected_status, before the UPDATE. Moves on or off the kitchen board
+    # also insert its delta.
+    query_budgets = {"post": 8}
+
+    def post(self, request, pk):
+        serializer = OrderTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        target, expected = serializer.validated_data["status"], serializer.validated_data.get("expected_status")
+        try:
+            transition_sources(target, expected)
+            if not can_transition(request.user, target):
+                raise PermissionDenied(f"Your role can't move orders to {target}.")
+            result = transition_order(pk, target, request.user, expected)
+        except TransitionNotAllowed as exc:
+            raise ValidationError({"status": str(exc)}) from exc
+        except TransitionConflict as exc:
+            raise OrderStatusConflict(str(exc)) from exc
+        except Order.DoesNotExist as exc:
+            raise Http404(str(exc)) from exc
+        return Response(result)
+
+
+class ReadyOrdersNearbyView(APIView):
+    """
+    GET ?lat=&lon=[&limit=20]: the orders waiting for a courier, nearest to the courier's
+    position first, with their distance (orders/services/nearby.py).
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsManager | IsCourier]
+    # One bounding-box query per search radius: 2.5, 5, 10, 20 and 40 km with the defaults.
+    query_budgets = {"get": 6}
+
+    def get(self, request):
+        serializer = NearbyOrdersSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        position = serializer.validated_data
+        return Response(nearest_ready_orders(position["lat"], position["lon"], limit=position["limit"]))
+
+
+class ReadyOrderBatchesView(APIView):
+    """
+    GET ?lat=&lon=: proposed multi-stop routes over the ready orders near the courier, nearest first
+    (orders/services/batching.py): {"batches": [{"orders": [...], "distance_km", "minutes"}], "optimized"}.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsManager | IsCourier]
+    # The candidates come from the nearby lookup; the planning itself runs in memory.
+    query_budgets = {"get": 6}
+
+    def get(self, request):
+        serializer = CourierPositionSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        position = serializer.validated_data
+        return Response(plan_batches(position["lat"], position["lon"]))
+
+
+class SalesReportView(APIView):
+    """
+    GET ?start=&end=[&group_by=dish|category|payment_method|status][&status=]: revenue, orders and
+    quantity of the orders placed in [start, end), read from the sales rollups only (FR-054,
+    orders/services/sales.py). Fresh up to the last placed order and status change; other edits
+    show up after the next rollup_sales run.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsManager]
+    # The hourly rows around the full days, the daily rows, and the dish or category names.
+    query_budgets = {"get": 4}
+
+    def get(self, request):
+        serializer = SalesReportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(sales_report(**serializer.validated_data))
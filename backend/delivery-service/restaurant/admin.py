@@ -1,6 +1,9 @@
 from django.contrib import admin
 
 from .models import Category, Dish, DishIngredient, Ingredient
+from .services.categories import get_dish_count_state, move_dish_counts
+from .services.photos import schedule_photo_variants
+from .services.search import search_dishes
 
 
 # Клас для керування Інгредієнтами
@@ -24,10 +27,27 @@ class DishAdmin(admin.ModelAdmin):
     search_fields = ("name", "description")
     inlines = [DishIngredientInline]  # Додаємо можливість керувати інгредієнтами тут же
 
+    def get_search_results(self, request, queryset, search_term):
+        # Той самий індексований пошук, що й в API (FR-008), замість ILIKE '%q%' по кожному полю.
+        if not search_term:
+            return super().get_search_results(request, queryset, search_term)
+        return search_dishes(queryset, search_term), False
+
+    def save_model(self, request, obj, form, change):
+        # Той самий облік лічильників категорій, що й у create_dish / update_dish (видалення веде сигнал).
+        old_state = get_dish_count_state(obj.pk) if change else None
+        if "is_available" in form.changed_data:
+            # Змінено вручну: повернення інгредієнта не має вмикати страву знову.
+            obj.ingredient_outage = False
+        super().save_model(request, obj, form, change)
+        move_dish_counts(old_state, (obj.category_id, obj.is_available))
+        if "photo" in form.changed_data:
+            schedule_photo_variants(obj)
+
 
 # Налаштування вигляду моделі Category
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ("name", "slug", "is_alcoholic")
+    list_display = ("name", "slug", "is_alcoholic", "dish_count", "available_count")
     # prepopulated_fields = {"slug": ("name",)}  # Автоматично генерує slug з назви
 
 
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class RestaurantConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "restaurant"
+
+    def ready(self):
+        # Connect the menu change receivers (menu version / caches).
+        from restaurant import signals  # noqa: F401
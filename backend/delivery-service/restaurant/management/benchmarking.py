@@ -0,0 +1,119 @@
+import random
+import statistics
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.db import connection, transaction
+from restaurant.models import Category, Dish, DishIngredient, Ingredient
+
+# Shared helpers for the bench_* management commands.
+# Every benchmark seeds its own data inside a transaction that is rolled back at the end,
+# so it can be pointed at a development database without leaving anything behind.
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def rolled_back():
+    """Runs the block in a transaction and always discards its writes."""
+    try:
+        with transaction.atomic():
+            yield
+            raise _Rollback
+    except _Rollback:
+        pass
+
+
+# Name parts for synthetic dishes, mixed Ukrainian / English like the real menu.
+NAME_WORDS = [
+    "Піца",
+    "Маргарита",
+    "Пепероні",
+    "Гавайська",
+    "Сирна",
+    "Грибна",
+    "Салат",
+    "Цезар",
+    "Борщ",
+    "Вареники",
+    "Паста",
+    "Карбонара",
+    "Бургер",
+    "Курячий",
+    "Томатний",
+    "Суп",
+    "Pizza",
+    "Margherita",
+    "Pepperoni",
+    "Cheese",
+    "Mushroom",
+    "Caesar",
+    "Burger",
+    "Chicken",
+    "Carbonara",
+    "Lemonade",
+    "Spicy",
+    "Veggie",
+    "Classic",
+    "Double",
+]
+
+
+def seed_menu(dishes, ingredients, per_dish, categories=10, seed=42, batch_size=2000):
+    """
+    Bulk-inserts a synthetic menu. Signals are not fired (bulk_create), which is what we want
+    for timing the read paths.
+    """
+    rng = random.Random(seed)  # noqa: S311 - deterministic benchmark data
+    category_objs = Category.objects.bulk_create(
+        [Category(name=f"Bench category {index}", slug=f"bench-category-{index}") for index in range(categories)]
+    )
+    ingredient_objs = Ingredient.objects.bulk_create(
+        [Ingredient(name=f"Bench ingredient {index}") for index in range(ingredients)], batch_size=batch_size
+    )
+    dish_objs = Dish.objects.bulk_create(
+        [
+            Dish(
+                name=f"{' '.join(rng.sample(NAME_WORDS, 2))} {index}",
+                description=f"{' '.join(rng.sample(NAME_WORDS, 6))}. Synthetic dish number {index}.",
+                price=Decimal(rng.randint(50, 99999)) / 100,
+                category=category_objs[index % categories],
+                is_available=rng.random() > 0.1,
+            )
+            for index in range(dishes)
+        ],
+        batch_size=batch_size,
+    )
+    DishIngredient.objects.bulk_create(
+        [
+            DishIngredient(dish=dish, ingredient=ingredient, is_base_ingredient=rng.random() > 0.3)
+            for dish in dish_objs
+            for ingredient in rng.sample(ingredient_objs, min(per_dish, ingredients))
+        ],
+        batch_size=batch_size,
+    )
+    if connection.vendor == "postgresql":
+        # Fresh planner statistics, otherwise the first plans are made for an empty table.
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE restaurant_dish, restaurant_ingredient, restaurant_dishingredient")
+    return category_objs, ingredient_objs, dish_objs
+
+
+def timed(func, repeat):
+    """Calls func() 'repeat' times and returns (median_ms, p95_ms, last_result)."""
+    samples = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    return statistics.median(samples), p95, result
+
+
+def format_timing(label, median_ms, p95_ms, extra=""):
+    return f"{label:<48} median {median_ms:9.3f} ms   p95 {p95_ms:9.3f} ms   {extra}"
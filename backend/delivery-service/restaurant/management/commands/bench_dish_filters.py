@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from restaurant.management.benchmarking import format_timing, rolled_back, seed_menu, timed
+from restaurant.services.dishes import get_dishes_queryset
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks server-side price sorting and ingredient include/exclude filters (FR-003, FR-004) "
+        "on a synthetic menu. All seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dishes", type=int, default=10000)
+        parser.add_argument("--ingredients", type=int, default=500)
+        parser.add_argument("--per-dish", type=int, default=8, help="Ingredients per dish.")
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--explain", action="store_true", help="Print the query plan of every case.")
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.stdout.write(
+                f"Seeding {options['dishes']} dishes, {options['ingredients']} ingredients, "
+                f"{options['per_dish']} ingredients per dish..."
+            )
+            categories, ingredients, _ = seed_menu(options["dishes"], options["ingredients"], options["per_dish"])
+            common = [ingredient.id for ingredient in ingredients[:2]]
+            excluded = [ingredient.id for ingredient in ingredients[2:5]]
+
+            cases = {
+                "ordering=price": {"ordering": "price"},
+                "ordering=-price&category_id": {"ordering": "-price", "category_id": categories[0].id},
+                "with_ingredients (1)": {"with_ingredients": common[:1]},
+                "with_ingredients (2)": {"with_ingredients": common},
+                "without_ingredients (3)": {"without_ingredients": excluded},
+                "with (1) + without (3) + ordering=price": {
+                    "with_ingredients": common[:1],
+                    "without_ingredients": excluded,
+                    "ordering": "price",
+                },
+            }
+            for label, params in cases.items():
+                self.run_case(label, get_dishes_queryset(**params), options)
+
+    def run_case(self, label, queryset, options):
+        page_size = options["page_size"]
+        median, p95, page = timed(lambda: list(queryset.all()[:page_size]), options["repeat"])
+        self.stdout.write(format_timing(f"{label} [first page]", median, p95, f"{len(page)} rows"))
+        median, p95, total = timed(lambda: queryset.all().count(), options["repeat"])
+        self.stdout.write(format_timing(f"{label} [count]", median, p95, f"{total} matches"))
+        if options["explain"]:
+            self.stdout.write(queryset.all()[:page_size].explain())
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+from restaurant.management.benchmarking import format_timing, rolled_back, seed_menu, timed
+from restaurant.serializers.dish_rows import dish_rows, render_dish_rows
+from restaurant.serializers.dishes import DishSerializer
+from restaurant.services.dishes import get_dishes_queryset
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks rendering the dish list to JSON with DishSerializer vs the values()-based fast path, "
+        "queries included. All seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="Menu sizes to measure.")
+        parser.add_argument("--ingredients", type=int, default=200)
+        parser.add_argument("--per-dish", type=int, default=6, help="Ingredients per dish.")
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        request = APIRequestFactory().get("/api/v0/dishes/")
+        renderer = JSONRenderer()
+
+        def serializer_path():
+            data = DishSerializer(get_dishes_queryset(), many=True, context={"request": request}).data
+            return renderer.render(data)
+
+        def fast_path():
+            return renderer.render(render_dish_rows(list(dish_rows(get_dishes_queryset())), request))
+
+        for size in options["sizes"]:
+            with rolled_back():
+                self.stdout.write(f"Seeding {size} dishes...")
+                seed_menu(size, options["ingredients"], options["per_dish"])
+
+                slow_median, slow_p95, slow_body = timed(serializer_path, options["repeat"])
+                fast_median, fast_p95, fast_body = timed(fast_path, options["repeat"])
+                if slow_body != fast_body:
+                    self.stderr.write("The two paths rendered different bodies!")
+
+                self.stdout.write(format_timing(f"{size} dishes: DishSerializer", slow_median, slow_p95))
+                self.stdout.write(
+                    format_timing(
+                        f"{size} dishes: values() fast path",
+                        fast_median,
+                        fast_p95,
+                        f"x{slow_median / fast_median:.1f}, {len(fast_body) // 1024} KiB",
+                    )
+                )
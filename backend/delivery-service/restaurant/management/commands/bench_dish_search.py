@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from restaurant.management.benchmarking import format_timing, rolled_back, seed_menu, timed
+from restaurant.models import Dish
+from restaurant.services.search import search_dishes
+
+# Exact word, prefix, Cyrillic prefix, typo and a two-word query.
+DEFAULT_QUERIES = ["Margherita", "marg", "сирн", "margherta", "гриб піца"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks indexed dish search (FR-008) against the old ILIKE '%%q%%' scan on a synthetic menu. "
+        "Meaningful on PostgreSQL only; all seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dishes", type=int, default=50000)
+        parser.add_argument("--ingredients", type=int, default=200)
+        parser.add_argument("--page-size", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument("--query", action="append", dest="queries", help="Query to time (repeatable).")
+        parser.add_argument("--explain", action="store_true", help="Print the query plan of every case.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            self.stderr.write(
+                self.style.WARNING("Not on PostgreSQL: the search falls back to ILIKE, results are not comparable.")
+            )
+
+        with rolled_back():
+            self.stdout.write(f"Seeding {options['dishes']} dishes...")
+            seed_menu(options["dishes"], options["ingredients"], per_dish=3)
+            dishes = Dish.objects.only("id", "name").order_by("-is_available", "name")
+
+            for query in options["queries"] or DEFAULT_QUERIES:
+                ilike = dishes.filter(Q(name__icontains=query) | Q(description__icontains=query))
+                self.run_case(f"ILIKE   {query!r}", ilike, options)
+                self.run_case(f"search  {query!r}", search_dishes(dishes, query), options)
+
+    def run_case(self, label, queryset, options):
+        page_size = options["page_size"]
+        median, p95, page = timed(lambda: list(queryset.all()[:page_size]), options["repeat"])
+        self.stdout.write(format_timing(f"{label} [first page]", median, p95, f"{len(page)} rows"))
+        median, p95, total = timed(lambda: queryset.all().count(), options["repeat"])
+        self.stdout.write(format_timing(f"{label} [count]", median, p95, f"{total} matches"))
+        if options["explain"]:
+            self.stdout.write(queryset.all()[:page_size].explain())
@@ -0,0 +1,65 @@
+import sys
+
+from django.core.management.base import BaseCommand
+from restaurant.management.benchmarking import format_timing, rolled_back, seed_menu, timed
+from restaurant.services.dishes import get_dishes_queryset
+from restaurant.services.ingredient_index import (
+    IngredientIndex,
+    count_dishes,
+    find_dish_ids,
+    get_ingredient_index,
+    reset_ingredient_index,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks the in-memory ingredient index against the equivalent ORM query for "
+        "with/without ingredient filters. All seeded data is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dishes", type=int, default=10000)
+        parser.add_argument("--ingredients", type=int, default=500)
+        parser.add_argument("--per-dish", type=int, default=8, help="Ingredients per dish.")
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        with rolled_back():
+            self.stdout.write(
+                f"Seeding {options['dishes']} dishes, {options['ingredients']} ingredients, "
+                f"{options['per_dish']} ingredients per dish..."
+            )
+            _, ingredients, _ = seed_menu(options["dishes"], options["ingredients"], options["per_dish"])
+            ids = [ingredient.id for ingredient in ingredients]
+
+            median, p95, index = timed(IngredientIndex.build, max(1, repeat // 10))
+            size = sum(sys.getsizeof(bits) for bits in index.by_ingredient.values())
+            self.stdout.write(format_timing("build", median, p95, f"{size // 1024} KiB of bitsets"))
+
+            reset_ingredient_index()
+            get_ingredient_index()
+            cases = {
+                "with (1)": (ids[:1], []),
+                "with (2)": (ids[:2], []),
+                "without (3)": ([], ids[2:5]),
+                "with (1) + without (3)": (ids[:1], ids[2:5]),
+            }
+            for label, (with_ids, without_ids) in cases.items():
+                self.run_case(label, with_ids, without_ids, repeat)
+            reset_ingredient_index()
+
+    def run_case(self, label, with_ids, without_ids, repeat):
+        queryset = get_dishes_queryset(with_ingredients=with_ids, without_ingredients=without_ids)
+        orm_median, orm_p95, orm_ids = timed(lambda: list(queryset.values_list("id", flat=True)), repeat)
+        median, p95, index_ids = timed(lambda: find_dish_ids(with_ids, without_ids), repeat)
+        if sorted(orm_ids) != index_ids:
+            self.stderr.write(f"{label}: the index and the ORM disagree!")
+        self.stdout.write(format_timing(f"{label} [ORM ids]", orm_median, orm_p95, f"{len(orm_ids)} dishes"))
+        self.stdout.write(format_timing(f"{label} [index ids]", median, p95, f"x{orm_median / median:.0f}"))
+
+        orm_median, orm_p95, _ = timed(queryset.count, repeat)
+        median, p95, _ = timed(lambda: count_dishes(with_ids, without_ids), repeat)
+        self.stdout.write(format_timing(f"{label} [ORM count]", orm_median, orm_p95))
+        self.stdout.write(format_timing(f"{label} [index count]", median, p95, f"x{orm_median / median:.0f}"))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from restaurant.management.benchmarking import format_timing, rolled_back, seed_menu, timed
+from restaurant.services.orders import create_order_with_items
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmarks create_order_with_items for carts of 1, 10 and 50 line items: time per order and "
+        "SQL statements per order. All seeded data and orders are rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lines", type=int, nargs="+", default=[1, 10, 50], help="Cart sizes to measure.")
+        parser.add_argument("--dishes", type=int, default=1000)
+        parser.add_argument("--repeat", type=int, default=200)
+
+    def handle(self, *args, **options):
+        with rolled_back():
+            self.stdout.write(f"Seeding {options['dishes']} dishes...")
+            _, _, dishes = seed_menu(options["dishes"], ingredients=10, per_dish=1)
+            for lines in options["lines"]:
+                self.run_case(dishes, lines, options["repeat"])
+
+    def run_case(self, dishes, lines, repeat):
+        order_data = {"phone": "0501234567", "delivery_address": "Khreshchatyk 1"}
+        items = [{"dish_id": dishes[index % len(dishes)].id, "quantity": 1 + index % 3} for index in range(lines)]
+
+        def place():
+            return create_order_with_items(dict(order_data), items)
+
+        with CaptureQueriesContext(connection) as queries:
+            place()
+        median, p95, _ = timed(place, repeat)
+        self.stdout.write(
+            format_timing(
+                f"{lines} line items", median, p95, f"{len(queries)} statements, {1000 / median:.0f} orders/s"
+            )
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from restaurant.models import Dish
+from restaurant.services.photos import generate_photo_variants
+
+
+class Command(BaseCommand):
+    help = (
+        "Renders the WebP / AVIF variants of dish photos in this process, e.g. for photos uploaded "
+        "before variants existed or after changing the widths or formats."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Re-render dishes that already have variants too.")
+
+    def handle(self, *args, **options):
+        dishes = Dish.objects.exclude(photo="").exclude(photo__isnull=True).order_by("id")
+        if not options["all"]:
+            dishes = dishes.filter(photo_variants={})
+
+        rendered = failed = 0
+        for dish_id, photo_name in dishes.values_list("id", "photo").iterator():
+            if generate_photo_variants(dish_id, photo_name):
+                rendered += 1
+            else:
+                failed += 1
+                self.stderr.write(f"Dish {dish_id}: no variants for {photo_name}")
+        self.stdout.write(self.style.SUCCESS(f"Rendered variants for {rendered} dishes, {failed} without."))
@@ -0,0 +1,38 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from restaurant.services.photos import collect_orphaned_photos, migrate_legacy_photos
+
+
+class Command(BaseCommand):
+    help = (
+        "Moves dish photos uploaded before content-addressed storage to their hash-stamped names, "
+        "then deletes the photo and variant files in MEDIA_ROOT that no dish references."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report what would be moved or deleted.")
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Keep unreferenced files younger than this (in-flight uploads). Default: 24.",
+        )
+        parser.add_argument("--skip-gc", action="store_true", help="Only migrate, delete nothing.")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        verb = "Would move" if dry_run else "Moved"
+        for dish_id, old_name, new_name in migrate_legacy_photos(dry_run=dry_run):
+            if new_name is None:
+                self.stderr.write(f"Dish {dish_id}: {old_name} is missing from the storage, left as is.")
+            else:
+                self.stdout.write(f"{verb} dish {dish_id}: {old_name} -> {new_name}")
+
+        if options["skip_gc"]:
+            return
+        verb = "Would delete" if dry_run else "Deleted"
+        orphans = collect_orphaned_photos(grace=timedelta(hours=options["grace_hours"]), dry_run=dry_run)
+        for name in orphans:
+            self.stdout.write(f"{verb} {name}")
+        self.stdout.write(self.style.SUCCESS(f"{verb} {len(orphans)} orphaned files."))
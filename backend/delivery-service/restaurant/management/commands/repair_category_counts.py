@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from restaurant.services.categories import repair_category_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Recounts the dishes of every category and fixes the stored dish_count / available_count "
+        "counters that disagree. Safe to run while the site is up."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--dry-run", action="store_true", help="Only report the wrong counters.")
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        wrong = repair_category_counts(dry_run=dry_run)
+        for category, stored, actual in wrong:
+            self.stdout.write(
+                f"{category.name} (id={category.pk}): dish_count {stored[0]} -> {actual[0]}, "
+                f"available_count {stored[1]} -> {actual[1]}"
+            )
+        if not wrong:
+            self.stdout.write(self.style.SUCCESS("All category counters are correct."))
+        elif dry_run:
+            self.stdout.write(self.style.WARNING(f"{len(wrong)} categories have wrong counters (dry run)."))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Fixed the counters of {len(wrong)} categories."))
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:53
+
+from django.db import migrations, models
+
+
+def create_menu_change_counters(apps, schema_editor):
+    """
+    Seeds one counter row per menu scope so bumps are a single UPDATE.
+    """
+    counter_model = apps.get_model("restaurant", "MenuChangeCounter")
+    db_alias = schema_editor.connection.alias
+
+    for scope in ("category", "ingredient", "dish_ingredient"):
+        counter_model.objects.using(db_alias).get_or_create(scope=scope)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0004_order_orderitem"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MenuChangeCounter",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("category", "Category"),
+                            ("ingredient", "Ingredient"),
+                            ("dish_ingredient", "Dish ingredient"),
+                        ],
+                        max_length=32,
+                        unique=True,
+                    ),
+                ),
+                ("value", models.PositiveBigIntegerField(default=0)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "verbose_name": "Лічильник змін меню",
+                "verbose_name_plural": "Лічильники змін меню",
+            },
+        ),
+        migrations.RunPython(create_menu_change_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0005_menuchangecounter"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(fields=["-is_available", "name"], name="dish_available_name_idx"),
+        ),
+    ]
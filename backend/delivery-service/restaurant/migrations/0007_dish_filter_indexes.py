@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 17:58
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0006_dish_available_name_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="dish",
+            index=models.Index(fields=["category", "price"], name="dish_category_price_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="dishingredient",
+            index=models.Index(fields=["ingredient", "dish"], name="dishingredient_ingr_dish_idx"),
+        ),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:00
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# The tsvector is kept up to date by a trigger, so bulk_create / queryset.update() and raw SQL
+# writes are covered too. 'simple' config: no stemming, which works for both Ukrainian and English names.
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('simple', coalesce({row}name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce({row}description, '')), 'B')"
+)
+
+CREATE_SEARCH_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    f"""
+    CREATE OR REPLACE FUNCTION restaurant_dish_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector := {SEARCH_VECTOR_SQL.format(row="NEW.")};
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER restaurant_dish_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF name, description ON restaurant_dish
+    FOR EACH ROW EXECUTE FUNCTION restaurant_dish_search_vector_update()
+    """,
+    f"UPDATE restaurant_dish SET search_vector = {SEARCH_VECTOR_SQL.format(row='')}",
+    "CREATE INDEX IF NOT EXISTS dish_search_vector_idx ON restaurant_dish USING gin (search_vector)",
+    "CREATE INDEX IF NOT EXISTS dish_name_trgm_idx ON restaurant_dish USING gin (name gin_trgm_ops)",
+]
+
+DROP_SEARCH_SQL = [
+    "DROP INDEX IF EXISTS dish_name_trgm_idx",
+    "DROP INDEX IF EXISTS dish_search_vector_idx",
+    "DROP TRIGGER IF EXISTS restaurant_dish_search_vector_trigger ON restaurant_dish",
+    "DROP FUNCTION IF EXISTS restaurant_dish_search_vector_update()",
+]
+
+
+def create_search_objects(apps, schema_editor):
+    """
+    PostgreSQL only: other backends (e.g. SQLite for quick local runs) fall back to icontains search.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in CREATE_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+def drop_search_objects(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for statement in DROP_SEARCH_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0007_dish_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dish",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_objects, drop_search_objects),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0008_dish_search"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="dishingredient",
+            options={"ordering": ["id"], "verbose_name": "Склад страви", "verbose_name_plural": "Склад страв"},
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:20
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def count_dishes(apps, schema_editor):
+    Category = apps.get_model("restaurant", "Category")
+    categories = list(
+        Category.objects.annotate(
+            actual_dish_count=Count("dishes"),
+            actual_available_count=Count("dishes", filter=Q(dishes__is_available=True)),
+        )
+    )
+    for category in categories:
+        category.dish_count = category.actual_dish_count
+        category.available_count = category.actual_available_count
+    Category.objects.bulk_update(categories, ["dish_count", "available_count"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0009_dishingredient_ordering"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="available_count",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Доступних страв"),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="dish_count",
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name="Кількість страв"),
+        ),
+        migrations.RunPython(count_dishes, migrations.RunPython.noop),
+    ]
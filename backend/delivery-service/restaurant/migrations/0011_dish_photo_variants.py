@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0010_category_dish_counts"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dish",
+            name="photo_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name="Варіанти фото"),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 18:29
+
+import restaurant.storage
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0011_dish_photo_variants"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="dish",
+            name="photo",
+            field=restaurant.storage.ContentAddressedImageField(
+                blank=True,
+                help_text="Обов'язкове поле для відображення в меню (FR-043).",
+                null=True,
+                upload_to="dishes_photos/",
+                verbose_name="Фото страви",
+            ),
+        ),
+    ]
@@ -0,0 +1,54 @@
+from decimal import Decimal
+
+from django.db import migrations, models
+
+# restaurant.Order / OrderItem become the read-only LegacyOrder / LegacyOrderItem: orders are now
+# stored in orders.Order, and `backfill_orders` copies these rows there. State only: the tables,
+# their columns and their data stay as they are until the copy is done.
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0012_dish_photo_content_addressed"),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.RenameModel("Order", "LegacyOrder"),
+                migrations.RenameModel("OrderItem", "LegacyOrderItem"),
+                migrations.AlterModelTable("legacyorder", "restaurant_order"),
+                migrations.AlterModelTable("legacyorderitem", "restaurant_orderitem"),
+                migrations.AlterModelOptions(
+                    name="legacyorder",
+                    options={"verbose_name": "Legacy order", "verbose_name_plural": "Legacy orders"},
+                ),
+                migrations.AlterModelOptions(
+                    name="legacyorderitem",
+                    options={"verbose_name": "Legacy order item", "verbose_name_plural": "Legacy order items"},
+                ),
+                migrations.AlterField("legacyorder", "status", models.CharField(max_length=32)),
+                migrations.AlterField("legacyorder", "payment_method", models.CharField(max_length=16)),
+                migrations.AlterField("legacyorder", "delivery_address", models.TextField(blank=True, null=True)),
+                migrations.AlterField("legacyorder", "self_pickup", models.BooleanField(default=False)),
+                migrations.AlterField("legacyorder", "phone", models.CharField(max_length=20)),
+                migrations.AlterField("legacyorder", "created_at", models.DateTimeField()),
+                migrations.AlterField("legacyorder", "updated_at", models.DateTimeField()),
+                migrations.AlterField(
+                    "legacyorder",
+                    "total_amount",
+                    models.DecimalField(decimal_places=2, default=Decimal("0.00"), max_digits=10),
+                ),
+                migrations.AlterField("legacyorderitem", "name", models.CharField(max_length=200)),
+                migrations.AlterField(
+                    "legacyorderitem", "unit_price", models.DecimalField(decimal_places=2, max_digits=10)
+                ),
+                migrations.AlterField("legacyorderitem", "quantity", models.PositiveIntegerField(default=1)),
+                migrations.AlterField(
+                    "legacyorderitem", "line_total", models.DecimalField(decimal_places=2, max_digits=12)
+                ),
+            ],
+            database_operations=[],
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:42
+
+from django.db import migrations, models
+
+
+def create_dish_counter(apps, schema_editor):
+    counter_model = apps.get_model("restaurant", "MenuChangeCounter")
+    counter_model.objects.using(schema_editor.connection.alias).get_or_create(scope="dish")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0013_legacy_orders"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="menuchangecounter",
+            name="scope",
+            field=models.CharField(
+                choices=[
+                    ("dish", "Dish"),
+                    ("category", "Category"),
+                    ("ingredient", "Ingredient"),
+                    ("dish_ingredient", "Dish ingredient"),
+                ],
+                max_length=32,
+                unique=True,
+            ),
+        ),
+        migrations.RunPython(create_dish_counter, migrations.RunPython.noop),
+    ]
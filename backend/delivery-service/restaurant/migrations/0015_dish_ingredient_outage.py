@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("restaurant", "0014_menuchangecounter_dish"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="dish",
+            name="ingredient_outage",
+            field=models.BooleanField(default=False, editable=False, verbose_name="Вимкнена через інгредієнт"),
+        ),
+    ]
@@ -1,10 +1,12 @@
 from decimal import Decimal
 
 from autoslug.fields import AutoSlugField
-from django.core.exceptions import ValidationError
-from django.core.validators import MinValueValidator, RegexValidator
+from django.contrib.postgres.search import SearchVectorField
+from django.core.validators import MinValueValidator
 from django.db import models
 
+from .storage import ContentAddressedImageField
+
 
 class Category(models.Model):
     """
@@ -25,6 +27,10 @@ class Category(models.Model):
         always_update=False,
         max_length=100,
     )
+    # Денормалізовані лічильники для вкладок меню; ведуться сервісами страв,
+    # звіряються командою repair_category_counts (див. restaurant/services/categories.py).
+    dish_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Кількість страв")
+    available_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Доступних страв")
 
     class Meta:
         verbose_name = "Категорія"
@@ -62,27 +68,39 @@ class Dish(models.Model):
     name = models.CharField(max_length=200, unique=True, verbose_name="Назва страви")
     description = models.TextField(verbose_name="Опис", help_text="Короткий опис страви та її складу.")
     price = models.DecimalField(max_digits=6, decimal_places=2, validators=[MinValueValidator(0)], verbose_name="Ціна")
-    photo = models.ImageField(
+    # Зберігається під SHA-256 вмісту (restaurant/storage.py): однакові фото не дублюються, а URL незмінний.
+    photo = ContentAddressedImageField(
         upload_to="dishes_photos/",
         null=True,
         blank=True,
         verbose_name="Фото страви",
         help_text="Обов'язкове поле для відображення в меню (FR-043).",
     )
+    # Зменшені копії фото (WebP / AVIF) для srcset: {формат: [[ширина, шлях], ...]}.
+    # Заповнюється у фоні після завантаження фото (restaurant/services/photos.py).
+    photo_variants = models.JSONField(default=dict, blank=True, editable=False, verbose_name="Варіанти фото")
     # FR-048: Менеджер може позначити страву як тимчасово недоступну.
     is_available = models.BooleanField(
         default=True,
         verbose_name="Доступна для замовлення",
         help_text="Якщо вимкнено, страва позначається 'тимчасово недоступна' (UC-001).",
     )
+    # Страву вимкнуло закінчення базового інгредієнта (services/dishes.py: apply_ingredient_outage),
+    # а не менеджер: коли інгредієнт повернеться, вона знову стане доступною.
+    ingredient_outage = models.BooleanField(default=False, editable=False, verbose_name="Вимкнена через інгредієнт")
 
     # M2M relationship through DishIngredient
     ingredients = models.ManyToManyField(
         Ingredient, through="DishIngredient", related_name="dishes", verbose_name="Склад страви"
     )
 
+    # FR-008: повнотекстовий пошук за назвою та описом. У PostgreSQL колонку заповнює тригер,
+    # а GIN-індекси (tsvector і pg_trgm по name) створює міграція 0008 — тому їх немає в Meta.indexes.
+    search_vector = SearchVectorField(null=True, editable=False)
+
     # FR-045, FR-047: Поля для відстеження змін, які можуть знадобитися для нотифікацій.
-    # TODO: remove (downscoped?)
+    # Версію меню (ETag / Last-Modified) рухає не він, а лічильник "dish" (MenuChangeCounter), який
+    # кожне збереження страви збільшує у своїй транзакції; масові .update() мають збільшувати його явно.
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
@@ -90,6 +108,24 @@ class Dish(models.Model):
         verbose_name_plural = "Меню страв"
         # FR-049: Сортування, щоб недоступні страви йшли в кінці.
         ordering = ["-is_available", "name"]
+        indexes = [
+            # Keyset-пагінація меню йде саме цим індексом, без OFFSET.
+            models.Index(fields=["-is_available", "name"], name="dish_available_name_idx"),
+            # FR-003: сортування за ціною в межах категорії.
+            models.Index(fields=["category", "price"], name="dish_category_price_idx"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # photo_variants пише лише фоновий рендер (queryset.update): збереження застарілого
+        # екземпляра (API, адмінка) не повинно їх затирати.
+        if not self._state.adding and kwargs.get("update_fields") is None and not kwargs.get("force_insert"):
+            skipped = self.get_deferred_fields() | {"photo_variants"}
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.attname not in skipped and field.name not in skipped
+            ]
+        super().save(*args, **kwargs)
 
     def __str__(self):
         availability = "✅" if self.is_available else "❌"
@@ -113,6 +149,12 @@ class DishIngredient(models.Model):
 
     class Meta:
         unique_together = ("dish", "ingredient")
+        # Стабільний порядок інгредієнтів у відповіді API (у порядку додавання).
+        ordering = ["id"]
+        indexes = [
+            # FR-004: фільтр "з інгредієнтом / без інгредієнта" читає лише цей індекс.
+            models.Index(fields=["ingredient", "dish"], name="dishingredient_ingr_dish_idx"),
+        ]
         verbose_name = "Склад страви"
         verbose_name_plural = "Склад страв"
 
@@ -121,95 +163,72 @@ class DishIngredient(models.Model):
         return f"{self.dish.name} - {self.ingredient.name} ({type_str})"
 
 
-class Order(models.Model):
-    class Status(models.TextChoices):
-        NEW = "new", "New"
-        IN_PROGRESS = "in_progress", "In progress"
-        WAITING_FOR_COURIER = "waiting_for_courier", "Waiting for courier"
-        DELIVERING = "delivering", "Delivering"
-        PAID_CREDIT = "paid_credit", "Paid (credit)"
-        AWAITING_CASH = "awaiting_cash", "Awaiting cash payment"
-        PAID_CASH = "paid_cash", "Paid (cash)"
-
-    class PaymentMethod(models.TextChoices):
-        CREDIT = "credit", "Credit"
-        CASH = "cash", "Cash"
-
-    status = models.CharField(max_length=32, choices=Status.choices, default=Status.NEW)
-    payment_method = models.CharField(
-        max_length=16,
-        choices=PaymentMethod.choices,
-        default=PaymentMethod.CASH,
-        verbose_name="Payment method",
-    )
-
-    # Delivery address: optional if самовивіз True
-    delivery_address = models.TextField(null=True, blank=True, verbose_name="Delivery address")
-    self_pickup = models.BooleanField(default=False, verbose_name="Самовивіз")
+class MenuChangeCounter(models.Model):
+    """
+    Лічильники змін частин меню. Разом з кількістю страв утворюють версію меню для умовних
+    GET-запитів (restaurant/services/menu.py).
+    """
 
-    # Phone: simple validation (ukraine-compatible). Adjust regex if you have other formats.
-    phone_regex = RegexValidator(
-        regex=r"^\+?\d{7,15}$",
-        message="Phone number must be entered in the format: +380501234567 or 0501234567. Up to 15 digits allowed.",
-    )
-    phone = models.CharField(validators=[phone_regex], max_length=20, verbose_name="Phone number")
+    class Scope(models.TextChoices):
+        # Every dish save, delete and queryset .update().
+        DISH = "dish", "Dish"
+        CATEGORY = "category", "Category"
+        INGREDIENT = "ingredient", "Ingredient"
+        DISH_INGREDIENT = "dish_ingredient", "Dish ingredient"
 
-    # Timestamp
-    created_at = models.DateTimeField(auto_now_add=True)
+    scope = models.CharField(max_length=32, choices=Scope.choices, unique=True)
+    value = models.PositiveBigIntegerField(default=0)
     updated_at = models.DateTimeField(auto_now=True)
-    # Cached total price (sum of item totals). Kept for quick queries.
-    total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
 
     class Meta:
-        verbose_name = "Order"
-        verbose_name_plural = "Orders"
-        ordering = ["-created_at"]
+        verbose_name = "Лічильник змін меню"
+        verbose_name_plural = "Лічильники змін меню"
+
+    def __str__(self):
+        return f"{self.scope}: {self.value}"
 
-    def clean(self):
-        # Ensure either delivery_address is set XOR self_pickup is True (one or the other)
-        if self.self_pickup and self.delivery_address:
-            raise ValidationError("If self_pickup is True, delivery_address must be empty.")
-        if (not self.self_pickup) and (not self.delivery_address):
-            raise ValidationError("Either delivery_address must be set or self_pickup must be True.")
+
+class LegacyOrder(models.Model):
+    """
+    Замовлення з колишнього окремого сховища /menu/orders/ (таблиця restaurant_order).
+    Лише для читання: усі замовлення тепер пишуться в orders.Order, а ці рядки
+    переносить туди команда backfill_orders. Таблиці видаляються після перенесення.
+    """
+
+    status = models.CharField(max_length=32)
+    payment_method = models.CharField(max_length=16)
+    delivery_address = models.TextField(null=True, blank=True)
+    self_pickup = models.BooleanField(default=False)
+    phone = models.CharField(max_length=20)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    total_amount = models.DecimalField(max_digits=10, decimal_places=2, default=Decimal("0.00"))
+
+    class Meta:
+        db_table = "restaurant_order"
+        verbose_name = "Legacy order"
+        verbose_name_plural = "Legacy orders"
 
     def __str__(self):
-        return f"Order #{self.id} — {self.get_status_display()} — {self.total_amount} грн"
-
-    def mark_paid_if_self_pickup(self):
-        """
-        Business rule from issue:
-        - Самовивіз orders go from waiting_for_courier to paid for instantly.
-        We'll interpret: if self_pickup==True, then once items are created,
-        set status to PAID_CASH or PAID_CREDIT depending on payment_method.
-        """
-        if self.self_pickup:
-            if self.payment_method == self.PaymentMethod.CREDIT:
-                self.status = self.Status.PAID_CREDIT
-            else:
-                # default treat as cash
-                self.status = self.Status.PAID_CASH
-            self.save(update_fields=["status"])
-
-
-class OrderItem(models.Model):
+        return f"Legacy order #{self.id} — {self.status} — {self.total_amount} грн"
+
+
+class LegacyOrderItem(models.Model):
     """
-    Helper table to store one-to-many items of an order.
-    We snapshot unit_price at the time of ordering to preserve history.
+    Рядки LegacyOrder (таблиця restaurant_orderitem); переносяться разом із замовленням.
     """
 
-    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
-    # store dish reference for traceability; if deletion of dish is allowed, keep on_delete=models.PROTECT or SET_NULL
+    order = models.ForeignKey(LegacyOrder, on_delete=models.CASCADE, related_name="items")
     dish = models.ForeignKey("Dish", on_delete=models.PROTECT, related_name="+")
-    name = models.CharField(max_length=200, verbose_name="Dish name snapshot")
-    unit_price = models.DecimalField(max_digits=10, decimal_places=2, validators=[MinValueValidator(0)])
-    quantity = models.PositiveIntegerField(default=1, validators=[MinValueValidator(1)])
-    line_total = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(0)])
+    name = models.CharField(max_length=200)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    quantity = models.PositiveIntegerField(default=1)
+    line_total = models.DecimalField(max_digits=12, decimal_places=2)
 
     class Meta:
-        verbose_name = "Order item"
-        verbose_name_plural = "Order items"
+        db_table = "restaurant_orderitem"
+        verbose_name = "Legacy order item"
+        verbose_name_plural = "Legacy order items"
 
-    def save(self, *args, **kwargs):
-        # ensure line_total is consistent
-        self.line_total = (self.unit_price or Decimal("0.00")) * Decimal(self.quantity)
-        super().save(*args, **kwargs)
+    def __str__(self):
+        return f"{self.name} x{self.quantity}"
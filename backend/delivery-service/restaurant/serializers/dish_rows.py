@@ -0,0 +1,96 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from restaurant.models import Dish, DishIngredient
+from restaurant.serializers.dishes import DISH_READ_FIELDS
+from restaurant.services.photos import photo_srcsets
+
+# Read-only fast path for DishSerializer.
+# Builds exactly the same structure as DishSerializer(...).data (same keys, same order, same value
+# types), but from values() rows and one grouped ingredient query, skipping the per-field and
+# per-nested-serializer machinery. test_dish_rows.py keeps the two byte-for-byte identical.
+
+# Columns each rendered field needs, on top of the ordering keys that are always selected.
+_FIELD_COLUMNS = {
+    "id": ("id",),
+    "name": ("name",),
+    "description": ("description",),
+    "price": ("price",),
+    "photo_url": ("photo",),
+    "photo_variants": ("photo_variants",),
+    "is_available": ("is_available",),
+    "category": ("category_id", "category__name", "category__slug"),
+    "ingredients": (),
+}
+# Keyset pagination reads these straight from the rows.
+_ORDERING_COLUMNS = ("id", "name", "is_available", "price")
+
+_PRICE_FIELD = Dish._meta.get_field("price")
+_PRICE_QUANTUM = Decimal(".1") ** _PRICE_FIELD.decimal_places
+_PHOTO_STORAGE = Dish._meta.get_field("photo").storage
+
+
+def dish_rows(queryset, fields=None):
+    """
+    Turns a (filtered, ordered) Dish queryset into a values() queryset with just the columns
+    needed to render 'fields' (None means the full representation).
+    """
+    fields = fields or DISH_READ_FIELDS
+    columns = dict.fromkeys(_ORDERING_COLUMNS)
+    for field in fields:
+        columns.update(dict.fromkeys(_FIELD_COLUMNS[field]))
+    # values() does its own join for category__*; the model prefetches would be wasted.
+    return queryset.prefetch_related(None).values(*columns)
+
+
+def _ingredients_by_dish(dish_ids):
+    grouped = defaultdict(list)
+    rows = (
+        DishIngredient.objects.filter(dish_id__in=dish_ids)
+        .order_by("id")
+        .values_list("dish_id", "ingredient_id", "ingredient__name", "is_base_ingredient")
+    )
+    for dish_id, ingredient_id, name, is_base_ingredient in rows:
+        grouped[dish_id].append(
+            {"ingredient_id": ingredient_id, "name": name, "is_base_ingredient": is_base_ingredient}
+        )
+    return grouped
+
+
+def _format_price(value):
+    # Same as DRF's DecimalField with COERCE_DECIMAL_TO_STRING.
+    return f"{value.quantize(_PRICE_QUANTUM):f}"
+
+
+def _photo_url(name, request):
+    if not name:
+        return None
+    url = _PHOTO_STORAGE.url(name)
+    return request.build_absolute_uri(url) if request else url
+
+
+def render_dish_rows(rows, request=None, fields=None):
+    """
+    Renders rows from dish_rows() into the DishSerializer representation.
+    Runs one extra query for the ingredients of all rows when they are requested.
+    """
+    fields = fields or DISH_READ_FIELDS
+    ingredients = _ingredients_by_dish([row["id"] for row in rows]) if "ingredients" in fields else None
+
+    renderers = {
+        "id": lambda row: row["id"],
+        "name": lambda row: row["name"],
+        "description": lambda row: row["description"],
+        "price": lambda row: _format_price(row["price"]),
+        "photo_url": lambda row: _photo_url(row["photo"], request),
+        "photo_variants": lambda row: photo_srcsets(row["photo_variants"], request),
+        "is_available": lambda row: row["is_available"],
+        "category": lambda row: {
+            "id": row["category_id"],
+            "name": row["category__name"],
+            "slug": row["category__slug"],
+        },
+        "ingredients": lambda row: ingredients.get(row["id"], []),
+    }
+    selected = [(field, renderers[field]) for field in fields]
+    return [{field: render(row) for field, render in selected} for row in rows]
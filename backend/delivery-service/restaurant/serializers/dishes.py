@@ -1,17 +1,29 @@
+from django.db.models import prefetch_related_objects
 from rest_framework import serializers
 from restaurant.models import Category, Dish, DishIngredient, Ingredient
-from restaurant.services.dishes import create_dish, update_dish
+from restaurant.services.dishes import DISH_INGREDIENTS_PREFETCH, create_dish, update_dish
+from restaurant.services.photos import photo_srcsets
 
 
 class CategorySerializer(serializers.ModelSerializer):
     """
     Serializer for the Category model.
+    'dish_count' and 'available_count' are the stored counters (see restaurant/services/categories.py).
     """
 
     class Meta:
         model = Category
+        fields = ["id", "name", "slug", "dish_count", "available_count"]
+        read_only_fields = ["slug", "dish_count", "available_count"]
+
+
+class DishCategorySerializer(CategorySerializer):
+    """
+    The category nested in a dish: no counters, they belong to the category tabs.
+    """
+
+    class Meta(CategorySerializer.Meta):
         fields = ["id", "name", "slug"]
-        read_only_fields = ["slug"]
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -43,13 +55,37 @@ class IngredientDataSerializer(serializers.Serializer):
     is_base_ingredient = serializers.BooleanField(default=True)
 
 
+# Fields a client can pick with ?fields= on the read actions.
+DISH_READ_FIELDS = (
+    "id",
+    "name",
+    "description",
+    "price",
+    "photo_url",
+    "photo_variants",
+    "is_available",
+    "category",
+    "ingredients",
+)
+# ?view=compact: just what a menu grid needs, no nested data.
+DISH_COMPACT_FIELDS = ("id", "name", "price", "photo_url", "photo_variants", "is_available")
+
+
 class DishSerializer(serializers.ModelSerializer):
     """
     The main serializer for the Dish model. Handles reading, writing, and file uploads.
+    Pass read_fields=[...] to render only a subset of the fields (sparse fieldsets).
     """
 
+    def __init__(self, *args, **kwargs):
+        read_fields = kwargs.pop("read_fields", None)
+        super().__init__(*args, **kwargs)
+        if read_fields is not None:
+            for field_name in set(self.fields) - set(read_fields):
+                self.fields.pop(field_name)
+
     # --- For Reading ---
-    category = CategorySerializer(read_only=True)
+    category = DishCategorySerializer(read_only=True)
     ingredients = DishIngredientSerializer(source="dishingredient_set", many=True, read_only=True)
 
     # --- For Writing ---
@@ -64,6 +100,8 @@ class DishSerializer(serializers.ModelSerializer):
     photo = serializers.ImageField(required=False, allow_null=True, write_only=True)
     # and this the image download
     photo_url = serializers.SerializerMethodField()
+    # and the smaller WebP / AVIF copies, as {format: srcset}; empty until they are rendered
+    photo_variants = serializers.SerializerMethodField()
 
     is_available = serializers.BooleanField(default=True, required=False)
 
@@ -76,6 +114,7 @@ class DishSerializer(serializers.ModelSerializer):
             "price",
             "photo",
             "photo_url",
+            "photo_variants",
             "is_available",
             "category",
             "category_id",
@@ -83,6 +122,15 @@ class DishSerializer(serializers.ModelSerializer):
             "ingredients_data",
         ]
 
+    def to_representation(self, instance):
+        # A freshly created or updated dish has no (or a cleared) prefetch cache;
+        # load its ingredients in one joined query instead of one query per ingredient.
+        if "ingredients" in self.fields and "dishingredient_set" not in getattr(
+            instance, "_prefetched_objects_cache", {}
+        ):
+            prefetch_related_objects([instance], DISH_INGREDIENTS_PREFETCH)
+        return super().to_representation(instance)
+
     def get_photo_url(self, obj):
         """
         Returns the absolute URL for the dish photo, or None if no photo exists.
@@ -94,6 +142,12 @@ class DishSerializer(serializers.ModelSerializer):
             return request.build_absolute_uri(obj.photo.url)
         return obj.photo.url
 
+    def get_photo_variants(self, obj):
+        """
+        Returns {format: srcset} for the rendered photo variants, e.g. for <picture><source type="image/webp">.
+        """
+        return photo_srcsets(obj.photo_variants, self.context.get("request"))
+
     def create(self, validated_data):
         """
         This is the new, correct place to call the service.
@@ -1,5 +1,12 @@
+from django.core.validators import RegexValidator
+from orders.models import Order, OrderItem
 from rest_framework import serializers
-from restaurant.models import Order, OrderItem
+
+# Phone: simple validation (ukraine-compatible). Adjust regex if you have other formats.
+phone_regex = RegexValidator(
+    regex=r"^\+?\d{7,15}$",
+    message="Phone number must be entered in the format: +380501234567 or 0501234567. Up to 15 digits allowed.",
+)
 
 
 class OrderItemCreateSerializer(serializers.Serializer):
@@ -15,6 +22,9 @@ class OrderItemSerializer(serializers.ModelSerializer):
 
 
 class OrderSerializer(serializers.ModelSerializer):
+    phone = serializers.CharField(max_length=20, validators=[phone_regex])
+    # Stored as "" for self pickup; this API has always returned null there.
+    delivery_address = serializers.CharField(required=False, allow_null=True, allow_blank=True)
     items = OrderItemSerializer(many=True, read_only=True)
     # input for items on creation (separate field)
     items_input = OrderItemCreateSerializer(many=True, write_only=True, required=True)
@@ -28,6 +38,7 @@ class OrderSerializer(serializers.ModelSerializer):
             "delivery_address",
             "self_pickup",
             "phone",
+            "notes",
             "created_at",
             "updated_at",
             "total_amount",
@@ -36,6 +47,11 @@ class OrderSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "status", "created_at", "updated_at", "total_amount", "items"]
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data["delivery_address"] = data["delivery_address"] or None
+        return data
+
     def validate(self, data):
         # items_input present validated by serializer; additional checks:
         self_pickup = data.get("self_pickup", False)
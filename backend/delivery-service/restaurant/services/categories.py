@@ -0,0 +1,75 @@
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import Greatest
+from restaurant.models import Category, Dish, MenuChangeCounter
+from restaurant.services.menu import bump_menu_counter
+from restaurant.services.menu_cache import invalidate_menu_documents
+
+# Category.dish_count / available_count are denormalized, so the category tabs don't count dishes.
+#
+# Every write that adds, removes or moves a dish adjusts them relatively (F() + n) in its own
+# transaction: create_dish / update_dish and the dish admin on save, the Dish post_delete receiver
+# on delete. Writes that bypass those paths (bulk .update(), raw SQL, fixtures) leave the counters
+# stale until `python manage.py repair_category_counts` recounts them.
+
+
+def get_dish_count_state(dish_id):
+    """
+    Locks the dish row and returns its (category_id, is_available) as stored, or None.
+    Read before a save, so concurrent edits of the same dish adjust the counters in turn.
+    """
+    return Dish.objects.select_for_update().filter(pk=dish_id).values_list("category_id", "is_available").first()
+
+
+def adjust_category_counts(category_id, dishes, available):
+    # Clamped at 0: a counter that drifted low must not make a dish delete fail; the repair fixes it.
+    Category.objects.filter(pk=category_id).update(
+        dish_count=Greatest(F("dish_count") + dishes, 0), available_count=Greatest(F("available_count") + available, 0)
+    )
+
+
+def move_dish_counts(old, new):
+    """
+    Applies a dish going from state 'old' to state 'new', each a (category_id, is_available) pair
+    or None for "no dish" (a create or a delete). Runs no query when nothing counted changed.
+    """
+    if old == new:
+        return
+    if old is not None and new is not None and old[0] == new[0]:
+        adjust_category_counts(new[0], 0, int(new[1]) - int(old[1]))
+        return
+    if old is not None:
+        adjust_category_counts(old[0], -1, -int(old[1]))
+    if new is not None:
+        adjust_category_counts(new[0], 1, int(new[1]))
+
+
+@transaction.atomic
+def repair_category_counts(dry_run=False):
+    """
+    Recounts the dishes of every category and fixes the stored counters that disagree.
+    Returns the fixed (or, with dry_run, the wrong) categories as
+    [(category, (dish_count, available_count) stored, (dish_count, available_count) actual), ...].
+    """
+    # Lock the counters first: dish writes that commit meanwhile wait for us and then apply
+    # their own +1/-1 on top of the recount instead of being counted twice.
+    list(Category.objects.select_for_update().values_list("id", flat=True))
+    categories = Category.objects.order_by("id").annotate(
+        actual_dish_count=Count("dishes"),
+        actual_available_count=Count("dishes", filter=Q(dishes__is_available=True)),
+    )
+
+    wrong = []
+    for category in categories:
+        stored = (category.dish_count, category.available_count)
+        actual = (category.actual_dish_count, category.actual_available_count)
+        if stored != actual:
+            wrong.append((category, stored, actual))
+
+    if wrong and not dry_run:
+        for category, _, (dish_count, available_count) in wrong:
+            Category.objects.filter(pk=category.pk).update(dish_count=dish_count, available_count=available_count)
+        # .update() sends no signals; the category payloads changed, so the menu version must too.
+        bump_menu_counter(MenuChangeCounter.Scope.CATEGORY)
+        invalidate_menu_documents()
+    return wrong
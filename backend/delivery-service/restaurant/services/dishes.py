@@ -1,32 +1,111 @@
-from django.db import transaction
+from collections import Counter
+
+from django.db import connections, transaction
+from django.db.models import Exists, OuterRef, Prefetch
+from django.utils import timezone
 from rest_framework.exceptions import ValidationError
-from restaurant.models import Dish, DishIngredient, Ingredient
+from restaurant.models import Category, Dish, DishIngredient, Ingredient, MenuChangeCounter
+from restaurant.services.categories import adjust_category_counts, get_dish_count_state, move_dish_counts
+from restaurant.services.ingredient_index import (
+    find_dish_ids_or_others,
+    find_outage_changes,
+    update_ingredient_index,
+)
+from restaurant.services.menu import bump_menu_counter, get_menu_version
+from restaurant.services.menu_cache import invalidate_menu_documents
+from restaurant.services.photos import schedule_photo_variants
+from restaurant.services.search import search_dishes
 
 # NOTE: The dish_to_dict function has been removed as it is no longer needed.
 # The serializers now handle all conversion from model instance to JSON.
 
 
-def get_dishes_queryset(category_id=None):
+# The rendered ingredients of a dish, with their names joined in (one query instead of two).
+DISH_INGREDIENTS_PREFETCH = Prefetch("dishingredient_set", queryset=DishIngredient.objects.select_related("ingredient"))
+
+# Orderings a client may request (FR-003), mapped to a unique keyset ordering.
+DISH_ORDERINGS = {
+    None: ("-is_available", "name"),
+    "price": ("price", "id"),
+    "-price": ("-price", "-id"),
+}
+
+# Longest dish id list the ingredient filters put in the query; past it they stay subqueries.
+INGREDIENT_FILTER_MAX_IDS = 1000
+
+
+def get_dishes_queryset(
+    category_id=None,
+    ordering=None,
+    with_ingredients=None,
+    without_ingredients=None,
+    search=None,
+    fields=None,
+    version=None,
+):
     """
-    Returns a queryset of available dishes, optionally filtered by category_id.
+    Returns a queryset of dishes, optionally filtered by category_id, by ingredients (FR-004)
+    and by a search query (FR-008), and sorted by price (FR-003).
+
+    - with_ingredients: dishes must contain every one of these ingredient ids.
+    - without_ingredients: dishes must contain none of these ingredient ids.
+
+    Given the current menu 'version', the ingredient filters are answered by the in-memory ingredient
+    index and become a dish id list (services/ingredient_index.py). Without it, or when that list
+    would be too long, they are correlated (NOT) EXISTS subqueries on DishIngredient, which the
+    (ingredient_id, dish_id) index answers on its own.
+
+    'fields' are the serializer fields that will be rendered (None means all of them); related
+    data that isn't rendered is not joined or prefetched.
     """
     # Start with all available dishes and pre-load related data
     # to prevent N+1 query problems.
-    queryset = Dish.objects.select_related("category").prefetch_related(  # .filter(is_available=True)
-        "dishingredient_set__ingredient"
-    )
+    # (the tsvector is only for filtering, never rendered)
+    queryset = Dish.objects.defer("search_vector")  # .filter(is_available=True)
+    if fields is None or "category" in fields:
+        queryset = queryset.select_related("category")
+    if fields is None or "ingredients" in fields:
+        queryset = queryset.prefetch_related(DISH_INGREDIENTS_PREFETCH)
 
     # If a category_id is provided, filter the queryset
     if category_id is not None:
         # Use category_id=category_id for a direct foreign key check
         queryset = queryset.filter(category_id=category_id)
 
-    # Order by name by default
-    queryset = queryset.order_by("name")
+    if with_ingredients or without_ingredients:
+        queryset = _filter_by_ingredients(
+            queryset, set(with_ingredients or ()), set(without_ingredients or ()), version
+        )
+
+    if search:
+        queryset = search_dishes(queryset, search)
+
+    # FR-049 by default: unavailable dishes go last, then by name (matches Dish.Meta.ordering and its index)
+    queryset = queryset.order_by(*DISH_ORDERINGS[ordering])
 
     return queryset
 
 
+def _filter_by_ingredients(queryset, with_ingredients, without_ingredients, version):
+    if version is not None:
+        found = find_dish_ids_or_others(
+            with_ingredients, without_ingredients, version=version, limit=INGREDIENT_FILTER_MAX_IDS
+        )
+        if found is not None:
+            matching, dish_ids = found
+            return queryset.filter(pk__in=dish_ids) if matching else queryset.exclude(pk__in=dish_ids)
+
+    for ingredient_id in with_ingredients:
+        queryset = queryset.filter(
+            Exists(DishIngredient.objects.filter(dish_id=OuterRef("pk"), ingredient_id=ingredient_id))
+        )
+    if without_ingredients:
+        queryset = queryset.filter(
+            ~Exists(DishIngredient.objects.filter(dish_id=OuterRef("pk"), ingredient_id__in=without_ingredients))
+        )
+    return queryset
+
+
 def _validate_ingredients_payload(ingredients_data):  # noqa: C901
     """Ensure every ingredient id exists and appears only once before writing to the DB."""
 
@@ -70,6 +149,43 @@ def _validate_ingredients_payload(ingredients_data):  # noqa: C901
         raise ValidationError({"ingredients_data": f"Unknown ingredient ids: {missing}."})
 
 
+def _index_rows(dish_ingredients):
+    return [(item.ingredient_id, item.is_base_ingredient) for item in dish_ingredients]
+
+
+# The dish compositions a dish, category or ingredient delete takes with it.
+_COMPOSITIONS_OF = {Dish: "dish", Category: "dish__category", Ingredient: "ingredient"}
+
+
+def _delete_compositions(**filters):
+    """
+    Deletes the DishIngredient rows matching 'filters' in one raw DELETE; the caller reports the change.
+    Not queryset.delete(): DishIngredient has a post_delete receiver, so Django would fetch the rows
+    and delete them a hundred at a time, sending a signal for each.
+    """
+    compositions = DishIngredient.objects.filter(**filters)
+    selected, params = compositions.values("pk").query.sql_with_params()
+    connection = connections[compositions.db]
+    table, pk = DishIngredient._meta.db_table, DishIngredient._meta.pk.column
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {connection.ops.quote_name(table)} "  # noqa: S608 - names from the model
+            f"WHERE {connection.ops.quote_name(pk)} IN ({selected})",
+            params,
+        )
+
+
+@transaction.atomic
+def delete_with_compositions(instance):
+    """
+    Deletes a dish, category or ingredient. Its dish compositions go first, in one statement: left
+    to the cascade, they would be fetched and deleted a hundred at a time, because DishIngredient has
+    a post_delete receiver. The parent's own receivers change the menu version and the index.
+    """
+    _delete_compositions(**{_COMPOSITIONS_OF[type(instance)]: instance})
+    instance.delete()
+
+
 @transaction.atomic
 def create_dish(validated_data):
     """
@@ -80,6 +196,9 @@ def create_dish(validated_data):
 
     # The serializer's 'category_id' field provides the 'category' instance directly.
     dish = Dish.objects.create(**validated_data)
+    move_dish_counts(None, (dish.category_id, dish.is_available))
+    if dish.photo:
+        schedule_photo_variants(dish)
 
     if ingredients_data:
         # Guard against bad payloads before touching DishIngredient rows.
@@ -92,6 +211,9 @@ def create_dish(validated_data):
             for item in ingredients_data
         ]
         DishIngredient.objects.bulk_create(dish_ingredients)
+        # bulk_create skips post_save, so report the composition change ourselves.
+        bump_menu_counter(MenuChangeCounter.Scope.DISH_INGREDIENT)
+        update_ingredient_index("set_dish_ingredients", dish.id, _index_rows(dish_ingredients))
 
     return dish
 
@@ -102,18 +224,27 @@ def update_dish(dish_instance, validated_data):
     Updates an existing dish instance from serializer's validated_data, validating ingredient references.
     """
     ingredients_data = validated_data.pop("ingredients_data", None)
+    # The stored state, not the instance's: it may be stale, and a concurrent edit waits here.
+    old_state = get_dish_count_state(dish_instance.pk)
 
     # Update basic fields
     for attr, value in validated_data.items():
         setattr(dish_instance, attr, value)
+    if "is_available" in validated_data:
+        # Set by hand: an ingredient coming back must not switch it on again.
+        dish_instance.ingredient_outage = False
 
     dish_instance.save()
+    move_dish_counts(old_state, (dish_instance.category_id, dish_instance.is_available))
+    if "photo" in validated_data:
+        schedule_photo_variants(dish_instance)
 
     # If ingredients_data is provided, replace existing ingredients
     if ingredients_data is not None:
         # Validate replacements to avoid duplicate or missing ingredient relationships.
         _validate_ingredients_payload(ingredients_data)
-        DishIngredient.objects.filter(dish=dish_instance).delete()
+        # Reported below, with the new rows.
+        _delete_compositions(dish=dish_instance)
         dish_ingredients = [
             DishIngredient(
                 dish=dish_instance,
@@ -123,5 +254,38 @@ def update_dish(dish_instance, validated_data):
             for item in ingredients_data
         ]
         DishIngredient.objects.bulk_create(dish_ingredients)
+        bump_menu_counter(MenuChangeCounter.Scope.DISH_INGREDIENT)
+        update_ingredient_index("set_dish_ingredients", dish_instance.id, _index_rows(dish_ingredients), replace=True)
 
     return dish_instance
+
+
+@transaction.atomic
+def apply_ingredient_outage(ingredient_id):
+    """
+    Takes the dishes that have 'ingredient_id' among their base ingredients off the menu while any
+    of their base ingredients is unavailable, and puts back the ones it took off once all of them are
+    available again. Dishes a manager switched off stay off. Run after an ingredient save commits.
+    Returns the number of dishes switched.
+    """
+    # The index answers which dishes are affected; the rows are only read to lock them.
+    out_ids, back_ids = find_outage_changes(ingredient_id, get_menu_version())
+    switched = _switch_outage(Dish.objects.filter(pk__in=out_ids, is_available=True), True)
+    switched += _switch_outage(Dish.objects.filter(pk__in=back_ids, is_available=False, ingredient_outage=True), False)
+    if switched:
+        invalidate_menu_documents()
+    return switched
+
+
+def _switch_outage(dishes, outage):
+    rows = list(dishes.select_for_update().values_list("id", "category_id"))
+    if not rows:
+        return 0
+    # .update() skips auto_now and sends no signals: the menu version is bumped by hand.
+    Dish.objects.filter(pk__in=[dish_id for dish_id, _ in rows]).update(
+        is_available=not outage, ingredient_outage=outage, updated_at=timezone.now()
+    )
+    bump_menu_counter(MenuChangeCounter.Scope.DISH)
+    for category_id, count in Counter(category_id for _, category_id in rows).items():
+        adjust_category_counts(category_id, 0, -count if outage else count)
+    return len(rows)
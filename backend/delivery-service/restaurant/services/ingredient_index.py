@@ -0,0 +1,239 @@
+import threading
+from array import array
+
+from django.db import transaction
+from restaurant.models import Dish, DishIngredient, Ingredient
+
+# Process-local ingredient -> dishes index (FR-004 filters, ingredient outages).
+#
+# Every dish gets a dense slot number; every ingredient a bitset over those slots, stored as a
+# Python int (an arbitrary-length word array, so AND / OR / AND NOT run in C over whole words).
+# "Dishes with all of X and none of Y" is then a handful of big-int operations instead of a query.
+#
+# The index is built lazily from three flat queries and kept current by the model signals
+# (restaurant/signals.py) and by the bulk composition writes in services/dishes.py. Updates are
+# applied on commit, so a rolled-back write never reaches it. Writes made by other processes
+# don't fire our signals: callers that need to see them pass the current menu version and the
+# index is rebuilt when it was built for another one.
+
+
+class IngredientIndex:
+    def __init__(self, token=None):
+        # Menu version token this index is known to match; None once local changes were applied.
+        self.token = token
+        self.slots = {}  # dish id -> slot
+        self.dish_ids = array("q")  # slot -> dish id (0 for a deleted dish)
+        self.all_dishes = 0
+        self.by_ingredient = {}  # ingredient id -> dishes containing it
+        self.base_by_ingredient = {}  # ingredient id -> dishes where it is a base ingredient
+        self.unavailable_ingredients = set()
+
+    @classmethod
+    def build(cls, token=None):
+        index = cls(token)
+        for dish_id in Dish.objects.order_by("id").values_list("id", flat=True):
+            index._slot(dish_id)
+        index.all_dishes = (1 << len(index.dish_ids)) - 1
+
+        # Set bits in plain byte buffers first; one int conversion per ingredient at the end.
+        size = (len(index.dish_ids) + 7) // 8
+        contains, base = {}, {}
+        for dish_id, ingredient_id, is_base in DishIngredient.objects.values_list(
+            "dish_id", "ingredient_id", "is_base_ingredient"
+        ).iterator(chunk_size=5000):
+            slot = index.slots[dish_id]
+            contains.setdefault(ingredient_id, bytearray(size))[slot >> 3] |= 1 << (slot & 7)
+            if is_base:
+                base.setdefault(ingredient_id, bytearray(size))[slot >> 3] |= 1 << (slot & 7)
+        index.by_ingredient = {key: int.from_bytes(buffer, "little") for key, buffer in contains.items()}
+        index.base_by_ingredient = {key: int.from_bytes(buffer, "little") for key, buffer in base.items()}
+        index.unavailable_ingredients = set(Ingredient.objects.filter(is_available=False).values_list("id", flat=True))
+        return index
+
+    def _slot(self, dish_id):
+        slot = self.slots.get(dish_id)
+        if slot is None:
+            slot = self.slots[dish_id] = len(self.dish_ids)
+            self.dish_ids.append(dish_id)
+        return slot
+
+    def _ids(self, bits):
+        """Dish ids of the set bits, in slot (= id) order."""
+        ids = []
+        digits = bin(bits)[:1:-1]  # little-endian string of 0/1, one char per slot
+        slot = digits.find("1")
+        while slot != -1:
+            ids.append(self.dish_ids[slot])
+            slot = digits.find("1", slot + 1)
+        return ids
+
+    def matching_bits(self, with_ingredients=(), without_ingredients=()):
+        bits = self.all_dishes
+        for ingredient_id in with_ingredients:
+            bits &= self.by_ingredient.get(ingredient_id, 0)
+        for ingredient_id in without_ingredients:
+            bits &= ~self.by_ingredient.get(ingredient_id, 0)
+        return bits
+
+    def base_bits(self, ingredient_id):
+        return self.base_by_ingredient.get(ingredient_id, 0) & self.all_dishes
+
+    def outage_bits(self):
+        bits = 0
+        for ingredient_id in self.unavailable_ingredients:
+            bits |= self.base_by_ingredient.get(ingredient_id, 0)
+        return bits & self.all_dishes
+
+    # --- incremental updates (called on commit, under the module lock) ---
+
+    def add_dish(self, dish_id):
+        self.all_dishes |= 1 << self._slot(dish_id)
+
+    def remove_dish(self, dish_id):
+        slot = self.slots.pop(dish_id, None)
+        if slot is None:
+            return
+        self.dish_ids[slot] = 0
+        keep = ~(1 << slot)
+        self.all_dishes &= keep
+        for bitsets in (self.by_ingredient, self.base_by_ingredient):
+            for ingredient_id in bitsets:
+                bitsets[ingredient_id] &= keep
+
+    def set_dish_ingredients(self, dish_id, rows, replace=False):
+        """rows: (ingredient_id, is_base_ingredient) pairs; replace=True drops the dish's other ingredients."""
+        self.add_dish(dish_id)
+        bit = 1 << self.slots[dish_id]
+        if replace:
+            for bitsets in (self.by_ingredient, self.base_by_ingredient):
+                for ingredient_id in bitsets:
+                    bitsets[ingredient_id] &= ~bit
+        for ingredient_id, is_base in rows:
+            self.by_ingredient[ingredient_id] = self.by_ingredient.get(ingredient_id, 0) | bit
+            base = self.base_by_ingredient.get(ingredient_id, 0)
+            self.base_by_ingredient[ingredient_id] = base | bit if is_base else base & ~bit
+
+    def remove_dish_ingredients(self, dish_id, ingredient_ids):
+        slot = self.slots.get(dish_id)
+        if slot is None:
+            return
+        keep = ~(1 << slot)
+        for ingredient_id in ingredient_ids:
+            for bitsets in (self.by_ingredient, self.base_by_ingredient):
+                if ingredient_id in bitsets:
+                    bitsets[ingredient_id] &= keep
+
+    def set_ingredient(self, ingredient_id, is_available):
+        if is_available:
+            self.unavailable_ingredients.discard(ingredient_id)
+        else:
+            self.unavailable_ingredients.add(ingredient_id)
+
+    def remove_ingredient(self, ingredient_id):
+        self.by_ingredient.pop(ingredient_id, None)
+        self.base_by_ingredient.pop(ingredient_id, None)
+        self.unavailable_ingredients.discard(ingredient_id)
+
+
+_index = None
+_lock = threading.Lock()
+# Bumped by every update and reset, so a build that raced with one is not installed.
+_generation = 0
+
+
+def get_ingredient_index(version=None):
+    """
+    Returns the process-local index, building it on first use.
+    With a MenuVersion, an index that isn't known to match it is rebuilt first.
+    """
+    global _index
+    with _lock:
+        index, generation = _index, _generation
+    if index is not None and (version is None or index.token == version.token):
+        return index
+
+    index = IngredientIndex.build(version.token if version else None)
+    with _lock:
+        if generation == _generation:
+            _index = index
+    return index
+
+
+def reset_ingredient_index():
+    global _index, _generation
+    with _lock:
+        _index = None
+        _generation += 1
+
+
+def find_dish_ids(with_ingredients=(), without_ingredients=(), version=None):
+    """
+    Ids of the dishes containing every ingredient in 'with_ingredients' and none in
+    'without_ingredients', in id order. Same result as get_dishes_queryset(with_ingredients=...,
+    without_ingredients=...) without touching the database once the index is warm.
+    """
+    index = get_ingredient_index(version)
+    with _lock:
+        return index._ids(index.matching_bits(set(with_ingredients), set(without_ingredients)))
+
+
+def count_dishes(with_ingredients=(), without_ingredients=(), version=None):
+    index = get_ingredient_index(version)
+    with _lock:
+        return index.matching_bits(set(with_ingredients), set(without_ingredients)).bit_count()
+
+
+def find_dish_ids_or_others(with_ingredients=(), without_ingredients=(), version=None, limit=None):
+    """
+    Like find_dish_ids(), but returns whichever list is shorter: (True, ids of the matching dishes)
+    or (False, ids of the other dishes). None when even that one is longer than 'limit'.
+    """
+    index = get_ingredient_index(version)
+    with _lock:
+        bits = index.matching_bits(set(with_ingredients), set(without_ingredients))
+        others = index.all_dishes & ~bits
+        matching = bits.bit_count() <= others.bit_count()
+        shorter = bits if matching else others
+        if limit is not None and shorter.bit_count() > limit:
+            return None
+        return matching, index._ids(shorter)
+
+
+def find_outage_dish_ids(version=None):
+    """
+    Ids of the dishes that have an unavailable ingredient (Ingredient.is_available=False) among their
+    base ingredients. Optional add-on ingredients running out don't take the dish off the menu.
+    """
+    index = get_ingredient_index(version)
+    with _lock:
+        return index._ids(index.outage_bits())
+
+
+def find_outage_changes(ingredient_id, version=None):
+    """
+    Splits the dishes that have 'ingredient_id' among their base ingredients into
+    (ids of those with an unavailable base ingredient, ids of the others).
+    """
+    index = get_ingredient_index(version)
+    with _lock:
+        bits, outage = index.base_bits(ingredient_id), index.outage_bits()
+        return index._ids(bits & outage), index._ids(bits & ~outage)
+
+
+def update_ingredient_index(method, *args, **kwargs):
+    """
+    Applies IngredientIndex.<method>(*args) to the built index once the current transaction commits.
+    If the index isn't built yet there is nothing to update: it will be built from the database.
+    """
+
+    def apply():
+        global _generation
+        with _lock:
+            _generation += 1
+            if _index is not None:
+                getattr(_index, method)(*args, **kwargs)
+                # The menu version after our commit may also hold another process's write, which the
+                # index doesn't have: leave it unknown, the next versioned call rebuilds.
+                _index.token = None
+
+    transaction.on_commit(apply)
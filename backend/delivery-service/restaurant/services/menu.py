@@ -0,0 +1,52 @@
+import hashlib
+from datetime import datetime
+from typing import NamedTuple
+
+from django.db.models import F
+from django.utils import timezone
+from restaurant.models import Dish, MenuChangeCounter
+
+
+class MenuVersion(NamedTuple):
+    """
+    A cheap fingerprint of everything the menu endpoints render.
+    'token' changes whenever any dish, category, ingredient or dish composition changes.
+    """
+
+    token: str
+    last_modified: datetime | None
+
+
+def get_menu_version():
+    """
+    Builds the current menu version from two small queries, without touching the dish rows
+    themselves: the MenuChangeCounter rows, and the dish count for inserts that send no signals
+    (bulk_create). Every menu write bumps its counter in its own transaction, so each commit moves
+    the token. Timestamps couldn't: a row's updated_at is taken when it is saved, not when it
+    commits, so an edit that commits after a later-stamped one wouldn't move their maximum.
+    Last-Modified is the latest counter bump.
+    """
+    last_modified = None
+    parts = [f"dishes={Dish.objects.count()}"]
+
+    for scope, value, updated_at in MenuChangeCounter.objects.order_by("scope").values_list(
+        "scope", "value", "updated_at"
+    ):
+        parts.append(f"{scope}={value}")
+        if last_modified is None or updated_at > last_modified:
+            last_modified = updated_at
+
+    token = hashlib.sha256("|".join(parts).encode()).hexdigest()
+    return MenuVersion(token=token, last_modified=last_modified)
+
+
+def bump_menu_counter(scope):
+    """
+    Marks one part of the menu as changed. Uses a single conditional UPDATE so
+    concurrent writers never lose an increment; the row stays locked until the caller's
+    transaction ends, so the writes of one scope commit in the order they bump.
+    """
+    updated = MenuChangeCounter.objects.filter(scope=scope).update(value=F("value") + 1, updated_at=timezone.now())
+    if not updated:
+        # The seed rows are created by a migration, but a flushed test database may not have them.
+        MenuChangeCounter.objects.get_or_create(scope=scope, defaults={"value": 1})
@@ -0,0 +1,55 @@
+import threading
+
+from django.core.cache import cache
+
+# Rendered dish lists, keyed by menu version and variant.
+# Two tiers: a small process-local dict in front of Django's default cache, so a warm
+# worker answers without even a cache round trip and a cold one still skips the render.
+MENU_DOCUMENT_TIMEOUT = 60 * 60
+MENU_DOCUMENT_LOCAL_LIMIT = 128
+
+_local_documents = {}
+_local_lock = threading.Lock()
+
+
+def menu_document_key(version, variant):
+    """
+    The key embeds the menu version token, so an entry can never be served for a newer menu,
+    even by a worker that missed the invalidation signal.
+    """
+    return f"menu:dishes:{version.token}:{variant}"
+
+
+def get_menu_document(version, variant, build):
+    """
+    Returns the rendered bytes for one dish list variant, calling build() only on a full miss.
+    """
+    key = menu_document_key(version, variant)
+
+    document = _local_documents.get(key)
+    if document is not None:
+        return document
+
+    document = cache.get(key)
+    if document is None:
+        document = build()
+        cache.set(key, document, MENU_DOCUMENT_TIMEOUT)
+
+    with _local_lock:
+        if len(_local_documents) >= MENU_DOCUMENT_LOCAL_LIMIT:
+            # Drop the oldest entry; dicts keep insertion order.
+            _local_documents.pop(next(iter(_local_documents)))
+        _local_documents[key] = document
+    return document
+
+
+def invalidate_menu_documents():
+    """
+    Called from the menu change signals. Frees the local tier and the shared entries this
+    process knows about; anything left behind is keyed by an outdated version and just expires.
+    """
+    with _local_lock:
+        stale_keys = list(_local_documents)
+        _local_documents.clear()
+    if stale_keys:
+        cache.delete_many(stale_keys)
@@ -1,8 +1,8 @@
-from decimal import Decimal
-
 from django.db import transaction
-
-from ..models import Dish, Order, OrderItem
+from orders.models import Order
+from orders.services.orders import place_order
+from orders.services.phones import normalize_phone
+from restaurant.models import Dish
 
 
 class OrderCreationError(Exception):
@@ -11,13 +11,17 @@ class OrderCreationError(Exception):
 
 def create_order_with_items(order_data: dict, items_data: list, user=None) -> Order:
     """
-    order_data: dict with keys: phone, delivery_address (optional), self_pickup (bool), payment_method (optional)
+    order_data: dict with keys: phone, delivery_address (optional), self_pickup (bool), payment_method (optional),
+    notes (optional)
     items_data: list of dicts: {"dish_id": int, "quantity": int}
     Returns created Order instance.
     Raises OrderCreationError on validation issues.
     """
     if not items_data:
         raise OrderCreationError("Order must contain at least one item.")
+    phone_e164 = normalize_phone(order_data["phone"])
+    if phone_e164 is None:
+        raise OrderCreationError("Invalid phone number.")
 
     # Validate phone, address/self_pickup logic superficially here; model.clean will also enforce
     if not order_data.get("self_pickup") and not order_data.get("delivery_address"):
@@ -25,42 +29,27 @@ def create_order_with_items(order_data: dict, items_data: list, user=None) -> Or
     if order_data.get("self_pickup") and order_data.get("delivery_address"):
         raise OrderCreationError("If self_pickup is True, delivery_address must be empty.")
 
-    with transaction.atomic():
-        order = Order.objects.create(
-            phone=order_data["phone"],
-            delivery_address=order_data.get("delivery_address"),
-            self_pickup=bool(order_data.get("self_pickup", False)),
-            payment_method=order_data.get("payment_method", Order.PaymentMethod.CASH),
-        )
+    quantities = [int(it.get("quantity", 1)) for it in items_data]
+    if min(quantities) < 1:
+        raise OrderCreationError("Quantity must be at least 1.")
 
-        total = Decimal("0.00")
-        # lock selected dishes to avoid race conditions (optional)
-        dish_ids = [it["dish_id"] for it in items_data]
-        dishes = Dish.objects.filter(id__in=dish_ids)
-        dishes_map = {d.id: d for d in dishes}
-        if len(dishes_map) != len(set(dish_ids)):
-            missing = set(dish_ids) - set(dishes_map.keys())
+    # A constant number of statements whatever the cart size: one dish fetch, then place_order's
+    # order insert, multi-row items insert, kitchen board delta and sales rollup upserts.
+    with transaction.atomic():
+        dish_ids = {it["dish_id"] for it in items_data}
+        dishes_map = Dish.objects.only("id", "name", "price", "category_id").in_bulk(dish_ids)
+        if len(dishes_map) != len(dish_ids):
+            missing = dish_ids - set(dishes_map.keys())
             raise OrderCreationError(f"Some dishes not found: {missing}")
 
-        for it in items_data:
-            dish = dishes_map[it["dish_id"]]
-            qty = int(it.get("quantity", 1))
-            unit_price = dish.price  # snapshot current price
-            line_total = (unit_price or Decimal("0.00")) * Decimal(qty)
-            OrderItem.objects.create(
-                order=order,
-                dish=dish,
-                name=dish.name,
-                unit_price=unit_price,
-                quantity=qty,
-                line_total=line_total,
-            )
-            total += line_total
-
-        order.total_amount = total
-        order.save(update_fields=["total_amount"])
-
-        # business rule: if self_pickup -> mark paid instantly
-        order.mark_paid_if_self_pickup()
-
-        return order
+        order_fields = {
+            "user": user,
+            "phone": order_data["phone"],
+            "phone_e164": phone_e164,
+            "delivery_address": order_data.get("delivery_address") or "",
+            "self_pickup": bool(order_data.get("self_pickup", False)),
+            "payment_method": order_data.get("payment_method", Order.PaymentMethod.CASH),
+            "notes": order_data.get("notes", ""),
+        }
+        lines = [(dishes_map[it["dish_id"]], qty) for it, qty in zip(items_data, quantities, strict=True)]
+        return place_order(order_fields, lines)
@@ -0,0 +1,246 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+from restaurant.models import Dish, MenuChangeCounter
+from restaurant.services.menu import bump_menu_counter
+from restaurant.services.menu_cache import invalidate_menu_documents
+from restaurant.storage import content_addressed_name, content_hash, is_content_addressed, save_once
+
+logger = logging.getLogger(__name__)
+
+# Responsive variants of the dish photos.
+#
+# The uploaded original is kept as is and stays available as photo_url. After the upload commits,
+# a small thread pool decodes it once and writes fixed-width re-encodings:
+#     dishes_photos/variants/<photo stem>-<width>.<format>
+# Their paths are stored in Dish.photo_variants ({format: [[width, path], ...]}) and rendered as
+# ready-made srcset strings. Variants carry no EXIF (camera data, GPS position), are rotated
+# according to the EXIF orientation, and are never made from images with more than
+# DISH_PHOTO_MAX_PIXELS decoded pixels.
+#
+# Photos are content-addressed (restaurant/storage.py), so a variant name is too: variants of the
+# same photo are shared by every dish using it and written once. Nothing is deleted here;
+# `migrate_dish_photos` removes the variants no dish references any more.
+
+VARIANT_WIDTHS = (320, 640, 1280)
+# Preferred first: clients pick the first <source> type they support.
+VARIANT_FORMATS = {
+    "avif": {"format": "AVIF", "quality": 55},
+    "webp": {"format": "WEBP", "quality": 80, "method": 4},
+}
+VARIANTS_DIR = "dishes_photos/variants"
+# Unreferenced files younger than this may belong to an upload that hasn't committed yet.
+ORPHAN_GRACE = timedelta(hours=24)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def available_variant_formats():
+    # AVIF needs a Pillow built with libavif.
+    return [name for name in VARIANT_FORMATS if features.check(name)]
+
+
+def variant_widths(original_width):
+    """Widths to render for an image 'original_width' pixels wide: no upscaling, at least one."""
+    widths = [width for width in VARIANT_WIDTHS if width < original_width]
+    widths.append(min(original_width, VARIANT_WIDTHS[-1]))
+    return sorted(set(widths))
+
+
+def _open_photo(photo_file):
+    image = Image.open(photo_file)
+    width, height = image.size
+    # Checked on the header, before anything is decoded.
+    if width * height > settings.DISH_PHOTO_MAX_PIXELS:
+        raise ValueError(f"{width}x{height} is over DISH_PHOTO_MAX_PIXELS ({settings.DISH_PHOTO_MAX_PIXELS}).")
+    # JPEG can decode straight at 1/2, 1/4 or 1/8 scale when that is still large enough
+    # (both sides: the EXIF orientation may swap them).
+    image.draft("RGB", (VARIANT_WIDTHS[-1], VARIANT_WIDTHS[-1]))
+    image = ImageOps.exif_transpose(image)
+    return image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+
+
+def render_variants(photo_file, photo_name, storage):
+    """
+    Writes the variants of one photo into 'storage'; returns {format: [[width, path], ...]}.
+    """
+    stem = PurePosixPath(photo_name).stem
+    # Legacy (not yet migrated) names say nothing about the content: their variants get fresh names.
+    shared = is_content_addressed(photo_name)
+    image = _open_photo(photo_file)
+    formats = available_variant_formats()
+    variants = {name: [] for name in formats}
+    for width in variant_widths(image.width):
+        for name in formats:
+            path = f"{VARIANTS_DIR}/{stem}-{width}.{name}"
+            if not (shared and storage.exists(path)):
+                path = storage.save(path, ContentFile(_encode(image, width, name)))
+            variants[name].append([width, path])
+    return variants
+
+
+def _encode(image, width, name):
+    height = max(1, round(image.height * width / image.width))
+    resized = image if width == image.width else image.resize((width, height), Image.Resampling.LANCZOS)
+    buffer = BytesIO()
+    # No exif= argument: nothing of the original metadata is written.
+    resized.save(buffer, **VARIANT_FORMATS[name])
+    return buffer.getvalue()
+
+
+def generate_photo_variants(dish_id, photo_name):
+    """
+    Renders the variants of 'photo_name' and stores them on the dish, unless the dish has
+    another photo by now (a newer upload's job owns the variants then). Returns the variants,
+    or None for such an outdated job.
+    An image that can't be decoded, or is too large, gets none: clients fall back to photo_url.
+    """
+    storage = Dish._meta.get_field("photo").storage
+    variants = {}
+    if photo_name:
+        try:
+            with storage.open(photo_name) as photo_file:
+                variants = render_variants(photo_file, photo_name, storage)
+        except (OSError, UnidentifiedImageError, ValueError, Image.DecompressionBombError) as exc:
+            logger.warning("No variants for dish %s photo %s: %s", dish_id, photo_name, exc)
+
+    # .update() sends no signals: the variants are rendered, so the menu version moves with them.
+    same_photo = Q(photo=photo_name) if photo_name else Q(photo="") | Q(photo__isnull=True)
+    with transaction.atomic():
+        updated = Dish.objects.filter(same_photo, pk=dish_id).update(photo_variants=variants, updated_at=timezone.now())
+        if not updated:
+            return None
+        bump_menu_counter(MenuChangeCounter.Scope.DISH)
+    invalidate_menu_documents()
+    return variants
+
+
+def _run_in_worker(dish_id, photo_name):
+    try:
+        generate_photo_variants(dish_id, photo_name)
+    except Exception:
+        logger.exception("Photo variants failed for dish %s", dish_id)
+    finally:
+        # Worker threads get their own connections; don't leave them open between jobs.
+        close_old_connections()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.DISH_PHOTO_WORKERS, thread_name_prefix="dish-photo-variants"
+            )
+        return _executor
+
+
+def schedule_photo_variants(dish):
+    """
+    Renders the variants of the dish's current photo (or drops them, when it has none) off the
+    request thread, once the current transaction commits.
+    """
+    dish_id, photo_name = dish.pk, dish.photo.name or ""
+    transaction.on_commit(lambda: _get_executor().submit(_run_in_worker, dish_id, photo_name))
+
+
+def photo_srcsets(variants, request=None):
+    """
+    {format: srcset} for Dish.photo_variants, e.g. {"webp": "https://.../a-320.webp 320w, ..."}.
+    """
+    storage = Dish._meta.get_field("photo").storage
+    srcsets = {}
+    for name, entries in (variants or {}).items():
+        urls = ((storage.url(path), width) for width, path in entries)
+        srcsets[name] = ", ".join(
+            f"{request.build_absolute_uri(url) if request else url} {width}w" for url, width in urls
+        )
+    return srcsets
+
+
+def migrate_legacy_photos(dry_run=False):
+    """
+    Moves dish photos stored under their upload name to their content-addressed name and
+    re-renders their variants. Returns [(dish id, old name, new name or None when missing), ...].
+    The old files are left to collect_orphaned_photos().
+    """
+    field = Dish._meta.get_field("photo")
+    migrated = []
+    legacy = Dish.objects.exclude(photo="").exclude(photo__isnull=True).order_by("id").values_list("id", "photo")
+    for dish_id, name in legacy.iterator():
+        if is_content_addressed(name):
+            continue
+        if not field.storage.exists(name):
+            migrated.append((dish_id, name, None))
+            continue
+        with field.storage.open(name) as photo_file:
+            new_name = field.generate_filename(None, content_addressed_name(name, content_hash(photo_file)))
+            if not dry_run:
+                new_name = save_once(field.storage, new_name, photo_file, max_length=field.max_length)
+        if not dry_run and _move_photo(dish_id, name, new_name):
+            generate_photo_variants(dish_id, new_name)
+        migrated.append((dish_id, name, new_name))
+    return migrated
+
+
+@transaction.atomic
+def _move_photo(dish_id, old_name, new_name):
+    if not Dish.objects.filter(pk=dish_id, photo=old_name).update(photo=new_name, updated_at=timezone.now()):
+        return False
+    bump_menu_counter(MenuChangeCounter.Scope.DISH)
+    return True
+
+
+def _stored_files(storage, directory):
+    if not storage.exists(directory):
+        return
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield f"{directory}/{name}"
+    for name in directories:
+        yield from _stored_files(storage, f"{directory}/{name}")
+
+
+def _referenced_files(dishes):
+    referenced = set()
+    for photo, variants in dishes.values_list("photo", "photo_variants").iterator():
+        if photo:
+            referenced.add(photo)
+        for entries in (variants or {}).values():
+            referenced.update(path for _, path in entries)
+    return referenced
+
+
+def collect_orphaned_photos(grace=ORPHAN_GRACE, dry_run=False):
+    """
+    Deletes the files under the dish photo directory that no dish references, photos and variants
+    alike, once they are older than 'grace' (uploads whose transaction or variants job is still
+    running aren't referenced yet). Returns the deleted (or, with dry_run, deletable) names.
+    """
+    storage = Dish._meta.get_field("photo").storage
+    directory = str(Dish._meta.get_field("photo").upload_to).rstrip("/")
+    referenced = _referenced_files(Dish.objects.all())
+    cutoff = timezone.now() - grace
+    orphans = [
+        name
+        for name in _stored_files(storage, directory)
+        if name not in referenced and storage.get_modified_time(name) < cutoff
+    ]
+    if orphans and not dry_run:
+        # Files are shared: check again right before deleting, an upload may have reused one meanwhile.
+        still_referenced = _referenced_files(Dish.objects.all())
+        orphans = [name for name in orphans if name not in still_referenced]
+        for name in orphans:
+            storage.delete(name)
+    return orphans
@@ -0,0 +1,39 @@
+import re
+
+from django.contrib.postgres.search import SearchQuery
+from django.db import connections
+from django.db.models import Q
+
+# FR-008: dish search by name (and description) across all categories.
+SEARCH_MAX_TERMS = 8
+# Letters and digits only, so user input can never break the raw tsquery syntax.
+_TERM_RE = re.compile(r"[^\W_]+", re.UNICODE)
+
+
+def _prefix_tsquery(terms):
+    # Every term as a prefix, all required: "сирн піц" -> "сирн:* & піц:*".
+    return " & ".join(f"{term}:*" for term in terms)
+
+
+def search_dishes(queryset, query):
+    """
+    Filters a Dish queryset by a free-text query.
+
+    On PostgreSQL this is one statement served by two GIN indexes (see migration 0008):
+    - full-text prefix match on the trigger-maintained 'search_vector' (name + description);
+    - OR a pg_trgm word-similarity match on 'name', which catches typos ("margherta" -> "Margherita")
+      and misspelled or partial Cyrillic words.
+    Other backends fall back to case-insensitive substring matching.
+    """
+    terms = [term.lower() for term in _TERM_RE.findall(query or "")][:SEARCH_MAX_TERMS]
+    if not terms:
+        return queryset
+
+    if connections[queryset.db].vendor != "postgresql":
+        condition = Q()
+        for term in terms:
+            condition &= Q(name__icontains=term) | Q(description__icontains=term)
+        return queryset.filter(condition)
+
+    tsquery = SearchQuery(_prefix_tsquery(terms), config="simple", search_type="raw")
+    return queryset.filter(Q(search_vector=tsquery) | Q(name__trigram_word_similar=" ".join(terms)))
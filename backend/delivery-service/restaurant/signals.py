@@ -0,0 +1,118 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from restaurant.models import Category, Dish, DishIngredient, Ingredient, MenuChangeCounter
+from restaurant.services.categories import get_dish_count_state, move_dish_counts
+from restaurant.services.dishes import apply_ingredient_outage
+from restaurant.services.ingredient_index import reset_ingredient_index, update_ingredient_index
+from restaurant.services.menu import bump_menu_counter
+from restaurant.services.menu_cache import invalidate_menu_documents
+
+
+@receiver([post_save, post_delete], sender=Dish)
+def dish_changed(sender, **kwargs):
+    invalidate_menu_documents()
+
+
+@receiver(post_save, sender=Dish)
+def dish_saved(sender, instance, created, **kwargs):
+    # In the save's transaction: the menu version moves when the edit commits (see get_menu_version).
+    bump_menu_counter(MenuChangeCounter.Scope.DISH)
+    if created:
+        update_ingredient_index("add_dish", instance.pk)
+
+
+# Dishes deleted along with their category have no counters left to update.
+@receiver(pre_delete, sender=Dish)
+def dish_deleting(sender, instance, origin=None, **kwargs):
+    # 'origin' is the deleted instance or queryset that started the cascade.
+    if not (isinstance(origin, Category) or getattr(origin, "model", None) is Category):
+        # The stored state: the instance being deleted may be stale (deletes run in a transaction).
+        instance._count_state = get_dish_count_state(instance.pk)
+
+
+@receiver(post_delete, sender=Dish)
+def dish_deleted(sender, instance, origin=None, **kwargs):
+    update_ingredient_index("remove_dish", instance.pk)
+    move_dish_counts(getattr(instance, "_count_state", None), None)
+    # A category delete bumps its own counter.
+    if not _deleted_directly(origin, Category) and _first_in_delete(origin, "dish_deleted"):
+        bump_menu_counter(MenuChangeCounter.Scope.DISH)
+
+
+@receiver([post_save, post_delete], sender=Category)
+def category_changed(sender, **kwargs):
+    bump_menu_counter(MenuChangeCounter.Scope.CATEGORY)
+    invalidate_menu_documents()
+
+
+@receiver([post_save, post_delete], sender=Ingredient)
+def ingredient_changed(sender, **kwargs):
+    bump_menu_counter(MenuChangeCounter.Scope.INGREDIENT)
+    invalidate_menu_documents()
+
+
+@receiver(post_save, sender=Ingredient)
+def ingredient_saved(sender, instance, created, **kwargs):
+    update_ingredient_index("set_ingredient", instance.pk, instance.is_available)
+    if not created:
+        # After the index update above, which it reads. A save that kept the availability switches nothing.
+        transaction.on_commit(partial(apply_ingredient_outage, instance.pk))
+
+
+@receiver(post_delete, sender=Ingredient)
+def ingredient_deleted(sender, instance, **kwargs):
+    update_ingredient_index("remove_ingredient", instance.pk)
+
+
+@receiver(post_save, sender=DishIngredient)
+def dish_ingredient_changed(sender, instance, created, **kwargs):
+    bump_menu_counter(MenuChangeCounter.Scope.DISH_INGREDIENT)
+    invalidate_menu_documents()
+    if created:
+        update_ingredient_index(
+            "set_dish_ingredients", instance.dish_id, [(instance.ingredient_id, instance.is_base_ingredient)]
+        )
+    else:
+        # The row may have moved to another ingredient; we don't know the old one.
+        transaction.on_commit(reset_ingredient_index)
+
+
+# Rows deleted along with their dish or ingredient are skipped: those deletes change the menu
+# version and the index through their own receivers. A queryset delete bumps the counter once,
+# not once per row.
+@receiver(post_delete, sender=DishIngredient)
+def dish_ingredient_deleted(sender, instance, origin=None, **kwargs):
+    if not _deleted_directly(origin, DishIngredient):
+        return
+    if _first_in_delete(origin, "dish_ingredient_deleted"):
+        bump_menu_counter(MenuChangeCounter.Scope.DISH_INGREDIENT)
+        invalidate_menu_documents()
+    update_ingredient_index("remove_dish_ingredients", instance.dish_id, [instance.ingredient_id])
+
+
+def _deleted_directly(origin, model):
+    """Whether 'origin', the instance or queryset whose delete() sent the signal, is of 'model'."""
+    return isinstance(origin, model) or getattr(origin, "model", None) is model
+
+
+def _first_in_delete(origin, name):
+    """True the first time 'name' asks for this delete() call, False for the following rows."""
+    if origin is None:
+        return True
+    done = origin.__dict__.setdefault("_delete_receivers_done", set())
+    if name in done:
+        return False
+    done.add(name)
+    return True
+
+
+@receiver(m2m_changed, sender=Dish.ingredients.through)
+def dish_ingredients_m2m_changed(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        bump_menu_counter(MenuChangeCounter.Scope.DISH_INGREDIENT)
+        invalidate_menu_documents()
+        # Rare (admin / shell) path; through_defaults aren't in the signal, so rebuild on next use.
+        transaction.on_commit(reset_ingredient_index)
@@ -0,0 +1,60 @@
+import hashlib
+import re
+from pathlib import PurePosixPath
+
+from django.db.models.fields.files import ImageField, ImageFieldFile
+
+# Content-addressed dish photos.
+#
+# An uploaded photo is stored as <upload_to>/<sha256 of its bytes><extension>, so a name always
+# means the same bytes: its URL can be cached forever (Cache-Control: immutable), and uploading
+# the same image again, for any dish, reuses the stored file instead of writing a copy.
+# Replacing a photo therefore never deletes anything in the request; files nobody references any
+# more are removed by `python manage.py migrate_dish_photos`, which also renames legacy uploads.
+
+# "<hash>.jpg", "<hash>-320.webp", or "<hash>_AbC1234.jpg" when two identical uploads raced.
+_HASH_STEM_RE = re.compile(r"^[0-9a-f]{64}(?=[-_.]|$)")
+
+
+def content_hash(content):
+    """SHA-256 hex digest of a Django File (read in chunks), leaving it rewound."""
+    digest = hashlib.sha256()
+    content.seek(0)
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def is_content_addressed(name):
+    """True for photo names (and their variants) that start with a content hash."""
+    return bool(_HASH_STEM_RE.match(PurePosixPath(name).name))
+
+
+def content_addressed_name(name, digest):
+    return f"{digest}{PurePosixPath(name).suffix.lower()}"
+
+
+def save_once(storage, name, content, max_length=None):
+    """Saves 'content' under exactly 'name' unless that file already exists (same name, same bytes)."""
+    if storage.exists(name):
+        return name
+    return storage.save(name, content, max_length=max_length)
+
+
+class ContentAddressedImageFieldFile(ImageFieldFile):
+    def save(self, name, content, save=True):
+        name = self.field.generate_filename(self.instance, content_addressed_name(name, content_hash(content)))
+        self.name = save_once(self.storage, name, content, max_length=self.field.max_length)
+        self._set_instance_attribute(self.name, content)
+        self._committed = True
+        if save:
+            self.instance.save()
+
+    save.alters_data = True
+
+
+class ContentAddressedImageField(ImageField):
+    """An ImageField that stores files under the hash of their content (see above)."""
+
+    attr_class = ContentAddressedImageFieldFile
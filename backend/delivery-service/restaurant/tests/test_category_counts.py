@@ -0,0 +1,109 @@
+from io import StringIO
+
+from accounts.models import User
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from restaurant.models import Category, Dish
+from restaurant.services.dishes import create_dish, update_dish
+
+
+class CategoryCountsTests(APITestCase):
+    """
+    Tests for the denormalized Category.dish_count / available_count counters.
+    """
+
+    def setUp(self):
+        self.manager = User.objects.create_user(
+            first_name="manager",
+            last_name="user",
+            password="password123",
+            email="manager@delivery.com",
+            role=User.Role.MANAGER,  # nosec
+        )
+        self.pizza = Category.objects.create(name="Pizza")
+        self.drinks = Category.objects.create(name="Drinks")
+
+    def make_dish(self, name, category, is_available=True):
+        return create_dish(
+            {"name": name, "description": "-", "price": 10, "category": category, "is_available": is_available}
+        )
+
+    def assertCounts(self, category, dish_count, available_count):
+        category.refresh_from_db()
+        self.assertEqual((category.dish_count, category.available_count), (dish_count, available_count))
+
+    def test_create_update_and_delete_keep_the_counters(self):
+        margherita = self.make_dish("Margherita", self.pizza)
+        self.make_dish("Calzone", self.pizza, is_available=False)
+        self.assertCounts(self.pizza, 2, 1)
+
+        update_dish(margherita, {"is_available": False})
+        self.assertCounts(self.pizza, 2, 0)
+
+        # A stale instance must not matter: the stored state is what gets moved.
+        stale = Dish.objects.get(pk=margherita.pk)
+        update_dish(margherita, {"is_available": True})
+        self.assertCounts(self.pizza, 2, 1)
+        # The stale save also writes back its is_available=False.
+        update_dish(stale, {"category": self.drinks})
+        self.assertCounts(self.pizza, 1, 0)
+        self.assertCounts(self.drinks, 1, 0)
+
+        margherita.delete()
+        self.assertCounts(self.drinks, 0, 0)
+
+    def test_unchanged_state_runs_no_counter_update(self):
+        dish = self.make_dish("Margherita", self.pizza)
+        # Savepoint, lock + read, the dish UPDATE, the menu counter bump, release; no category UPDATE.
+        with self.assertNumQueries(5):
+            update_dish(dish, {"price": 12})
+
+    def test_category_list_renders_the_counters(self):
+        self.make_dish("Margherita", self.pizza)
+        self.make_dish("Calzone", self.pizza, is_available=False)
+        response = self.client.get(reverse("category-list"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        by_name = {item["name"]: item for item in response.data}
+        self.assertEqual((by_name["Pizza"]["dish_count"], by_name["Pizza"]["available_count"]), (2, 1))
+        self.assertEqual((by_name["Drinks"]["dish_count"], by_name["Drinks"]["available_count"]), (0, 0))
+
+    def test_counters_are_read_only(self):
+        self.client.force_authenticate(self.manager)
+        response = self.client.patch(reverse("category-detail", args=[self.pizza.pk]), {"dish_count": 50})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCounts(self.pizza, 0, 0)
+
+    def test_dish_payload_keeps_the_plain_category(self):
+        dish = self.make_dish("Margherita", self.pizza)
+        response = self.client.get(reverse("dish-detail", args=[dish.pk]))
+        self.assertEqual(set(response.data["category"]), {"id", "name", "slug"})
+
+    def test_deleting_a_category_with_dishes(self):
+        self.make_dish("Margherita", self.pizza)
+        self.make_dish("Cola", self.drinks)
+        self.pizza.delete()
+        self.assertCounts(self.drinks, 1, 1)
+        # Queryset deletes cascade too, without touching the doomed counters.
+        Category.objects.filter(pk=self.drinks.pk).delete()
+        self.assertFalse(Dish.objects.exists())
+
+    def test_repair_command_fixes_drifted_counters(self):
+        self.make_dish("Margherita", self.pizza)
+        # Bulk writes bypass the services.
+        Dish.objects.filter(category=self.pizza).update(is_available=False)
+        Category.objects.filter(pk=self.drinks.pk).update(dish_count=7)
+
+        out = StringIO()
+        call_command("repair_category_counts", "--dry-run", stdout=out)
+        self.assertIn("2 categories have wrong counters", out.getvalue())
+        self.assertCounts(self.pizza, 1, 1)
+
+        call_command("repair_category_counts", stdout=StringIO())
+        self.assertCounts(self.pizza, 1, 0)
+        self.assertCounts(self.drinks, 0, 0)
+
+        out = StringIO()
+        call_command("repair_category_counts", stdout=out)
+        self.assertIn("All category counters are correct", out.getvalue())
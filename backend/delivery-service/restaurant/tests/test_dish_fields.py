@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from restaurant.models import Category, Dish, DishIngredient, Ingredient
+
+
+class DishSparseFieldsetTests(APITestCase):
+    """
+    Tests for ?fields= and ?view=compact on the dish endpoints.
+    """
+
+    def setUp(self):
+        cache.clear()
+        category = Category.objects.create(name="Pizza")
+        self.dish = Dish.objects.create(name="Margherita", description="Classic.", price=120, category=category)
+        DishIngredient.objects.create(dish=self.dish, ingredient=Ingredient.objects.create(name="Cheese"))
+        self.dishes_url = reverse("dish-list")
+
+    def test_compact_view_has_no_nested_data(self):
+        response = self.client.get(self.dishes_url, {"view": "compact"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(response.json()[0]), {"id", "name", "price", "photo_url", "photo_variants", "is_available"}
+        )
+
+    def test_compact_view_skips_joins_and_prefetches(self):
+        # menu version (2) + one plain dish query, no category join and no ingredient prefetch
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.dishes_url, {"view": "compact"})
+        self.assertEqual(len(queries), 3)
+        self.assertNotIn("JOIN", queries[-1]["sql"])
+
+    def test_fields_selects_subset(self):
+        response = self.client.get(self.dishes_url, {"fields": "name,category"})
+        self.assertEqual(response.json(), [{"name": "Margherita", "category": response.json()[0]["category"]}])
+        self.assertEqual(response.json()[0]["category"]["name"], "Pizza")
+
+    def test_fields_on_retrieve(self):
+        response = self.client.get(reverse("dish-detail", args=[self.dish.id]), {"fields": "id,ingredients"})
+        self.assertEqual(set(response.json()), {"id", "ingredients"})
+        self.assertEqual(response.json()["ingredients"][0]["name"], "Cheese")
+
+    def test_full_representation_is_unchanged(self):
+        response = self.client.get(self.dishes_url)
+        self.assertIn("description", response.json()[0])
+        self.assertIn("ingredients", response.json()[0])
+
+    def test_invalid_field_selection_fails_400(self):
+        for params in [
+            {"fields": "name,secret"},
+            {"fields": ","},
+            {"view": "full"},
+            {"view": "compact", "fields": "id"},
+        ]:
+            response = self.client.get(self.dishes_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, params)
@@ -0,0 +1,92 @@
+from unittest import mock
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from restaurant.models import Category, Dish, DishIngredient, Ingredient, MenuChangeCounter
+from restaurant.services.menu import bump_menu_counter
+
+
+class DishSortingAndIngredientFilterTests(APITestCase):
+    """
+    Tests for server-side price sorting (FR-003) and ingredient filters (FR-004) on the dish list.
+    """
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Pizza")
+        self.cheese = Ingredient.objects.create(name="Cheese")
+        self.ham = Ingredient.objects.create(name="Ham")
+        self.olives = Ingredient.objects.create(name="Olives")
+
+        compositions = {
+            "Margherita": (120, [self.cheese]),
+            "Prosciutto": (180, [self.cheese, self.ham]),
+            "Marinara": (90, []),
+            "Greek": (150, [self.cheese, self.olives]),
+        }
+        for name, (price, ingredients) in compositions.items():
+            dish = Dish.objects.create(name=name, description="Test.", price=price, category=self.category)
+            for ingredient in ingredients:
+                DishIngredient.objects.create(dish=dish, ingredient=ingredient)
+        self.dishes_url = reverse("dish-list")
+
+    def names(self, params):
+        response = self.client.get(self.dishes_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [dish["name"] for dish in response.json()]
+
+    def test_ordering_by_price(self):
+        self.assertEqual(self.names({"ordering": "price"}), ["Marinara", "Margherita", "Greek", "Prosciutto"])
+        self.assertEqual(self.names({"ordering": "-price"}), ["Prosciutto", "Greek", "Margherita", "Marinara"])
+
+    def test_invalid_ordering_fails_400(self):
+        response = self.client.get(self.dishes_url, {"ordering": "name"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_with_ingredients_requires_all(self):
+        self.assertEqual(self.names({"with_ingredients": f"{self.cheese.id}"}), ["Greek", "Margherita", "Prosciutto"])
+        self.assertEqual(self.names({"with_ingredients": f"{self.cheese.id},{self.ham.id}"}), ["Prosciutto"])
+
+    def test_without_ingredients_excludes_any(self):
+        params = {"without_ingredients": f"{self.ham.id},{self.olives.id}"}
+        self.assertEqual(self.names(params), ["Margherita", "Marinara"])
+
+    def test_filters_combine_with_ordering(self):
+        params = {
+            "with_ingredients": str(self.cheese.id),
+            "without_ingredients": str(self.ham.id),
+            "ordering": "-price",
+        }
+        self.assertEqual(self.names(params), ["Greek", "Margherita"])
+
+    def test_filters_are_a_single_query(self):
+        params = {"with_ingredients": str(self.cheese.id), "without_ingredients": str(self.ham.id)}
+        self.client.get(self.dishes_url, params)  # builds the ingredient index for this menu version
+        # menu version (2) + filtered dish list (1) + the dishes' ingredients (1)
+        with self.assertNumQueries(4):
+            self.client.get(self.dishes_url, params)
+
+    def test_filters_see_compositions_written_elsewhere(self):
+        self.names({"with_ingredients": str(self.ham.id)})
+        # A bulk write sends no signals, like one from another process; the menu version still moves.
+        DishIngredient.objects.bulk_create(
+            [DishIngredient(dish=Dish.objects.get(name="Marinara"), ingredient=self.ham)]
+        )
+        bump_menu_counter(MenuChangeCounter.Scope.DISH_INGREDIENT)
+        self.assertEqual(self.names({"with_ingredients": str(self.ham.id)}), ["Marinara", "Prosciutto"])
+
+    def test_long_id_lists_fall_back_to_subqueries(self):
+        with mock.patch("restaurant.services.dishes.INGREDIENT_FILTER_MAX_IDS", 0):
+            self.test_with_ingredients_requires_all()
+            self.test_without_ingredients_excludes_any()
+
+    def test_malformed_ingredient_ids_fail_400(self):
+        for value in ["abc", "1,x", "0", "-3"]:
+            response = self.client.get(self.dishes_url, {"with_ingredients": value})
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_price_ordering_paginates(self):
+        first = self.client.get(self.dishes_url, {"ordering": "price", "page_size": 3}).json()
+        second = self.client.get(first["next"]).json()
+        names = [dish["name"] for dish in first["results"] + second["results"]]
+        self.assertEqual(names, ["Marinara", "Margherita", "Greek", "Prosciutto"])
@@ -0,0 +1,155 @@
+import base64
+import shutil
+from decimal import Decimal
+from pathlib import Path
+
+from accounts.models import User
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory, APITestCase
+from restaurant.models import Category, Dish, DishIngredient, Ingredient
+from restaurant.serializers.dish_rows import dish_rows, render_dish_rows
+from restaurant.serializers.dishes import DISH_COMPACT_FIELDS, DISH_READ_FIELDS, DishSerializer
+from restaurant.services.dishes import get_dishes_queryset
+from restaurant.services.menu_cache import invalidate_menu_documents
+from restaurant.services.photos import generate_photo_variants
+
+TEST_MEDIA_ROOT = Path(settings.BASE_DIR) / "test_media"
+GIF = base64.b64decode("R0lGODlhAQABAIAAAP///////yH5BAAAAAAALAAAAAABAAEAAAIBAAA=")
+
+
+def make_menu():
+    pizza = Category.objects.create(name="Піца")
+    drinks = Category.objects.create(name="Drinks & more")
+    cheese = Ingredient.objects.create(name="Сир")
+    tomato = Ingredient.objects.create(name='Tomato "San Marzano"')
+    basil = Ingredient.objects.create(name="Basil")
+
+    margherita = Dish.objects.create(
+        name="Маргарита", description="Класика: томати, сир.\nНовий рядок.", price=Decimal("189"), category=pizza
+    )
+    margherita.photo.save("margherita.gif", SimpleUploadedFile("margherita.gif", GIF), save=True)
+    generate_photo_variants(margherita.id, margherita.photo.name)
+    # Ingredients added out of name order: both paths must keep insertion order.
+    DishIngredient.objects.create(dish=margherita, ingredient=tomato)
+    DishIngredient.objects.create(dish=margherita, ingredient=cheese)
+    DishIngredient.objects.create(dish=margherita, ingredient=basil, is_base_ingredient=False)
+
+    Dish.objects.create(name="Cola", description="", price=Decimal("0.5"), category=drinks)
+    Dish.objects.create(
+        name="Сезонна 🍕",
+        description="Немає в наявності.",
+        price=Decimal("9999.99"),
+        category=pizza,
+        is_available=False,
+    )
+    Dish.objects.create(name="Free water", description="Tap.", price=Decimal("0.00"), category=drinks)
+
+
+@override_settings(MEDIA_ROOT=str(TEST_MEDIA_ROOT))
+class DishRowsEquivalenceTests(TestCase):
+    """
+    The values()-based fast path must render exactly what DishSerializer renders.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        TEST_MEDIA_ROOT.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        if TEST_MEDIA_ROOT.exists():
+            shutil.rmtree(TEST_MEDIA_ROOT)
+        super().tearDownClass()
+
+    def setUp(self):
+        make_menu()
+        self.request = APIRequestFactory().get("/api/v0/dishes/", secure=True)
+
+    def assert_same_bytes(self, queryset, fields=None):
+        expected = DishSerializer(queryset, many=True, read_fields=fields, context={"request": self.request}).data
+        actual = render_dish_rows(list(dish_rows(queryset, fields)), self.request, fields)
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_full_representation(self):
+        self.assert_same_bytes(get_dishes_queryset())
+
+    def test_every_single_field_and_compact_view(self):
+        for field in DISH_READ_FIELDS:
+            with self.subTest(field=field):
+                self.assert_same_bytes(get_dishes_queryset(fields=(field,)), (field,))
+        self.assert_same_bytes(get_dishes_queryset(fields=DISH_COMPACT_FIELDS), DISH_COMPACT_FIELDS)
+
+    def test_filters_and_orderings(self):
+        pizza = Category.objects.get(name="Піца")
+        cheese = Ingredient.objects.get(name="Сир")
+        self.assert_same_bytes(get_dishes_queryset(category_id=pizza.id, ordering="-price"))
+        self.assert_same_bytes(get_dishes_queryset(with_ingredients=[cheese.id], ordering="price"))
+        self.assert_same_bytes(get_dishes_queryset(without_ingredients=[cheese.id]))
+        self.assert_same_bytes(get_dishes_queryset(search="cola"))
+
+    def test_without_request_photo_url_is_relative(self):
+        queryset = get_dishes_queryset()
+        expected = DishSerializer(queryset, many=True).data
+        self.assertEqual(render_dish_rows(list(dish_rows(queryset))), expected)
+
+    def test_empty_rows_skip_the_ingredient_query(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(render_dish_rows(list(dish_rows(Dish.objects.none()))), [])
+
+
+@override_settings(MEDIA_ROOT=str(TEST_MEDIA_ROOT))
+class DishRowsApiTests(APITestCase):
+    """
+    Anonymous and authenticated readers get the same bytes from the API.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        TEST_MEDIA_ROOT.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        if TEST_MEDIA_ROOT.exists():
+            shutil.rmtree(TEST_MEDIA_ROOT)
+        super().tearDownClass()
+
+    def setUp(self):
+        invalidate_menu_documents()
+        make_menu()
+        self.manager = User.objects.create_user(
+            first_name="manager",
+            last_name="user",
+            password="password123",
+            email="manager@delivery.com",
+            role=User.Role.MANAGER,  # nosec
+        )
+
+    def test_list_and_detail_match_the_serializer(self):
+        request = APIRequestFactory().get("/", HTTP_HOST="testserver")
+        dishes = get_dishes_queryset()
+        expected = DishSerializer(dishes, many=True, context={"request": request}).data
+
+        # An extra query parameter bypasses the menu document cache, so this renders fresh.
+        response = self.client.get(reverse("dish-list"), {"ordering": ""})
+        self.assertEqual(response.content, JSONRenderer().render(expected))
+
+        detail = self.client.get(reverse("dish-detail", args=[dishes[0].id]))
+        self.assertEqual(detail.content, JSONRenderer().render(expected[0]))
+
+    def test_anonymous_and_manager_get_the_same_body(self):
+        for params in [{}, {"view": "compact"}, {"page_size": 2}, {"search": "піц"}]:
+            with self.subTest(params=params):
+                self.client.force_authenticate(user=None)
+                anonymous = self.client.get(reverse("dish-list"), params).content
+                self.client.force_authenticate(user=self.manager)
+                self.assertEqual(self.client.get(reverse("dish-list"), params).content, anonymous)
+
+    def test_unknown_dish_is_404(self):
+        response = self.client.get(reverse("dish-detail", args=[999999]))
+        self.assertEqual(response.status_code, 404)
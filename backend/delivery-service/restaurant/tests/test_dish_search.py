@@ -0,0 +1,65 @@
+from django.contrib.admin.sites import site
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from restaurant.models import Category, Dish
+from restaurant.services.search import _prefix_tsquery, search_dishes
+
+
+class DishSearchTests(APITestCase):
+    """
+    Tests for the 'search' parameter of the dish list (FR-008).
+    These run on any backend; on non-PostgreSQL databases the search falls back to icontains.
+    """
+
+    def setUp(self):
+        pizza = Category.objects.create(name="Pizza")
+        salads = Category.objects.create(name="Salads")
+        Dish.objects.create(name="Margherita", description="Tomato and mozzarella.", price=120, category=pizza)
+        Dish.objects.create(name="Pepperoni", description="Spicy salami.", price=150, category=pizza)
+        Dish.objects.create(name="Caesar", description="Chicken, parmesan, tomato.", price=110, category=salads)
+        self.dishes_url = reverse("dish-list")
+
+    def names(self, search):
+        response = self.client.get(self.dishes_url, {"search": search})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [dish["name"] for dish in response.json()]
+
+    def test_search_matches_name_in_any_category(self):
+        self.assertEqual(self.names("marg"), ["Margherita"])
+
+    def test_search_matches_description(self):
+        self.assertEqual(self.names("tomato"), ["Caesar", "Margherita"])
+
+    def test_all_terms_are_required(self):
+        self.assertEqual(self.names("tomato chicken"), ["Caesar"])
+
+    def test_blank_or_symbol_only_search_returns_everything(self):
+        self.assertEqual(len(self.names("   ")), 3)
+        self.assertEqual(len(self.names("&|!:*")), 3)
+
+    def test_too_long_search_fails_400(self):
+        response = self.client.get(self.dishes_url, {"search": "x" * 101})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class DishSearchServiceTests(TestCase):
+    """
+    Tests for the search service helpers and the admin hook.
+    """
+
+    def test_prefix_tsquery_requires_every_term_as_prefix(self):
+        self.assertEqual(_prefix_tsquery(["сирн", "піц"]), "сирн:* & піц:*")
+
+    def test_admin_search_uses_search_service(self):
+        category = Category.objects.create(name="Pizza")
+        Dish.objects.create(name="Margherita", description="Classic.", price=120, category=category)
+        Dish.objects.create(name="Pepperoni", description="Spicy.", price=150, category=category)
+
+        request = RequestFactory().get("/admin/restaurant/dish/", {"q": "pepp"})
+        queryset, may_have_duplicates = site._registry[Dish].get_search_results(request, Dish.objects.all(), "pepp")
+
+        self.assertFalse(may_have_duplicates)
+        self.assertEqual(list(queryset.values_list("name", flat=True)), ["Pepperoni"])
+        self.assertQuerySetEqual(search_dishes(Dish.objects.all(), ""), Dish.objects.all(), ordered=False)
@@ -336,6 +336,7 @@ class MenuApiTests(APITestCase):
         update_data["category_id"] = update_data["category"]["id"]  # Adjust for write field
         del update_data["category"]  # Remove read-only field
         del update_data["photo_url"]  # ditto
+        del update_data["photo_variants"]  # ditto
         response = self.client.patch(self.dish_detail_url, data=update_data, format="multipart")
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
@@ -107,4 +107,5 @@ class DishServiceTests(TestCase):
         updated_dish = update_dish(dish, update_data)
 
         self.assertTrue(updated_dish.photo)
-        self.assertIn("test_image", updated_dish.photo.name)
+        # Stored under the hash of its content, not its upload name.
+        self.assertRegex(updated_dish.photo.name, r"^dishes_photos/[0-9a-f]{64}\.jpg$")
@@ -0,0 +1,181 @@
+import random
+
+from django.db import transaction
+from django.test import TestCase
+from restaurant.models import Category, Dish, DishIngredient, Ingredient, MenuChangeCounter
+from restaurant.services.categories import repair_category_counts
+from restaurant.services.dishes import get_dishes_queryset, update_dish
+from restaurant.services.ingredient_index import (
+    count_dishes,
+    find_dish_ids,
+    find_outage_dish_ids,
+    get_ingredient_index,
+    reset_ingredient_index,
+)
+from restaurant.services.menu import bump_menu_counter, get_menu_version
+
+
+class IngredientIndexTests(TestCase):
+    """
+    Tests for the in-memory ingredient -> dishes bitset index.
+    """
+
+    def setUp(self):
+        reset_ingredient_index()
+        self.category = Category.objects.create(name="Pizza")
+        self.cheese = Ingredient.objects.create(name="Cheese")
+        self.ham = Ingredient.objects.create(name="Ham")
+        self.basil = Ingredient.objects.create(name="Basil")
+        self.margherita = self.make_dish("Margherita", [(self.cheese, True), (self.basil, False)])
+        self.prosciutto = self.make_dish("Prosciutto", [(self.cheese, True), (self.ham, True)])
+        self.marinara = self.make_dish("Marinara", [])
+
+    def make_dish(self, name, ingredients):
+        dish = Dish.objects.create(name=name, description="Test.", price=10, category=self.category)
+        for ingredient, is_base in ingredients:
+            DishIngredient.objects.create(dish=dish, ingredient=ingredient, is_base_ingredient=is_base)
+        return dish
+
+    def orm_ids(self, with_ingredients=(), without_ingredients=()):
+        queryset = get_dishes_queryset(with_ingredients=with_ingredients, without_ingredients=without_ingredients)
+        return sorted(queryset.values_list("id", flat=True))
+
+    def test_matches_the_orm_filters(self):
+        ingredients = [self.cheese.id, self.ham.id, self.basil.id, 999]
+        for with_count in range(3):
+            for without_count in range(3):
+                with_ids = ingredients[:with_count]
+                without_ids = ingredients[with_count : with_count + without_count]
+                with self.subTest(with_ids=with_ids, without_ids=without_ids):
+                    self.assertEqual(find_dish_ids(with_ids, without_ids), self.orm_ids(with_ids, without_ids))
+        self.assertEqual(count_dishes([self.cheese.id]), 2)
+
+    def test_matches_the_orm_on_a_random_menu(self):
+        rng = random.Random(7)  # noqa: S311 - deterministic test data
+        ingredients = Ingredient.objects.bulk_create([Ingredient(name=f"Random {index}") for index in range(12)])
+        for index in range(60):
+            dish = Dish.objects.create(name=f"Random dish {index}", description="-", price=1, category=self.category)
+            DishIngredient.objects.bulk_create(
+                [DishIngredient(dish=dish, ingredient=ingredient) for ingredient in rng.sample(ingredients, 4)]
+            )
+        reset_ingredient_index()
+        for _ in range(30):
+            picked = [ingredient.id for ingredient in rng.sample(ingredients, 3)]
+            self.assertEqual(find_dish_ids(picked[:1], picked[1:]), self.orm_ids(picked[:1], picked[1:]))
+            self.assertEqual(find_dish_ids(picked[:2]), self.orm_ids(picked[:2]))
+
+    def test_warm_index_answers_without_queries(self):
+        get_ingredient_index()
+        with self.assertNumQueries(0):
+            find_dish_ids([self.cheese.id], [self.ham.id])
+
+    def test_signals_update_the_index_on_commit(self):
+        get_ingredient_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            calzone = self.make_dish("Calzone", [(self.ham, True)])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.prosciutto.delete()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(find_dish_ids([self.ham.id]), [calzone.id])
+            self.assertEqual(find_dish_ids(without_ingredients=[self.cheese.id]), [self.marinara.id, calzone.id])
+
+    def test_dish_ingredient_deletes_update_the_index(self):
+        get_ingredient_index()
+        counter = MenuChangeCounter.objects.get(scope=MenuChangeCounter.Scope.DISH_INGREDIENT).value
+        with self.captureOnCommitCallbacks(execute=True):
+            DishIngredient.objects.get(dish=self.margherita, ingredient=self.basil).delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            DishIngredient.objects.filter(ingredient=self.cheese).delete()
+
+        expected = self.orm_ids([], [self.basil.id, self.ham.id])
+        with self.assertNumQueries(0):
+            self.assertEqual(find_dish_ids([self.cheese.id]), [])
+            self.assertEqual(find_dish_ids(without_ingredients=[self.basil.id, self.ham.id]), expected)
+        # One bump per delete() call, however many rows it removed.
+        self.assertEqual(
+            MenuChangeCounter.objects.get(scope=MenuChangeCounter.Scope.DISH_INGREDIENT).value, counter + 2
+        )
+
+    def test_bulk_composition_update_replaces_the_dish_bits(self):
+        get_ingredient_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            update_dish(self.margherita, {"ingredients_data": [{"ingredient_id": self.ham.id}]})
+        self.assertEqual(find_dish_ids([self.cheese.id]), [self.prosciutto.id])
+        self.assertEqual(find_dish_ids([self.ham.id]), self.orm_ids([self.ham.id]))
+
+    def test_rolled_back_writes_never_reach_the_index(self):
+        get_ingredient_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.make_dish("Ghost", [(self.ham, True)])
+                transaction.set_rollback(True)
+        self.assertEqual(find_dish_ids([self.ham.id]), [self.prosciutto.id])
+
+    def available(self):
+        return sorted(Dish.objects.filter(is_available=True).values_list("name", flat=True))
+
+    def set_available(self, ingredient, is_available):
+        with self.captureOnCommitCallbacks(execute=True):
+            ingredient.is_available = is_available
+            ingredient.save()
+
+    def test_ingredient_outage_cascades_to_dishes_with_it_as_base(self):
+        repair_category_counts()  # the dishes were created around the counters
+        self.assertEqual(find_outage_dish_ids(), [])
+        self.set_available(self.cheese, False)
+        # Basil is only an optional add-on on the margherita.
+        self.set_available(self.basil, False)
+        self.assertEqual(find_outage_dish_ids(), [self.margherita.id, self.prosciutto.id])
+        self.assertEqual(self.available(), ["Marinara"])
+        self.category.refresh_from_db()
+        self.assertEqual((self.category.dish_count, self.category.available_count), (3, 1))
+
+        self.set_available(self.cheese, True)
+        self.assertEqual(find_outage_dish_ids(), [])
+        self.assertEqual(self.available(), ["Margherita", "Marinara", "Prosciutto"])
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.available_count, 3)
+
+    def test_outage_ends_when_every_base_ingredient_is_back(self):
+        self.set_available(self.cheese, False)
+        self.set_available(self.ham, False)
+        self.set_available(self.cheese, True)
+        self.assertEqual(self.available(), ["Margherita", "Marinara"])
+        self.set_available(self.ham, True)
+        self.assertEqual(self.available(), ["Margherita", "Marinara", "Prosciutto"])
+
+    def test_outage_keeps_dishes_switched_by_hand(self):
+        update_dish(self.prosciutto, {"is_available": False})
+        self.set_available(self.cheese, False)
+        # Switched back on by hand during the outage, then off again: no longer the outage's to restore.
+        update_dish(self.margherita, {"is_available": True})
+        update_dish(self.margherita, {"is_available": False})
+        self.set_available(self.cheese, True)
+        self.assertEqual(self.available(), ["Marinara"])
+
+    def test_ingredient_saves_that_keep_availability_switch_nothing(self):
+        get_ingredient_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.cheese.name = "Mozzarella"
+            self.cheese.save()
+        self.assertEqual(self.available(), ["Margherita", "Marinara", "Prosciutto"])
+
+    def test_local_writes_leave_the_version_unknown(self):
+        get_ingredient_index(get_menu_version())
+        with self.captureOnCommitCallbacks(execute=True):
+            calzone = self.make_dish("Calzone", [(self.ham, True)])
+        # Applied locally, but another process may have committed meanwhile: checked again.
+        self.assertIsNone(get_ingredient_index().token)
+        version = get_menu_version()
+        self.assertEqual(find_dish_ids([self.ham.id], version=version), [self.prosciutto.id, calzone.id])
+        self.assertEqual(get_ingredient_index().token, version.token)
+
+    def test_other_process_writes_are_caught_by_the_menu_version(self):
+        get_ingredient_index(get_menu_version())
+        # What another worker's update_dish() leaves in the database; its on-commit hook ran over there.
+        DishIngredient.objects.bulk_create([DishIngredient(dish=self.marinara, ingredient=self.ham)])
+        bump_menu_counter(MenuChangeCounter.Scope.DISH_INGREDIENT)
+
+        self.assertEqual(find_dish_ids([self.ham.id]), [self.prosciutto.id])  # unversioned: local view
+        self.assertEqual(find_dish_ids([self.ham.id], version=get_menu_version()), self.orm_ids([self.ham.id]))
@@ -0,0 +1,79 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from restaurant.models import Category, Dish, DishIngredient, Ingredient, MenuChangeCounter
+from restaurant.services.menu import bump_menu_counter
+from restaurant.services.menu_cache import invalidate_menu_documents
+
+
+class MenuDocumentCacheTests(APITestCase):
+    """
+    Tests for serving the dish list from the pre-rendered menu document cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+        invalidate_menu_documents()
+        self.pizza = Category.objects.create(name="Pizza")
+        self.drinks = Category.objects.create(name="Drinks")
+        self.cheese = Ingredient.objects.create(name="Cheese")
+        self.dish = Dish.objects.create(name="Margherita", description="Classic.", price=100, category=self.pizza)
+        DishIngredient.objects.create(dish=self.dish, ingredient=self.cheese)
+        Dish.objects.create(name="Cola", description="Cold.", price=30, category=self.drinks)
+        self.dishes_url = reverse("dish-list")
+
+    def test_cached_list_matches_rendered_list(self):
+        first = self.client.get(self.dishes_url)
+
+        # A hit costs only the menu version queries.
+        with self.assertNumQueries(2):
+            second = self.client.get(self.dishes_url)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second["Content-Type"], "application/json")
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(len(second.json()), 2)
+
+    def test_category_variants_are_cached_separately(self):
+        self.client.get(self.dishes_url)
+        response = self.client.get(self.dishes_url, {"category_id": self.drinks.id})
+        self.assertEqual([dish["name"] for dish in response.json()], ["Cola"])
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.dishes_url, {"category_id": self.drinks.id})
+        self.assertEqual([dish["name"] for dish in response.json()], ["Cola"])
+
+    def test_dish_change_rebuilds_document(self):
+        self.client.get(self.dishes_url)
+        self.dish.price = 120
+        self.dish.save()
+
+        response = self.client.get(self.dishes_url)
+        prices = {dish["name"]: dish["price"] for dish in response.json()}
+        self.assertEqual(prices["Margherita"], "120.00")
+
+    def test_ingredient_rename_rebuilds_document(self):
+        self.client.get(self.dishes_url)
+        self.cheese.name = "Mozzarella"
+        self.cheese.save()
+
+        response = self.client.get(self.dishes_url, {"category_id": self.pizza.id})
+        self.assertEqual(response.json()[0]["ingredients"][0]["name"], "Mozzarella")
+
+    def test_dish_ingredient_delete_rebuilds_document(self):
+        etag = self.client.get(self.dishes_url)["ETag"]
+        DishIngredient.objects.get(dish=self.dish, ingredient=self.cheese).delete()
+
+        self.assertEqual(self.client.get(self.dishes_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+        response = self.client.get(self.dishes_url, {"category_id": self.pizza.id})
+        self.assertEqual(response.json()[0]["ingredients"], [])
+
+    def test_stale_local_tier_is_never_served(self):
+        # Simulates another worker changing the menu: no signal reaches this process's local tier.
+        self.client.get(self.dishes_url)
+        Dish.objects.filter(pk=self.dish.pk).update(name="Marinara")
+        bump_menu_counter(MenuChangeCounter.Scope.DISH)
+
+        response = self.client.get(self.dishes_url)
+        self.assertIn("Marinara", [dish["name"] for dish in response.json()])
@@ -0,0 +1,106 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from restaurant.models import Category, Dish, DishIngredient, Ingredient, MenuChangeCounter
+
+
+class MenuConditionalGetTests(APITestCase):
+    """
+    Tests for ETag / Last-Modified revalidation on the public menu endpoints.
+    """
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Pizza")
+        self.ingredient = Ingredient.objects.create(name="Cheese")
+        self.dish = Dish.objects.create(
+            name="Margherita",
+            description="Classic.",
+            price=100,
+            category=self.category,
+        )
+        self.dishes_url = reverse("dish-list")
+
+    def test_list_sends_validators(self):
+        response = self.client.get(self.dishes_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["ETag"].startswith('"'))
+        self.assertIn("Last-Modified", response)
+
+    def test_matching_etag_returns_304_without_rendering(self):
+        etag = self.client.get(self.dishes_url)["ETag"]
+
+        # Only the two menu version queries may run for a revalidation.
+        with self.assertNumQueries(2):
+            response = self.client.get(self.dishes_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(response.content, b"")
+
+    def test_if_modified_since_returns_304(self):
+        last_modified = self.client.get(reverse("category-list"))["Last-Modified"]
+        response = self.client.get(reverse("category-list"), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_etag_differs_per_query(self):
+        etag = self.client.get(self.dishes_url)["ETag"]
+        filtered = self.client.get(self.dishes_url, {"category_id": self.category.id})
+        self.assertNotEqual(filtered["ETag"], etag)
+
+    def test_dish_change_invalidates_etag(self):
+        etag = self.client.get(self.dishes_url)["ETag"]
+        self.dish.price = 120
+        self.dish.save()
+        response = self.client.get(self.dishes_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_dish_delete_invalidates_etag(self):
+        Dish.objects.create(name="Pepperoni", description="Spicy.", price=120, category=self.category)
+        etag = self.client.get(self.dishes_url)["ETag"]
+        Dish.objects.filter(name="Pepperoni").delete()
+        response = self.client.get(self.dishes_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_dish_delete_moves_last_modified(self):
+        # Everything an hour old, so the delete lands in a later second than Last-Modified.
+        spare = Dish.objects.create(name="Pepperoni", description="Spicy.", price=120, category=self.category)
+        MenuChangeCounter.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        last_modified = self.client.get(self.dishes_url)["Last-Modified"]
+
+        spare.delete()
+
+        response = self.client.get(self.dishes_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([dish["name"] for dish in response.json()], ["Margherita"])
+
+    def test_dish_edit_stamped_before_the_last_one_invalidates_etag(self):
+        # A transaction that saved earlier but commits last: its updated_at is older than the newest.
+        Dish.objects.create(name="Pepperoni", description="Spicy.", price=120, category=self.category)
+        etag = self.client.get(self.dishes_url)["ETag"]
+        with mock.patch("django.utils.timezone.now", return_value=timezone.now() - timedelta(minutes=5)):
+            self.dish.price = 120
+            self.dish.save()
+        response = self.client.get(self.dishes_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()[0]["price"], "120.00")
+
+    def test_related_changes_invalidate_etag(self):
+        changes = [
+            lambda: Category.objects.filter(pk=self.category.pk).first().save(),
+            lambda: Ingredient.objects.create(name="Basil"),
+            lambda: DishIngredient.objects.create(dish=self.dish, ingredient=self.ingredient),
+        ]
+        for change in changes:
+            etag = self.client.get(self.dishes_url)["ETag"]
+            change()
+            response = self.client.get(self.dishes_url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_missing_dish_has_no_etag(self):
+        response = self.client.get(reverse("dish-detail", args=[9999]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn("ETag", response)
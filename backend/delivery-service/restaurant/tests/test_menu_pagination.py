@@ -0,0 +1,84 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from restaurant.models import Category, Dish, Ingredient
+
+
+class MenuKeysetPaginationTests(APITestCase):
+    """
+    Tests for the opt-in keyset pagination of the menu listings.
+    """
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Pizza")
+        for index in range(7):
+            Dish.objects.create(
+                name=f"Dish {index}",
+                description="Test dish.",
+                price=10 + index,
+                category=self.category,
+                # every third dish is unavailable and must come last
+                is_available=index % 3 != 0,
+            )
+        self.dishes_url = reverse("dish-list")
+
+    def collect_pages(self, url, params):
+        names = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            body = response.json()
+            names.extend(item["name"] for item in body["results"])
+            if body["next"] is None:
+                return names
+            response = self.client.get(body["next"])
+
+    def test_without_page_params_returns_full_list(self):
+        response = self.client.get(self.dishes_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(response.json(), list)
+        self.assertEqual(len(response.json()), 7)
+
+    def test_pages_cover_dishes_in_menu_order(self):
+        expected = [dish["name"] for dish in self.client.get(self.dishes_url).json()]
+        self.assertEqual(expected[-3:], ["Dish 0", "Dish 3", "Dish 6"])
+
+        self.assertEqual(self.collect_pages(self.dishes_url, {"page_size": 2}), expected)
+
+    def test_page_is_a_constant_number_of_queries(self):
+        first = self.client.get(self.dishes_url, {"page_size": 2}).json()
+        # menu version (2) + page with its category join (1) + ingredient prefetch (1)
+        with self.assertNumQueries(4):
+            self.client.get(first["next"])
+
+    def test_page_size_is_capped(self):
+        response = self.client.get(self.dishes_url, {"page_size": 100000})
+        self.assertEqual(len(response.json()["results"]), 7)
+        self.assertIsNone(response.json()["next"])
+
+    def test_invalid_cursor_is_rejected(self):
+        for cursor in ["not-base64!", "WzEsMiwzXQ==", "WyJ4Il0=", "W3t9LCJhIl0="]:
+            response = self.client.get(self.dishes_url, {"cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_category_filter_and_pages_combine(self):
+        other = Category.objects.create(name="Drinks")
+        Dish.objects.create(name="Cola", description="Cold.", price=3, category=other)
+        names = self.collect_pages(self.dishes_url, {"page_size": 3, "category_id": self.category.id})
+        self.assertEqual(len(names), 7)
+        self.assertNotIn("Cola", names)
+
+    def test_categories_and_ingredients_paginate_by_name(self):
+        for name in ["Salads", "Drinks", "Burgers"]:
+            Category.objects.create(name=name)
+        for name in ["Tomato", "Basil", "Cheese"]:
+            Ingredient.objects.create(name=name)
+
+        self.assertEqual(
+            self.collect_pages(reverse("category-list"), {"page_size": 1}),
+            ["Burgers", "Drinks", "Pizza", "Salads"],
+        )
+        self.assertEqual(
+            self.collect_pages(reverse("ingredient-list"), {"page_size": 2}),
+            ["Basil", "Cheese", "Tomato"],
+        )
@@ -0,0 +1,147 @@
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from orders.models import Order
+from orders.services.phones import normalize_phone
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from restaurant.models import Category, Dish
+from restaurant.services.orders import OrderCreationError, create_order_with_items
+
+User = get_user_model()
+
+
+@override_settings(PHONE_COUNTRY_CODE="380")
+class NormalizePhoneTests(SimpleTestCase):
+    def test_formats_of_one_number(self):
+        for raw in (
+            "0501234567",
+            "050 123 45 67",
+            "(050) 123-45-67",
+            "380501234567",
+            "+38 050 123 4567",
+            "00380501234567",
+            "+380501234567",
+        ):
+            with self.subTest(raw=raw):
+                self.assertEqual(normalize_phone(raw), "+380501234567")
+
+    def test_other_countries_keep_their_code(self):
+        self.assertEqual(normalize_phone("+48 501 234 567"), "+48501234567")
+
+    def test_rejects_what_cannot_be_a_number(self):
+        for raw in ("", None, "12", "+0501234567", "050-CALL-ME", "+3805012345678901"):
+            with self.subTest(raw=raw):
+                self.assertIsNone(normalize_phone(raw))
+
+
+class PhoneLookupTests(APITestCase):
+    url = "/api/v0/menu/orders/"
+
+    def setUp(self):
+        self.dish = Dish.objects.create(
+            category=Category.objects.create(name="Pizza"), name="Margherita", description="-", price=10
+        )
+
+    def place(self, phone):
+        return create_order_with_items(
+            {"phone": phone, "delivery_address": "Khreshchatyk 1"}, [{"dish_id": self.dish.id, "quantity": 2}]
+        )
+
+    def test_finds_orders_typed_in_any_format(self):
+        first, second = self.place("050 123 45 67"), self.place("+380501234567")
+        self.place("0679999999")
+
+        response = self.client.get(self.url, {"phone": "(050) 123-45-67"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([order["id"] for order in response.json()["results"]], [second.id, first.id])
+        self.assertEqual(response.json()["results"][0]["items"][0]["name"], "Margherita")
+
+    def test_pages_are_bounded(self):
+        Order.objects.bulk_create(
+            [Order(phone="0501234567", phone_e164="+380501234567", self_pickup=True) for _ in range(120)]
+        )
+        response = self.client.get(self.url, {"phone": "0501234567"})
+        self.assertEqual(len(response.json()["results"]), 20)
+        self.assertIsNotNone(response.json()["next"])
+
+        response = self.client.get(self.url, {"phone": "0501234567", "page_size": 1000})
+        self.assertEqual(len(response.json()["results"]), 100)
+
+    def test_phone_is_required_and_validated(self):
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"phone": "12"}).status_code, 400)
+
+    def test_invalid_phone_is_refused_on_creation(self):
+        with self.assertRaises(OrderCreationError):
+            self.place("+0501234567")
+        self.assertEqual(self.place("050 123 45 67").phone_e164, "+380501234567")
+
+    def test_backfill_normalizes_old_orders(self):
+        old = Order.objects.create(phone="050 123 45 67", self_pickup=True)
+        Order.objects.filter(pk=old.pk).update(phone_e164="")
+
+        call_command("backfill_orders", stdout=StringIO())
+
+        old.refresh_from_db()
+        self.assertEqual(old.phone_e164, "+380501234567")
+
+
+class OrderExportTests(APITestCase):
+    url = "/api/v0/menu/orders/export/"
+
+    def token(self, role):
+        user = User.objects.create_user(
+            email=f"{role.lower()}@example.com", password="Test12345!", first_name="T", last_name="U", role=role
+        )
+        return str(RefreshToken.for_user(user).access_token)
+
+    def authenticate(self, role):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token(role)}")
+
+    def seed_orders(self):
+        dish = Dish.objects.create(
+            category=Category.objects.create(name="Pizza"), name="Margherita", description="-", price=10
+        )
+        order = create_order_with_items(
+            {"phone": "0501234567", "delivery_address": "Khreshchatyk 1"}, [{"dish_id": dish.id, "quantity": 2}]
+        )
+        Order.objects.bulk_create([Order(phone=f"050{index:07}", self_pickup=True) for index in range(30)])
+        return order
+
+    async def test_managers_get_every_order_streamed(self):
+        order = await sync_to_async(self.seed_orders)()
+        token = await sync_to_async(self.token)(User.Role.MANAGER)
+
+        # Served the way ASGI serves it: an async iterator, read as it is sent.
+        response = await self.async_client.get(self.url, headers={"Authorization": f"Bearer {token}"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.is_async)
+        lines = b"".join([part async for part in response.streaming_content]).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3], ["id", "created_at", "status"])
+        self.assertEqual(len(lines), 32)
+        self.assertTrue(lines[1].startswith(f"{order.id},"))
+        self.assertIn("+380501234567", lines[1])
+        self.assertTrue(lines[1].endswith("Margherita x2"))
+
+    async def test_export_is_sent_a_chunk_at_a_time(self):
+        await sync_to_async(self.seed_orders)()
+        token = await sync_to_async(self.token)(User.Role.MANAGER)
+
+        with mock.patch("restaurant.views.orders.EXPORT_CHUNK_SIZE", 10):
+            response = await self.async_client.get(self.url, headers={"Authorization": f"Bearer {token}"})
+            parts = [part async for part in response.streaming_content]
+
+        # The header, then 31 orders in chunks of 10.
+        self.assertEqual([part.count(b"\n") for part in parts], [1, 10, 10, 10, 1])
+
+    def test_managers_only(self):
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        self.authenticate(User.Role.COURIER)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
@@ -0,0 +1,68 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from orders.models import Order, OrderItem
+from restaurant.models import Category, Dish
+from restaurant.services.orders import OrderCreationError, create_order_with_items
+
+
+class OrderPlacementTests(TestCase):
+    """
+    Tests for restaurant.services.orders.create_order_with_items.
+    """
+
+    def setUp(self):
+        category = Category.objects.create(name="Pizza")
+        self.dishes = [
+            Dish.objects.create(
+                name=f"Dish {index}", description="-", price=Decimal("10.50") + index, category=category
+            )
+            for index in range(50)
+        ]
+
+    def place(self, lines, **order_data):
+        order_data = {"phone": "0501234567", "delivery_address": "Khreshchatyk 1", **order_data}
+        return create_order_with_items(order_data, [{"dish_id": dish.id, "quantity": qty} for dish, qty in lines])
+
+    def test_totals_and_snapshots(self):
+        order = self.place([(self.dishes[0], 2), (self.dishes[1], 1), (self.dishes[0], 1)])
+
+        order.refresh_from_db()
+        self.assertEqual(order.status, Order.Status.NEW)
+        self.assertEqual(order.total_amount, Decimal("10.50") * 3 + Decimal("11.50"))
+        items = list(order.items.order_by("id").values_list("dish_id", "name", "unit_price", "quantity", "line_total"))
+        self.assertEqual(
+            items,
+            [
+                (self.dishes[0].id, "Dish 0", Decimal("10.50"), 2, Decimal("21.00")),
+                (self.dishes[1].id, "Dish 1", Decimal("11.50"), 1, Decimal("11.50")),
+                (self.dishes[0].id, "Dish 0", Decimal("10.50"), 1, Decimal("10.50")),
+            ],
+        )
+
+    def test_self_pickup_is_inserted_as_paid(self):
+        order = self.place([(self.dishes[0], 1)], delivery_address=None, self_pickup=True, payment_method="credit")
+        self.assertEqual(Order.objects.get(pk=order.pk).status, Order.Status.PAID_CREDIT)
+        order = self.place([(self.dishes[0], 1)], delivery_address=None, self_pickup=True)
+        self.assertEqual(Order.objects.get(pk=order.pk).status, Order.Status.PAID_CASH)
+
+    def test_statement_count_does_not_depend_on_the_cart_size(self):
+        counts = []
+        for size in (1, 10, 50):
+            with CaptureQueriesContext(connection) as queries:
+                self.place([(dish, 1) for dish in self.dishes[:size]])
+            counts.append(len(queries))
+        # savepoint, dish fetch, order insert, items insert, kitchen board delta, hourly and daily
+        # sales rollup upserts, release
+        self.assertEqual(counts, [8, 8, 8])
+
+    def test_unknown_dish_writes_nothing(self):
+        with self.assertRaises(OrderCreationError):
+            create_order_with_items(
+                {"phone": "0501234567", "self_pickup": True},
+                [{"dish_id": self.dishes[0].id, "quantity": 1}, {"dish_id": 99999, "quantity": 1}],
+            )
+        self.assertFalse(Order.objects.exists())
+        self.assertFalse(OrderItem.objects.exists())
@@ -0,0 +1,97 @@
+import shutil
+from datetime import timedelta
+from io import StringIO
+from pathlib import Path
+
+from app.media import serve_media
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase, override_settings
+from restaurant.models import Category, Dish
+from restaurant.services.dishes import create_dish, update_dish
+from restaurant.services.photos import collect_orphaned_photos, generate_photo_variants
+from restaurant.storage import is_content_addressed
+from restaurant.tests.test_photo_variants import jpeg_upload
+
+TEST_MEDIA_ROOT = Path(settings.BASE_DIR) / "test_media"
+
+
+@override_settings(MEDIA_ROOT=str(TEST_MEDIA_ROOT))
+class ContentAddressedPhotoTests(TestCase):
+    """
+    Tests for the content-addressed dish photo storage, its migration and garbage collection.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        TEST_MEDIA_ROOT.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        if TEST_MEDIA_ROOT.exists():
+            shutil.rmtree(TEST_MEDIA_ROOT)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Pizza")
+
+    def make_dish(self, name, photo):
+        return create_dish({"name": name, "description": "-", "price": 10, "category": self.category, "photo": photo})
+
+    def test_identical_uploads_share_one_file_and_its_variants(self):
+        first = self.make_dish("Margherita", jpeg_upload(400, 300, name="a.JPG"))
+        second = self.make_dish("Marinara", jpeg_upload(400, 300, name="b.jpg"))
+        third = self.make_dish("Calzone", jpeg_upload(300, 400, name="a.jpg"))
+
+        self.assertEqual(first.photo.name, second.photo.name)
+        self.assertNotEqual(first.photo.name, third.photo.name)
+        self.assertRegex(first.photo.name, r"^dishes_photos/[0-9a-f]{64}\.jpg$")
+        self.assertEqual(len(list((TEST_MEDIA_ROOT / "dishes_photos").glob(f"{Path(first.photo.name).stem}*"))), 1)
+
+        variants = generate_photo_variants(first.id, first.photo.name)
+        self.assertEqual(generate_photo_variants(second.id, second.photo.name), variants)
+        self.assertTrue(all(is_content_addressed(path) for entries in variants.values() for _, path in entries))
+
+    def test_migrate_command_renames_legacy_photos_and_collects_orphans(self):
+        dish = self.make_dish("Margherita", jpeg_upload(400, 300))
+        legacy_name = default_storage.save("dishes_photos/margherita.jpg", ContentFile(jpeg_upload(200, 100).read()))
+        Dish.objects.filter(pk=dish.pk).update(photo=legacy_name)
+        replaced_name = dish.photo.name
+
+        out = StringIO()
+        call_command("migrate_dish_photos", "--dry-run", "--grace-hours=0", stdout=out)
+        self.assertIn(f"Would move dish {dish.id}: {legacy_name} -> dishes_photos/", out.getvalue())
+        self.assertIn(f"Would delete {replaced_name}", out.getvalue())
+        self.assertEqual(Dish.objects.get(pk=dish.pk).photo.name, legacy_name)
+
+        call_command("migrate_dish_photos", "--grace-hours=0", stdout=StringIO())
+        dish.refresh_from_db()
+        self.assertTrue(is_content_addressed(dish.photo.name))
+        self.assertEqual([width for width, _ in dish.photo_variants["webp"]], [200])
+        self.assertFalse(default_storage.exists(legacy_name))
+        self.assertFalse(default_storage.exists(replaced_name))
+        self.assertTrue(default_storage.exists(dish.photo.name))
+        self.assertTrue(default_storage.exists(dish.photo_variants["webp"][0][1]))
+
+    def test_recent_orphans_are_kept(self):
+        dish = self.make_dish("Margherita", jpeg_upload(400, 300))
+        old_name = dish.photo.name
+        update_dish(dish, {"photo": None})
+
+        self.assertNotIn(old_name, collect_orphaned_photos())
+        self.assertTrue(default_storage.exists(old_name))
+        self.assertIn(old_name, collect_orphaned_photos(grace=timedelta(0)))
+        self.assertFalse(default_storage.exists(old_name))
+
+    def test_hash_stamped_media_is_served_as_immutable(self):
+        dish = self.make_dish("Margherita", jpeg_upload(40, 30))
+        legacy_name = default_storage.save("dishes_photos/legacy.jpg", ContentFile(b"legacy"))
+        request = RequestFactory().get("/media/")
+
+        response = serve_media(request, dish.photo.name, document_root=str(TEST_MEDIA_ROOT))
+        self.assertEqual(response["Cache-Control"], "public, max-age=31536000, immutable")
+        response = serve_media(request, legacy_name, document_root=str(TEST_MEDIA_ROOT))
+        self.assertFalse(response.has_header("Cache-Control"))
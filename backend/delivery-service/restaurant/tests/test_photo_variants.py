@@ -0,0 +1,122 @@
+import shutil
+from io import BytesIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+from restaurant.models import Category, Dish
+from restaurant.services.dishes import create_dish, update_dish
+from restaurant.services.photos import available_variant_formats, generate_photo_variants, variant_widths
+
+TEST_MEDIA_ROOT = Path(settings.BASE_DIR) / "test_media"
+
+
+def jpeg_upload(width, height, name="photo.jpg", orientation=None):
+    exif = Image.Exif()
+    exif[0x010F] = "Test Camera"  # Make
+    if orientation:
+        exif[0x0112] = orientation
+    buffer = BytesIO()
+    Image.new("RGB", (width, height), "red").save(buffer, "JPEG", exif=exif)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/jpeg")
+
+
+class InlineExecutor:
+    def submit(self, func, *args):
+        func(*args)
+
+
+@override_settings(MEDIA_ROOT=str(TEST_MEDIA_ROOT))
+class PhotoVariantsTests(TestCase):
+    """
+    Tests for the WebP / AVIF dish photo variants.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        TEST_MEDIA_ROOT.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def tearDownClass(cls):
+        if TEST_MEDIA_ROOT.exists():
+            shutil.rmtree(TEST_MEDIA_ROOT)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.category = Category.objects.create(name="Pizza")
+
+    def make_dish(self, photo=None):
+        data = {"name": "Margherita", "description": "-", "price": 10, "category": self.category}
+        if photo:
+            data["photo"] = photo
+        return create_dish(data)
+
+    def test_variant_widths_never_upscale(self):
+        self.assertEqual(variant_widths(4000), [320, 640, 1280])
+        self.assertEqual(variant_widths(1000), [320, 640, 1000])
+        self.assertEqual(variant_widths(100), [100])
+
+    def test_variants_are_resized_rotated_and_stripped(self):
+        # Orientation 6: stored landscape, displayed portrait.
+        dish = self.make_dish(jpeg_upload(2000, 1000, orientation=6))
+        variants = generate_photo_variants(dish.id, dish.photo.name)
+
+        self.assertEqual(list(variants), available_variant_formats())
+        self.assertIn("webp", variants)
+        for name, entries in variants.items():
+            self.assertEqual([width for width, _ in entries], [320, 640, 1000])
+            for width, path in entries:
+                with Image.open(TEST_MEDIA_ROOT / path) as image:
+                    self.assertEqual(image.format.lower(), name)
+                    self.assertEqual(image.size, (width, width * 2))
+                    self.assertEqual(dict(image.getexif()), {})
+        dish.refresh_from_db()
+        self.assertEqual(dish.photo_variants, variants)
+
+    def test_oversized_and_undecodable_photos_get_no_variants(self):
+        dish = self.make_dish(jpeg_upload(100, 100))
+        with override_settings(DISH_PHOTO_MAX_PIXELS=99 * 99):
+            self.assertEqual(generate_photo_variants(dish.id, dish.photo.name), {})
+
+        update_dish(dish, {"photo": SimpleUploadedFile("broken.jpg", b"not an image", content_type="image/jpeg")})
+        self.assertEqual(generate_photo_variants(dish.id, dish.photo.name), {})
+
+    def test_outdated_job_does_not_overwrite_a_newer_photo(self):
+        dish = self.make_dish(jpeg_upload(400, 300))
+        old_name = dish.photo.name
+        update_dish(dish, {"photo": jpeg_upload(300, 400)})
+
+        self.assertIsNone(generate_photo_variants(dish.id, old_name))
+        self.assertEqual(Dish.objects.get(pk=dish.pk).photo_variants, {})
+
+    def test_upload_renders_variants_on_commit(self):
+        with mock.patch("restaurant.services.photos._get_executor", return_value=InlineExecutor()):
+            with self.captureOnCommitCallbacks(execute=True):
+                dish = self.make_dish(jpeg_upload(800, 600))
+            self.assertEqual(
+                [width for width, _ in Dish.objects.get(pk=dish.pk).photo_variants["webp"]], [320, 640, 800]
+            )
+
+            with self.captureOnCommitCallbacks(execute=True):
+                update_dish(dish, {"photo": None})
+        self.assertEqual(Dish.objects.get(pk=dish.pk).photo_variants, {})
+
+    def test_api_renders_srcsets(self):
+        dish = self.make_dish(jpeg_upload(800, 600))
+        generate_photo_variants(dish.id, dish.photo.name)
+
+        response = self.client.get(reverse("dish-detail", args=[dish.pk]), secure=True)
+        srcset = response.data["photo_variants"]["webp"]
+        self.assertRegex(srcset, r"^https://testserver/media/dishes_photos/variants/[0-9a-f]{64}-320\.webp 320w, ")
+        self.assertTrue(srcset.endswith(" 800w"))
+
+        response = self.client.get(reverse("dish-detail", args=[self.make_dish_without_photo().pk]))
+        self.assertEqual(response.data["photo_variants"], {})
+
+    def make_dish_without_photo(self):
+        return create_dish({"name": "Cola", "description": "-", "price": 1, "category": self.category})
@@ -1,13 +1,83 @@
+import hashlib
+from calendar import timegm
+
 from accounts.permissions import IsManager
-from rest_framework import parsers, viewsets
+from app.pagination import KeysetPagination
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import parsers, status, viewsets
 from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
 from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
 from restaurant.models import Category, Dish, Ingredient
-from restaurant.serializers.dishes import CategorySerializer, DishSerializer, IngredientSerializer
-from restaurant.services.dishes import get_dishes_queryset
+from restaurant.serializers.dish_rows import dish_rows, render_dish_rows
+from restaurant.serializers.dishes import (
+    DISH_COMPACT_FIELDS,
+    DISH_READ_FIELDS,
+    CategorySerializer,
+    DishSerializer,
+    IngredientSerializer,
+)
+from restaurant.services.dishes import (
+    DISH_INGREDIENTS_PREFETCH,
+    DISH_ORDERINGS,
+    delete_with_compositions,
+    get_dishes_queryset,
+)
+from restaurant.services.menu import get_menu_version
+from restaurant.services.menu_cache import get_menu_document
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class MenuConditionalGetMixin:
+    """
+    Conditional GET for the read-only menu actions.
+    The ETag / Last-Modified validators come from the menu version alone, so a
+    revalidation that matches is answered with 304 before any queryset or serializer runs.
+    """
+
+    menu_version = None
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.list_response, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, self.retrieve_response, *args, **kwargs)
+
+    def list_response(self, request, *args, **kwargs):
+        """Renders the full list; a hook for views that can serve it cheaper."""
+        return super().list(request, *args, **kwargs)
+
+    def retrieve_response(self, request, *args, **kwargs):
+        """Renders one object; a hook like list_response."""
+        return super().retrieve(request, *args, **kwargs)
+
+    def get_menu_etag(self, request, version):
+        # The body also depends on the URL (filters, host in photo_url) and on the negotiated renderer.
+        variant = f"{version.token}|{request.build_absolute_uri()}|{request.accepted_media_type}"
+        return quote_etag(hashlib.sha256(variant.encode()).hexdigest())
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        version = self.menu_version = get_menu_version()
+        etag = self.get_menu_etag(request, version)
+        last_modified = timegm(version.last_modified.utctimetuple()) if version.last_modified else None
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        # Let clients keep the body but always revalidate it, which is cheap now.
+        patch_cache_control(response, no_cache=True)
+        return response
+
+
+class CategoryViewSet(MenuConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for Categories.
     - Managers can perform all CRUD operations.
@@ -20,14 +90,23 @@ class CategoryViewSet(viewsets.ModelViewSet):
     # явне сортування (узгоджене з Meta.ordering)
     queryset = Category.objects.all().order_by("name")
     serializer_class = CategorySerializer
+    # Opt-in pages (?page_size= / ?cursor=), seeking on the unique name index.
+    pagination_class = KeysetPagination
+    keyset_ordering = ("name",)
+    # Max SQL queries per request, checked by app/tests/test_query_budgets.py (see app/query_budget.py).
+    # destroy: the dish compositions go first, in one statement (delete_with_compositions()).
+    query_budgets = {"list": 3, "retrieve": 3, "create": 5, "update": 6, "partial_update": 6, "destroy": 12}
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
             return [AllowAny()]
         return [IsManager()]
 
+    def perform_destroy(self, instance):
+        delete_with_compositions(instance)
+
 
-class IngredientViewSet(viewsets.ModelViewSet):
+class IngredientViewSet(MenuConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for Ingredients.
     - Managers can perform all CRUD operations.
@@ -36,52 +115,196 @@ class IngredientViewSet(viewsets.ModelViewSet):
 
     queryset = Ingredient.objects.all().order_by("name")  # явне сортування
     serializer_class = IngredientSerializer
+    pagination_class = KeysetPagination
+    keyset_ordering = ("name",)
+    query_budgets = {"list": 3, "retrieve": 3, "create": 4, "update": 5, "partial_update": 5, "destroy": 8}
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
             return [AllowAny()]
         return [IsManager()]
 
+    def perform_destroy(self, instance):
+        delete_with_compositions(instance)
+
 
-class DishViewSet(viewsets.ModelViewSet):
+class DishViewSet(MenuConditionalGetMixin, viewsets.ModelViewSet):
     """
     API endpoint for Dishes.
     - Handles file uploads for the dish photo.
     - Uses the service layer for create and update logic.
     """
 
-    queryset = (  # оптимізація запиту до бази, щоб не було помилки N+1
-        Dish.objects.select_related("category").prefetch_related("ingredients").all()
-    )
+    # оптимізація запиту до бази, щоб не було помилки N+1 (те саме, що й у get_dishes_queryset())
+    queryset = Dish.objects.select_related("category").prefetch_related(DISH_INGREDIENTS_PREFETCH)
 
     serializer_class = DishSerializer
     # This is the key for file uploads. It tells DRF to expect multipart form data.
     # Accept JSON requests so API clients without file uploads are handled gracefully.
     parser_classes = [parsers.MultiPartParser, parsers.FormParser, parsers.JSONParser]
+    pagination_class = KeysetPagination
+    # Reads: menu version (2) + dishes (1) + their ingredients (1), whatever the menu size.
+    # Writes also bump the "dish" menu counter (the menu version).
+    # list: an ingredient-filtered list that finds the ingredient index out of date rebuilds it (3 queries).
+    query_budgets = {"list": 7, "retrieve": 4, "create": 12, "update": 13, "partial_update": 13, "destroy": 13}
 
     def get_permissions(self):
         if self.action in ["list", "retrieve"]:
             return [AllowAny()]
         return [IsManager()]
 
+    def perform_destroy(self, instance):
+        delete_with_compositions(instance)
+
+    def get_category_id(self):
+        """
+        Parses the optional 'category_id' query parameter, e.g. /api/dishes/?category_id=1
+        """
+        category_param = self.request.query_params.get("category_id")
+        if category_param is None:
+            return None
+        try:
+            category_id = int(category_param)
+        except (TypeError, ValueError) as exc:
+            # Reject malformed ids instead of letting the ORM raise ValueError deeper in the stack.
+            raise ValidationError({"category_id": "Must be an integer."}) from exc
+        if category_id < 1:
+            # Ensure clients cannot query with invalid FK values that would return empty data silently.
+            raise ValidationError({"category_id": "Must be a positive integer."})
+        return category_id
+
+    def get_ordering(self):
+        """
+        Parses the optional 'ordering' query parameter (FR-003): 'price' or '-price'.
+        """
+        ordering = self.request.query_params.get("ordering") or None
+        if ordering not in DISH_ORDERINGS:
+            allowed = ", ".join(key for key in DISH_ORDERINGS if key)
+            raise ValidationError({"ordering": f"Must be one of: {allowed}."})
+        return ordering
+
+    def get_ingredient_ids(self, param):
+        """
+        Parses a comma-separated list of ingredient ids, e.g. ?with_ingredients=1,4 (FR-004).
+        """
+        raw = self.request.query_params.get(param)
+        if not raw:
+            return None
+        try:
+            ingredient_ids = [int(part) for part in raw.split(",") if part.strip()]
+        except ValueError as exc:
+            raise ValidationError({param: "Must be a comma-separated list of integers."}) from exc
+        if any(ingredient_id < 1 for ingredient_id in ingredient_ids):
+            raise ValidationError({param: "Ingredient ids must be positive integers."})
+        return ingredient_ids
+
+    def get_search(self):
+        """
+        The optional 'search' query parameter (FR-008), e.g. ?search=маргарита
+        """
+        search = self.request.query_params.get("search", "").strip()
+        if len(search) > 100:
+            raise ValidationError({"search": "Must be at most 100 characters."})
+        return search or None
+
+    def get_read_fields(self):
+        """
+        Sparse fieldsets for the read actions: ?view=compact or ?fields=id,name,price.
+        Returns None when the full representation is wanted.
+        """
+        view = self.request.query_params.get("view")
+        raw = self.request.query_params.get("fields")
+        if view is not None:
+            if view != "compact":
+                raise ValidationError({"view": "Must be 'compact'."})
+            if raw is not None:
+                raise ValidationError({"fields": "Cannot be combined with 'view'."})
+            return DISH_COMPACT_FIELDS
+        if raw is None:
+            return None
+
+        requested = {name.strip() for name in raw.split(",") if name.strip()}
+        unknown = requested - set(DISH_READ_FIELDS)
+        if not requested or unknown:
+            allowed = ", ".join(DISH_READ_FIELDS)
+            raise ValidationError({"fields": f"Must be a comma-separated subset of: {allowed}."})
+        return tuple(name for name in DISH_READ_FIELDS if name in requested)
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ["list", "retrieve"]:
+            kwargs.setdefault("read_fields", self.get_read_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    @property
+    def keyset_ordering(self):
+        # Pages follow whatever order get_dishes_queryset() uses for this request.
+        return DISH_ORDERINGS[self.get_ordering()]
+
     def get_queryset(self):
         """
         This is the magic part.
         This method overrides the default .queryset property.
         """
-        # 1. Get the 'category_id' from the request's query parameters
-        # e.g., /api/dishes/?category_id=1
-        category_param = self.request.query_params.get("category_id")
-        category_id = None
-        if category_param is not None:
-            try:
-                category_id = int(category_param)
-            except (TypeError, ValueError) as exc:
-                # Reject malformed ids instead of letting the ORM raise ValueError deeper in the stack.
-                raise ValidationError({"category_id": "Must be an integer."}) from exc
-            if category_id < 1:
-                # Ensure clients cannot query with invalid FK values that would return empty data silently.
-                raise ValidationError({"category_id": "Must be a positive integer."})
-
-        # 2. Call your service with the (optional) category_id
-        return get_dishes_queryset(category_id=category_id)
+        # Call the service with the (optional) filters and ordering
+        return get_dishes_queryset(
+            category_id=self.get_category_id(),
+            ordering=self.get_ordering(),
+            with_ingredients=self.get_ingredient_ids("with_ingredients"),
+            without_ingredients=self.get_ingredient_ids("without_ingredients"),
+            search=self.get_search(),
+            fields=self.get_read_fields() if self.action in ["list", "retrieve"] else None,
+            # Set on the read actions: lets the ingredient filters use the in-memory index.
+            version=self.menu_version,
+        )
+
+    def get_menu_cache_variant(self, request):
+        """
+        Returns the cache variant for this list request, or None if it can't be served from the menu cache.
+        Only the plain list, its category_id filter and its sparse fieldsets are cached, and only as JSON.
+        """
+        if request.accepted_renderer.format != "json":
+            return None
+        if set(request.query_params) - {"category_id", "view", "fields"}:
+            return None
+        fields = ",".join(self.get_read_fields() or ())
+        # photo_url is absolute, so the document also depends on scheme and host.
+        return f"{request.build_absolute_uri('/')}|{self.get_category_id()}|{fields}"
+
+    def get_dish_rows(self):
+        return dish_rows(self.get_queryset(), self.get_read_fields())
+
+    def render_rows(self, rows):
+        # Read-only fast path: same output as DishSerializer, without a serializer per dish.
+        return render_dish_rows(rows, self.request, self.get_read_fields())
+
+    def retrieve_response(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(self.get_dish_rows(), **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return Response(self.render_rows([row])[0])
+
+    def list_response(self, request, *args, **kwargs):
+        """
+        Serves the dish list from the pre-rendered menu document when possible,
+        skipping the queryset and rendering entirely on a cache hit.
+        """
+        variant = self.get_menu_cache_variant(request)
+        if variant is None:
+            rows = self.get_dish_rows()
+            page = self.paginate_queryset(rows)
+            if page is not None:
+                return self.get_paginated_response(self.render_rows(page))
+            return Response(self.render_rows(list(rows)))
+
+        rendered = {}
+
+        def render():
+            rendered["data"] = self.render_rows(list(self.get_dish_rows()))
+            return request.accepted_renderer.render(
+                rendered["data"], request.accepted_media_type, self.get_renderer_context()
+            )
+
+        document = get_menu_document(self.menu_version, variant, render)
+        if "data" in rendered:
+            # This request built the document; answer it the regular way.
+            return Response(rendered["data"])
+        return HttpResponse(document, content_type=request.accepted_media_type)
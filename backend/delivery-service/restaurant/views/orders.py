@@ -1,22 +1,122 @@
+import csv
+from itertools import islice
+
+from accounts.permissions import IsManager
+from app.pagination import KeysetPagination
+from asgiref.sync import sync_to_async
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from orders.models import Order
+from orders.services.phones import normalize_phone
+from orders.views.idempotency import IdempotentCreateMixin
 from rest_framework import mixins, permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.response import Response
-from restaurant.models import Order
 from restaurant.serializers.orders import OrderSerializer
 
+EXPORT_COLUMNS = [
+    "id",
+    "created_at",
+    "status",
+    "payment_method",
+    "self_pickup",
+    "phone",
+    "phone_e164",
+    "delivery_address",
+    "total_amount",
+    "items",
+]
+EXPORT_CHUNK_SIZE = 2000
+
+
+class PhoneOrdersPagination(KeysetPagination):
+    # The lookup never returns a whole order table, whatever the client asks for.
+    always_paginate = True
+    page_size = 20
+    max_page_size = 100
+
 
-class OrderViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
+class Echo:
+    """A file-like object that hands back what is written, for csv.writer into a streaming response."""
+
+    def write(self, value):
+        return value
+
+
+class OrderViewSet(
+    IdempotentCreateMixin,
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.ListModelMixin,
+    viewsets.GenericViewSet,
+):
     queryset = Order.objects.all().prefetch_related("items")
     serializer_class = OrderSerializer
     permission_classes = [permissions.AllowAny]  # налаштуй під проект: IsAuthenticated або власний
+    # Max SQL queries per request (see app/query_budget.py); update/destroy are refused without touching the DB.
+    # Create includes the kitchen board delta and the two sales rollup upserts; with an Idempotency-Key
+    # it also claims the key and stores the response (+4).
+    # export: the user, the orders (one cursor) and an items query per EXPORT_CHUNK_SIZE orders; it is the one
+    # endpoint that grows with the table, by a query per chunk, and the budget covers the 2000 seeded orders.
+    query_budgets = {
+        "list": 2,
+        "retrieve": 2,
+        "create": 13,
+        "update": 0,
+        "partial_update": 0,
+        "destroy": 0,
+        "export": 4,
+    }
+    idempotency_scope = "restaurant-orders"
+    pagination_class = PhoneOrdersPagination
+    # Served by order_phone_idx.
+    keyset_ordering = ("-created_at", "-id")
+
+    def get_permissions(self):
+        if self.action == "export":
+            return [permissions.IsAuthenticated(), IsManager()]
+        return super().get_permissions()
+
+    def get_idempotency_owner(self, request):
+        # Guests' keys are theirs per phone number: another guest can't reach them, or their
+        # stored responses, without sending the same number.
+        owner = super().get_idempotency_owner(request)
+        if owner is not None:
+            return owner
+        raw = request.data.get("phone") if isinstance(request.data, dict) else None
+        phone = normalize_phone(raw) if isinstance(raw, str) else None
+        if phone is None:
+            raise ValidationError({"phone": "Not a valid phone number."})
+        return f"phone:{phone}"
 
     def get_queryset(self):
         qs = super().get_queryset()
-        # optional: filter by phone query param
-        phone = self.request.query_params.get("phone")
-        if phone:
-            qs = qs.filter(phone=phone)
+        if self.action == "list":
+            # The list is a lookup by phone, in any format the customer typed it; the full table is only
+            # available to managers, through export.
+            raw = self.request.query_params.get("phone")
+            if not raw:
+                raise ValidationError({"phone": "This query parameter is required."})
+            phone = normalize_phone(raw)
+            if phone is None:
+                raise ValidationError({"phone": "Not a valid phone number."})
+            qs = qs.filter(phone_e164=phone)
         return qs
 
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        All orders as CSV, streamed in chunks of EXPORT_CHUNK_SIZE, so memory stays flat however
+        many orders there are. Managers only.
+        """
+        filename = f"orders-{timezone.localdate():%Y-%m-%d}.csv"
+        return StreamingHttpResponse(
+            _export_lines(),
+            content_type="text/csv",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
     # optionally override destroy/update to prevent accidental enabling
     def partial_update(self, request, *args, **kwargs):
         return Response({"detail": "Updating orders is not allowed."}, status=405)
@@ -26,3 +126,38 @@ class OrderViewSet(mixins.CreateModelMixin, mixins.RetrieveModelMixin, mixins.Li
 
     def destroy(self, request, *args, **kwargs):
         return Response({"detail": "Deleting orders is not allowed."}, status=405)
+
+
+# An async iterator: the app is served over ASGI (app/asgi.py), where Django would read a sync one
+# into a list with sync_to_async before sending the first byte. The orders are read a chunk per
+# thread hop, through one server-side cursor (iterator() on PostgreSQL) that stays open between
+# the hops; each chunk is sent before the next one is read. (Under WSGI, e.g. the test client,
+# Django buffers it the other way round, with a warning.)
+async def _export_lines():
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    orders = Order.objects.order_by("id").prefetch_related("items").iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    next_chunk = sync_to_async(_export_chunk)
+    while chunk := await next_chunk(orders, writer):
+        yield chunk
+
+
+def _export_chunk(orders, writer):
+    """The CSV lines of the next EXPORT_CHUNK_SIZE orders, as one string ('' once they are all read)."""
+    return "".join(writer.writerow(_export_row(order)) for order in islice(orders, EXPORT_CHUNK_SIZE))
+
+
+def _export_row(order):
+    items = "; ".join(f"{item.name} x{item.quantity}" for item in order.items.all())
+    return [
+        order.id,
+        order.created_at.isoformat(),
+        order.status,
+        order.payment_method,
+        order.self_pickup,
+        order.phone,
+        order.phone_e164,
+        order.delivery_address,
+        order.total_amount,
+        items,
+    ]
@@ -14,11 +14,14 @@ if [ "$APP_ENV" = "production" ]; then
     python manage.py collectstatic --no-input --clear 
     
     echo "Starting Gunicorn..."
-    # Start the production server using Gunicorn
-    # Make sure 'app.wsgi:application' matches your project structure
-    exec gunicorn app.wsgi:application --bind 0.0.0.0:8000
+    # Start the production server using Gunicorn with Uvicorn (ASGI) workers: the courier feed
+    # streams Server-Sent Events, which would pin a sync worker per connected courier, and the
+    # kitchen board is a WebSocket (uvicorn[standard]). Several workers need CHANNEL_LAYER_REDIS_URL.
+    # Make sure 'app.asgi:application' matches your project structure
+    exec gunicorn app.asgi:application --worker-class uvicorn_worker.UvicornWorker --bind 0.0.0.0:8000
 else
     echo "Starting Django development server..."
-    # Start the development server (for local docker-compose)
+    # Start the development server (for local docker-compose). It is Daphne's runserver ("daphne" in
+    # INSTALLED_APPS), so it serves app.asgi like production, with autoreload.
     exec python manage.py runserver 0.0.0.0:8000
 fi
\ No newline at end of file